@@ -1,7 +1,7 @@
 
 
 from django.contrib import admin
-from .models import WalletModel, BlockchainSnapshot, TransactionLog
+from .models import WalletModel, BlockchainSnapshot, TransactionLog, MiningJob, BlockModel, TransactionModel
 
 
 @admin.register(WalletModel)
@@ -31,15 +31,24 @@ class WalletAdmin(admin.ModelAdmin):
 @admin.register(BlockchainSnapshot)
 class BlockchainSnapshotAdmin(admin.ModelAdmin):
 
-    list_display = ['name', 'difficulty', 'mining_reward', 'created_at']
-    list_filter = ['created_at', 'difficulty']
+    list_display = ['name', 'chain_height', 'pending_count', 'payload_size', 'depth', 'difficulty', 'mining_reward', 'created_at']
+    list_filter = ['created_at', 'difficulty', 'compression']
     search_fields = ['name']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'chain_id', 'parent', 'depth', 'base_height', 'chain_height', 'tip_hash', 'compression',
+                       'pending_count', 'payload_size']
+    list_per_page = 50
+    exclude = ['delta_data']
 
     fieldsets = (
         ('Snapshot Information', {
             'fields': ('name', 'difficulty', 'mining_reward')
         }),
+        ('Summary', {
+            'fields': ('chain_height', 'tip_hash', 'pending_count', 'payload_size')
+        }),
+        ('Delta', {
+            'fields': ('chain_id', 'parent', 'depth', 'base_height', 'compression')
+        }),
         ('Blockchain Data', {
             'fields': ('blockchain_data',),
             'classes': ('collapse',)
@@ -49,6 +58,10 @@ class BlockchainSnapshotAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        """Leave the payloads out of the changelist query"""
+        return super().get_queryset(request).defer('blockchain_data', 'delta_data')
+
 
 @admin.register(TransactionLog)
 class TransactionLogAdmin(admin.ModelAdmin):
@@ -84,4 +97,60 @@ class TransactionLogAdmin(admin.ModelAdmin):
         """Display shortened to address"""
         return f"{obj.to_address[:20]}..."
 
-    to_address_short.short_description = 'To'
\ No newline at end of file
+    to_address_short.short_description = 'To'
+
+
+@admin.register(MiningJob)
+class MiningJobAdmin(admin.ModelAdmin):
+
+    list_display = ['id', 'miner_address_short', 'status', 'transaction_count', 'committed', 'created_at']
+    list_filter = ['status', 'committed', 'created_at']
+    search_fields = ['miner_address', 'session_key', 'chain_id']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+    fieldsets = (
+        ('Job Details', {
+            'fields': ('session_key', 'chain_id', 'miner_address', 'status', 'transaction_count', 'error')
+        }),
+        ('Result', {
+            'fields': ('block_index', 'committed', 'block_data'),
+            'classes': ('collapse',)
+        }),
+        ('Metadata', {
+            'fields': ('created_at', 'started_at', 'finished_at')
+        }),
+    )
+
+    def miner_address_short(self, obj):
+        """Display shortened miner address"""
+        return f"{obj.miner_address[:20]}..."
+
+    miner_address_short.short_description = 'Miner'
+
+
+@admin.register(BlockModel)
+class BlockModelAdmin(admin.ModelAdmin):
+
+    list_display = ['height', 'chain_id', 'hash_short', 'transaction_count', 'version']
+    list_filter = ['version']
+    search_fields = ['chain_id', 'hash']
+
+    def hash_short(self, obj):
+        """Display shortened block hash"""
+        return f"{obj.hash[:20]}..."
+
+    hash_short.short_description = 'Hash'
+
+
+@admin.register(TransactionModel)
+class TransactionModelAdmin(admin.ModelAdmin):
+
+    list_display = ['txid_short', 'chain_id', 'height', 'position', 'amount']
+    search_fields = ['chain_id', 'txid', 'from_address', 'to_address']
+    raw_id_fields = ['block']
+
+    def txid_short(self, obj):
+        """Display shortened transaction id"""
+        return f"{obj.txid[:20]}..."
+
+    txid_short.short_description = 'Transaction ID'
@@ -10,5 +10,38 @@ class BlockchainConfig(AppConfig):
 
     def ready(self):
 
-        # Import signals if needed in future
-        pass
\ No newline at end of file
+        from django.conf import settings
+        from django.db.models.signals import pre_delete
+        from .core.cache import chain_cache, signature_cache, signing_key_cache, verifying_key_cache
+        from .core.crypto import set_backend
+        from .models import BlockchainSnapshot
+        from .snapshots import rebase_children_on_delete, snapshot_cache
+
+        # Size and switch for the verified-signature cache
+        signature_cache.configure(
+            maxsize=settings.SIGNATURE_CACHE_SIZE,
+            enabled=settings.SIGNATURE_CACHE_ENABLED
+        )
+
+        # Decoded key caches
+        verifying_key_cache.configure(maxsize=settings.VERIFYING_KEY_CACHE_SIZE)
+        signing_key_cache.configure(maxsize=settings.SIGNING_KEY_CACHE_SIZE)
+
+        # Rebuilt snapshot chains
+        snapshot_cache.configure(maxsize=settings.SNAPSHOT_CACHE_SIZE)
+
+        # Deleting a snapshot turns its children into full snapshots first
+        pre_delete.connect(rebase_children_on_delete, sender=BlockchainSnapshot,
+                           dispatch_uid='blockchain.snapshots.rebase_children')
+
+        # Live chains shared by the requests of this process
+        chain_cache.configure(
+            max_bytes=settings.CHAIN_CACHE_MAX_BYTES,
+            enabled=settings.CHAIN_CACHE_ENABLED
+        )
+
+        # Signing/verification library; fall back to ecdsa when the optional one is missing
+        try:
+            set_backend(settings.CRYPTO_BACKEND)
+        except ImportError as e:
+            print(f"Crypto backend '{settings.CRYPTO_BACKEND}' is unavailable ({e}), using ecdsa")
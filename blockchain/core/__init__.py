@@ -4,6 +4,7 @@ from .transaction import Transaction
 from .block import Block
 from .blockchain import Blockchain
 from .wallet import Wallet
+from .merkle import compute_merkle_root, verify_merkle_proof
 
-__all__ = ['Transaction', 'Block', 'Blockchain', 'Wallet']
+__all__ = ['Transaction', 'Block', 'Blockchain', 'Wallet', 'compute_merkle_root', 'verify_merkle_proof']
 __version__ = '1.0.0'
\ No newline at end of file
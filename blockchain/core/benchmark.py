@@ -0,0 +1,389 @@
+"""
+Benchmarks for the core blockchain classes
+
+Run from the project root:
+
+    python -m blockchain.core.benchmark --output bench.json
+    python -m blockchain.core.benchmark --quick --compare bench.json
+
+Results are written as JSON so runs can be compared for regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from typing import Callable, List, Optional
+
+from .block import Block
+from .blockchain import Blockchain
+from .cache import signature_cache
+from .crypto import available_backends, create_backend
+from .encoding import BINARY_VERSION, LEGACY_VERSION
+from .transaction import Transaction
+from .wallet import Wallet
+
+
+FULL_CONFIG = {
+    'difficulties': [2, 3, 4],
+    'block_sizes': [0, 10, 100],
+    'chain_lengths': [10, 50, 100],
+    'txs_per_block': 5,
+    'signatures': 50,
+    'repeat': 3,
+}
+
+QUICK_CONFIG = {
+    'difficulties': [1, 2],
+    'block_sizes': [0, 10],
+    'chain_lengths': [2, 5],
+    'txs_per_block': 2,
+    'signatures': 5,
+    'repeat': 1,
+}
+
+
+def _quiet(func: Callable, *args, **kwargs):
+
+    # The core classes print progress; keep it out of the measurements and the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _best_time(func: Callable, repeat: int) -> float:
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _quiet(func)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def _result(name: str, params: dict, value: float, unit: str, higher_is_better: bool) -> dict:
+
+    return {
+        'name': name,
+        'params': params,
+        'value': value,
+        'unit': unit,
+        'higher_is_better': higher_is_better,
+    }
+
+
+def build_chain(length: int, txs_per_block: int, difficulty: int = 1) -> tuple:
+
+    sender = Wallet()
+    receivers = [Wallet().get_public_key() for _ in range(max(txs_per_block, 1))]
+
+    blockchain = _quiet(Blockchain, difficulty=difficulty, mining_reward=100)
+
+    # The first block funds the sender, later blocks move coins around
+    _quiet(blockchain.mine_pending_transactions, sender.get_public_key())
+
+    while len(blockchain.chain) < length:
+        for i in range(txs_per_block):
+            tx = Transaction(sender.get_public_key(), receivers[i], 1)
+            tx.sign(sender)
+            _quiet(blockchain.add_transaction, tx)
+
+        _quiet(blockchain.mine_pending_transactions, sender.get_public_key())
+
+    return blockchain, sender
+
+
+def bench_mining(difficulties: List[int], block_sizes: List[int], repeat: int) -> List[dict]:
+
+    results = []
+    address = Wallet().get_public_key()
+
+    for size in block_sizes:
+        transactions = [Transaction(None, address, 1) for _ in range(size)]
+
+        for difficulty in difficulties:
+            attempts = 0
+            elapsed = 0.0
+
+            for run in range(repeat):
+                block = Block(timestamp=1700000000 + run, transactions=transactions, previous_hash='0' * 64)
+
+                start = time.perf_counter()
+                _quiet(block.mine_block, difficulty)
+                elapsed += time.perf_counter() - start
+
+                # The search starts at nonce 0, so nonce + 1 hashes were tried
+                attempts += block.nonce + 1
+
+            results.append(_result(
+                'mine_block', {'difficulty': difficulty, 'transactions': size},
+                attempts / elapsed, 'hashes/s', True
+            ))
+
+    return results
+
+
+def bench_chain(chain_lengths: List[int], txs_per_block: int, repeat: int) -> List[dict]:
+
+    results = []
+
+    for length in chain_lengths:
+        blockchain, sender = build_chain(length, txs_per_block)
+        params = {'blocks': length, 'transactions_per_block': txs_per_block}
+
+        # Full validation cost, with every signature verified rather than found in the cache
+        enabled = signature_cache.enabled
+        signature_cache.configure(enabled=False)
+        try:
+            valid_time = _best_time(blockchain.is_chain_valid, repeat)
+        finally:
+            signature_cache.configure(enabled=enabled)
+
+        results.append(_result('is_chain_valid', params, valid_time, 's', False))
+
+        results.append(_result(
+            'get_balance_of_address', params,
+            _best_time(lambda: blockchain.get_balance_of_address(sender.get_public_key()), repeat), 's', False
+        ))
+
+        results.append(_result(
+            'to_dict_from_dict', params,
+            _best_time(lambda: Blockchain.from_dict(json.loads(json.dumps(blockchain.to_dict()))), repeat), 's', False
+        ))
+
+    return results
+
+
+def bench_signatures(count: int, repeat: int) -> List[dict]:
+
+    wallet = Wallet()
+    messages = [f'benchmark message {i}' for i in range(count)]
+    signatures = [wallet.sign_data(message) for message in messages]
+    public_key = wallet.get_public_key()
+
+    def sign_all():
+        for message in messages:
+            wallet.sign_data(message)
+
+    def verify_all():
+        for message, signature in zip(messages, signatures):
+            Wallet.verify_signature(public_key, message, signature)
+
+    params = {'signatures': count}
+
+    # Raw verification cost, without the verified-signature cache
+    enabled = signature_cache.enabled
+    signature_cache.configure(enabled=False)
+    try:
+        verify_time = _best_time(verify_all, repeat)
+    finally:
+        signature_cache.configure(enabled=enabled)
+
+    # Repeat verification of signatures already in the cache
+    verify_all()
+
+    return [
+        _result('sign', params, count / _best_time(sign_all, repeat), 'signatures/s', True),
+        _result('verify', params, count / verify_time, 'signatures/s', True),
+        _result('verify_cached', params, count / _best_time(verify_all, repeat), 'signatures/s', True),
+    ]
+
+
+def bench_backends(count: int, repeat: int) -> List[dict]:
+
+    results = []
+    private_key = create_backend('ecdsa').generate_private_key()
+    messages = [f'benchmark message {i}' for i in range(count)]
+    verify_rates = {}
+
+    for name in available_backends():
+        backend = create_backend(name)
+        public_key = backend.get_public_key(private_key)
+        signatures = [backend.sign(private_key, message) for message in messages]
+        params = {'backend': name, 'signatures': count, 'accelerated': backend.accelerated}
+
+        def sign_all():
+            for message in messages:
+                backend.sign(private_key, message)
+
+        def verify_all():
+            for message, signature in zip(messages, signatures):
+                backend.verify(public_key, message, signature)
+
+        results.append(_result('backend_sign', params, count / _best_time(sign_all, repeat), 'signatures/s', True))
+        verify_rates[name] = count / _best_time(verify_all, repeat)
+        results.append(_result('backend_verify', params, verify_rates[name], 'signatures/s', True))
+
+        # Verify throughput relative to ecdsa (listed first), the reason to switch backends
+        speedup = verify_rates[name] / verify_rates['ecdsa']
+        results.append(_result('backend_speedup', params, speedup, 'x', True))
+
+    return results
+
+
+def bench_encoding(block_sizes: List[int], repeat: int) -> List[dict]:
+
+    results = []
+    wallet = Wallet()
+    receiver = Wallet().get_public_key()
+
+    for size in block_sizes:
+        # Enough rounds per timing to rise above timer noise on small blocks
+        rounds = 100
+        times = {}
+
+        for label, version in (('json', LEGACY_VERSION), ('binary', BINARY_VERSION)):
+            transactions = []
+            for _ in range(size):
+                tx = Transaction(wallet.get_public_key(), receiver, 1.5)
+                tx.version = version
+                tx.sign(wallet)
+                transactions.append(tx)
+
+            block = Block(timestamp=1700000000, transactions=transactions, previous_hash='0' * 64, version=version)
+            params = {'format': label, 'transactions': size}
+
+            if version == LEGACY_VERSION:
+                encoded = json.dumps(block.to_dict())
+
+                def encode():
+                    for _ in range(rounds):
+                        json.dumps(block.to_dict())
+
+                def decode():
+                    for _ in range(rounds):
+                        Block.from_dict(json.loads(encoded))
+            else:
+                encoded = block.to_bytes()
+
+                def encode():
+                    for _ in range(rounds):
+                        block.to_bytes()
+
+                def decode():
+                    for _ in range(rounds):
+                        Block.from_bytes(encoded)
+
+            def hash_block():
+                for _ in range(rounds):
+                    block.calculate_merkle_root()
+                    block.calculate_hash()
+
+            # What signing and verification hash, once per transaction
+            tx = Transaction(wallet.get_public_key(), receiver, 1.5)
+            tx.version = version
+
+            def hash_transaction():
+                for _ in range(rounds):
+                    tx.calculate_hash()
+
+            times[label] = {
+                'encode_block': _best_time(encode, repeat) / rounds,
+                'decode_block': _best_time(decode, repeat) / rounds,
+                'hash_block': _best_time(hash_block, repeat) / rounds,
+                'hash_transaction': _best_time(hash_transaction, repeat) / rounds,
+            }
+            for name, value in times[label].items():
+                results.append(_result(name, params, value, 's', False))
+            results.append(_result('encoded_size', params, len(encoded), 'bytes', False))
+
+        # How many times faster the binary format is than json, per operation
+        for name, value in times['binary'].items():
+            results.append(_result(
+                'encoding_speedup', {'operation': name, 'transactions': size},
+                times['json'][name] / value, 'x', True
+            ))
+
+    return results
+
+
+def run_benchmarks(config: dict) -> dict:
+
+    results = []
+    results += bench_mining(config['difficulties'], config['block_sizes'], config['repeat'])
+    results += bench_chain(config['chain_lengths'], config['txs_per_block'], config['repeat'])
+    results += bench_signatures(config['signatures'], config['repeat'])
+    results += bench_backends(config['signatures'], config['repeat'])
+    results += bench_encoding(config['block_sizes'], config['repeat'])
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': time.time(),
+            'config': config,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float = 0.2) -> List[dict]:
+
+    def key(result):
+        return result['name'], json.dumps(result['params'], sort_keys=True)
+
+    baseline_results = {key(result): result for result in baseline['results']}
+    regressions = []
+
+    for result in current['results']:
+        previous = baseline_results.get(key(result))
+        if previous is None or previous['value'] <= 0:
+            continue
+
+        # Positive change means faster, whatever the unit
+        ratio = result['value'] / previous['value']
+        change = ratio - 1 if result['higher_is_better'] else 1 / ratio - 1
+
+        if change < -tolerance:
+            regressions.append({
+                'name': result['name'],
+                'params': result['params'],
+                'baseline': previous['value'],
+                'current': result['value'],
+                'unit': result['unit'],
+                'change': change,
+            })
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+
+    parser = argparse.ArgumentParser(description='Benchmark the core blockchain classes')
+    parser.add_argument('--quick', action='store_true', help='small sizes for a fast smoke run')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before failing (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(QUICK_CONFIG if args.quick else FULL_CONFIG)
+
+    for result in report['results']:
+        params = ', '.join(f'{k}={v}' for k, v in result['params'].items())
+        print(f"{result['name']:<24} {params:<45} {result['value']:>14.4f} {result['unit']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare_results(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']} {regression['params']}: "
+                  f"{regression['baseline']:.4f} -> {regression['current']:.4f} {regression['unit']}")
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,58 +4,94 @@ import json
 from time import time
 from typing import List, Optional
 
+from .encoding import CURRENT_VERSION, LEGACY_VERSION, decode_block, encode_block, encode_block_header, encode_nonce
+
 
 class Block:
 
 
-    def __init__(self, timestamp: float, transactions: List, previous_hash: str = ''):
+    def __init__(self, timestamp: float, transactions: List, previous_hash: str = '',
+                 version: int = CURRENT_VERSION):
 
+        self.version = version
         self.timestamp = timestamp
         self.transactions = transactions
         self.previous_hash = previous_hash
         self.nonce = 0
+        self.merkle_root = self.calculate_merkle_root()
         self.hash = self.calculate_hash()
 
-    def calculate_hash(self) -> str:
+    def get_transaction_ids(self) -> List[str]:
 
-        # Convert transactions to dict for consistent hashing
-        transactions_data = [
-            tx.to_dict() if hasattr(tx, 'to_dict') else tx
+        from .transaction import Transaction
+
+        return [
+            (Transaction.from_dict(tx) if isinstance(tx, dict) else tx).calculate_txid()
             for tx in self.transactions
         ]
 
-        block_string = json.dumps({
-            'timestamp': self.timestamp,
-            'transactions': transactions_data,
-            'previous_hash': self.previous_hash,
-            'nonce': self.nonce
-        }, sort_keys=True)
+    def calculate_merkle_root(self) -> str:
 
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        from .merkle import compute_merkle_root
 
-    def mine_block(self, difficulty: int) -> None:
+        return compute_merkle_root(self.get_transaction_ids())
 
-        target = '0' * difficulty
+    def get_merkle_proof(self, tx_index: int) -> List[dict]:
 
-        # Keep changing nonce until hash meets difficulty requirement
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        from .merkle import build_merkle_proof
 
-        print(f"Block mined: {self.hash}")
+        return build_merkle_proof(self.get_transaction_ids(), tx_index)
+
+    def get_mining_header(self) -> bytes:
+
+        # Transactions are committed through the merkle root; the nonce is appended after this prefix
+        if self.version == LEGACY_VERSION:
+            return json.dumps({
+                'timestamp': self.timestamp,
+                'merkle_root': self.merkle_root,
+                'previous_hash': self.previous_hash
+            }, sort_keys=True).encode()
+
+        return encode_block_header(self)
+
+    def calculate_hash(self) -> str:
+
+        block_hash = hashlib.sha256(self.get_mining_header())
+
+        if self.version == LEGACY_VERSION:
+            block_hash.update(str(self.nonce).encode())
+        else:
+            block_hash.update(encode_nonce(self.nonce))
 
-    def has_valid_transactions(self) -> bool:
+        return block_hash.hexdigest()
 
-        for tx in self.transactions:
-            # Convert dict to Transaction if needed
-            if isinstance(tx, dict):
-                from .transaction import Transaction
-                tx = Transaction.from_dict(tx)
+    def mine_block(self, difficulty: int, workers: int = 1, target: Optional[int] = None) -> None:
 
-            if not tx.is_valid():
-                return False
+        from .mining import difficulty_to_target, find_nonce, find_nonce_parallel
 
-        return True
+        # An explicit target takes precedence over the leading-zeros difficulty
+        if target is None:
+            target = difficulty_to_target(difficulty)
+
+        # Commit to the transactions as they are now
+        self.merkle_root = self.calculate_merkle_root()
+
+        # Serialize the block once; the search only re-hashes the nonce
+        header = self.get_mining_header()
+
+        if workers > 1:
+            self.nonce, self.hash = find_nonce_parallel(header, target, workers, version=self.version)
+        else:
+            self.nonce, self.hash = find_nonce(header, target, start=self.nonce, version=self.version)
+
+        print(f"Block mined: {self.hash}")
+
+    def has_valid_transactions(self, workers: int = 1) -> bool:
+
+        from .verification import find_invalid_transaction
+
+        # Signatures are verified as one batch, across processes when workers > 1
+        return find_invalid_transaction(self.transactions, workers) is None
 
     def to_dict(self) -> dict:
 
@@ -64,35 +100,57 @@ class Block:
             for tx in self.transactions
         ]
 
-        return {
+        data = {
             'timestamp': self.timestamp,
             'transactions': transactions_data,
             'previous_hash': self.previous_hash,
+            'merkle_root': self.merkle_root,
             'nonce': self.nonce,
             'hash': self.hash
         }
 
+        # Legacy blocks keep their original shape
+        if self.version != LEGACY_VERSION:
+            data['version'] = self.version
+
+        return data
+
+    def to_bytes(self) -> bytes:
+
+        return encode_block(self)
+
     @classmethod
     def from_dict(cls, data: dict) -> 'Block':
 
         from .transaction import Transaction
 
-
-        transactions = [
+        # Stored values are restored as-is, without recomputing the merkle root or hash (like decode_block)
+        block = cls.__new__(cls)
+        block.timestamp = data['timestamp']
+        block.transactions = [
             Transaction.from_dict(tx) if isinstance(tx, dict) else tx
             for tx in data['transactions']
         ]
+        block.previous_hash = data['previous_hash']
 
-        block = cls(
-            timestamp=data['timestamp'],
-            transactions=transactions,
-            previous_hash=data['previous_hash']
-        )
+        # Blocks saved before format versions used the legacy hashing
+        block.version = data.get('version', LEGACY_VERSION)
         block.nonce = data['nonce']
         block.hash = data['hash']
 
+        # Blocks saved before merkle roots committed to their transactions directly
+        if 'merkle_root' in data:
+            block.merkle_root = data['merkle_root']
+        else:
+            block.merkle_root = block.calculate_merkle_root()
+
         return block
 
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Block':
+
+        return decode_block(data)[0]
+
     def __str__(self) -> str:
 
         return f"Block(hash={self.hash[:20]}..., transactions={len(self.transactions)}, nonce={self.nonce})"
@@ -1,19 +1,59 @@
 
 
-from typing import List, Optional
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
 from time import time
 import json
 
+# Approximate memory of decoded objects, used to size cached chains (measured with tracemalloc)
+BLOCK_MEMORY = 800
+TRANSACTION_MEMORY = 650
+ADDRESS_MEMORY = 300
+INDEX_ENTRY_MEMORY = 60
+TXID_MEMORY = 150
+
 
 class Blockchain:
 
 
-    def __init__(self, difficulty: int = 2, mining_reward: float = 100):
+    def __init__(self, difficulty: int = 2, mining_reward: float = 100, mining_workers: int = 1,
+                 verify_workers: int = 1, initial_target: Optional[int] = None,
+                 target_block_time: float = 0, retarget_interval: int = 0,
+                 max_pending_transactions: int = 5000, max_pending_per_sender: int = 0):
+
+        from .chain import LazyChain
+        from .mempool import Mempool
+        from .mining import difficulty_to_target
 
-        self.chain = []
+        self.chain = LazyChain()
         self.difficulty = difficulty
-        self.pending_transactions = []
+        self.pending_transactions = Mempool(max_pending_transactions, max_pending_per_sender)
         self.mining_reward = mining_reward
+        self.mining_workers = mining_workers
+        self.verify_workers = verify_workers
+        self.validation_error = None
+
+        # Address -> balance, address -> [(block height, tx position)] and the txids in the chain,
+        # kept up to date as blocks are appended (None until first needed)
+        self._balances = {}
+        self._address_index = {}
+        self._txids = set()
+
+        # Proof-of-work target, retargeted every `retarget_interval` blocks (0 disables)
+        self.initial_target = initial_target if initial_target is not None else difficulty_to_target(difficulty)
+        self.target_block_time = target_block_time
+        self.retarget_interval = retarget_interval
+
+        # Target of each retarget period so far, see get_target_at()
+        self._period_targets = []
+
+        # Height and hash of the tip as of the last successful validation
+        self.validated_height = None
+        self.validated_hash = None
+
+        # On-disk block store, see attach_store()
+        self.store = None
 
         # Create genesis block
         self.create_genesis_block()
@@ -21,21 +61,166 @@ class Blockchain:
     def create_genesis_block(self) -> None:
 
         from .block import Block
+        from .encoding import CURRENT_VERSION
 
-        # Genesis block with no transactions
-        genesis_block = Block(
-            timestamp=1483228800,  # 2017-01-01 (like in SavjeeCoin)
-            transactions=[],
-            previous_hash='0'
-        )
-        genesis_block.mine_block(self.difficulty)
-        self.chain.append(genesis_block)
+        # Genesis block with no transactions, mined once per process for the same parameters
+        genesis_json = _genesis_block_json(self.difficulty, self.initial_target, CURRENT_VERSION)
+        self._append_block(Block.from_dict(json.loads(genesis_json)))
 
     def get_latest_block(self):
 
         return self.chain[-1]
 
-    def mine_pending_transactions(self, mining_reward_address: str) -> None:
+    @property
+    def balances(self) -> dict:
+
+        if self._balances is None:
+            self._rebuild_indexes()
+        return self._balances
+
+    @property
+    def address_index(self) -> dict:
+
+        if self._address_index is None:
+            self._rebuild_indexes()
+        return self._address_index
+
+    @property
+    def txids(self) -> set:
+
+        if self._txids is None:
+            self._rebuild_indexes()
+        return self._txids
+
+    def estimate_memory(self) -> int:
+
+        # Grows as blocks are decoded and the indexes built, blocks still on disk cost nothing
+        size = self.chain.get_decoded_count() * BLOCK_MEMORY
+        size += (self.chain.get_decoded_transaction_count() + len(self.pending_transactions)) * TRANSACTION_MEMORY
+
+        if self._balances is not None:
+            size += len(self._balances) * ADDRESS_MEMORY
+            size += sum(map(len, self._address_index.values())) * INDEX_ENTRY_MEMORY
+            size += len(self._txids) * TXID_MEMORY
+
+        return size
+
+    def _append_block(self, block) -> None:
+
+        height = len(self.chain)
+
+        # Persist first, so the in-memory chain never gets ahead of the store
+        if self.store is not None:
+            self.store.append_block(block, height)
+
+        self.chain.append(block)
+        self._index_block(height, block)
+
+    def attach_store(self, store) -> None:
+
+        # Write out the blocks the store doesn't have yet; later blocks are appended as they come
+        for height in range(store.get_height(), len(self.chain)):
+            store.append_block(self.chain[height], height)
+
+        self.store = store
+        self.save_state()
+
+    def save_state(self) -> None:
+
+        # Everything but the blocks, which the store already has
+        if self.store is not None:
+            self.store.write_meta(self._state_dict())
+
+    def _index_block(self, height: int, block) -> None:
+
+        # Indexes that were never built will include this block once they are
+        if self._balances is None:
+            return
+
+        for position, trans in enumerate(block.transactions):
+            # Convert dict to Transaction if needed
+            if isinstance(trans, dict):
+                trans_data = trans
+            else:
+                trans_data = trans.to_dict()
+
+            from_address = trans_data.get('from')
+            to_address = trans_data.get('to')
+            amount = trans_data.get('amount', 0)
+
+            # Subtract sent amount
+            if from_address is not None:
+                self._balances[from_address] = self._balances.get(from_address, 0) - amount
+
+            # Add received amount
+            self._balances[to_address] = self._balances.get(to_address, 0) + amount
+
+            # Record the transaction once per address it touches
+            for address in {from_address, to_address} - {None}:
+                self._address_index.setdefault(address, []).append((height, position))
+
+        self._txids.update(block.get_transaction_ids())
+
+    def _rebuild_indexes(self) -> None:
+
+        self._balances = {}
+        self._address_index = {}
+        self._txids = set()
+
+        for height, block in enumerate(self.chain):
+            self._index_block(height, block)
+
+    def _next_target(self, target: int, height: int) -> int:
+
+        from .mining import MAX_TARGET
+
+        # Only retarget at multiples of the interval
+        if not self.retarget_interval or not self.target_block_time or height % self.retarget_interval != 0:
+            return target
+
+        # Measure the last `retarget_interval` block gaps, leaving out the genesis block whose timestamp is fixed
+        first = max(1, height - self.retarget_interval - 1)
+        last = height - 1
+        if last <= first:
+            return target
+
+        expected = (last - first) * self.target_block_time
+        actual = self.chain[last].timestamp - self.chain[first].timestamp
+
+        # Limit each adjustment to a factor of 4 either way
+        actual = min(max(actual, expected / 4), expected * 4)
+
+        # Integer arithmetic (microseconds) keeps the 256-bit target exact
+        new_target = target * round(actual * 1000000) // round(expected * 1000000)
+
+        return min(max(new_target, 1), MAX_TARGET)
+
+    def get_target_at(self, height: int) -> int:
+
+        if not self.retarget_interval or not self.target_block_time:
+            return self.initial_target
+
+        # A period's target only depends on the blocks below it, which never change, so each is computed once
+        periods = height // self.retarget_interval
+        targets = self._period_targets
+        while len(targets) < periods:
+            previous = targets[-1] if targets else self.initial_target
+            targets.append(self._next_target(previous, (len(targets) + 1) * self.retarget_interval))
+
+        return targets[periods - 1] if periods else self.initial_target
+
+    def get_current_target(self) -> int:
+
+        # Target the next block has to meet
+        return self.get_target_at(len(self.chain))
+
+    def get_current_difficulty(self) -> float:
+
+        from .mining import target_to_difficulty
+
+        return target_to_difficulty(self.get_current_target())
+
+    def mine_pending_transactions(self, mining_reward_address: str):
 
         from .block import Block
         from .transaction import Transaction
@@ -46,174 +231,424 @@ class Blockchain:
             to_address=mining_reward_address,
             amount=self.mining_reward
         )
-        self.pending_transactions.append(reward_tx)
 
         # Create new block
         block = Block(
             timestamp=time(),
-            transactions=self.pending_transactions,
-            previous_hash=self.get_latest_block().hash
+            transactions=list(self.pending_transactions) + [reward_tx],
+            previous_hash=self.chain.get_hash(-1)
         )
 
         # Mine the block
-        block.mine_block(self.difficulty)
+        block.mine_block(self.difficulty, workers=self.mining_workers, target=self.get_current_target())
 
         print('Block successfully mined!')
 
         # Add block to chain
-        self.chain.append(block)
+        self._append_block(block)
 
         # Reset pending transactions
-        self.pending_transactions = []
+        self.pending_transactions.clear()
+
+        return block
+
+    def get_mining_work(self) -> dict:
+
+        # Everything needed to mine the next block elsewhere, without copying the chain
+        return {
+            'previous_hash': self.chain.get_hash(-1),
+            'height': len(self.chain),
+            'difficulty': self.difficulty,
+            'target': format(self.get_current_target(), '064x'),
+            'mining_reward': self.mining_reward,
+            'transactions': [tx.to_dict() for tx in self.pending_transactions],
+        }
+
+    @staticmethod
+    def mine_work(work: dict, mining_reward_address: str, workers: int = 1):
+
+        from .block import Block
+        from .transaction import Transaction
+
+        # Same block as mine_pending_transactions would build on the chain the work came from
+        reward_tx = Transaction(
+            from_address=None,
+            to_address=mining_reward_address,
+            amount=work['mining_reward']
+        )
+
+        block = Block(
+            timestamp=time(),
+            transactions=[Transaction.from_dict(tx) for tx in work['transactions']] + [reward_tx],
+            previous_hash=work['previous_hash']
+        )
+
+        block.mine_block(work['difficulty'], workers=workers, target=int(work['target'], 16))
+
+        return block
+
+    def add_block(self, block) -> None:
+
+        from .mining import meets_target
+
+        # Accept a block mined elsewhere (e.g. by a background job) on top of the current tip
+        if block.previous_hash != self.chain.get_hash(-1):
+            raise Exception('Block does not extend the current chain tip')
+
+        if block.merkle_root != block.calculate_merkle_root() or block.hash != block.calculate_hash():
+            raise Exception('Block hash does not match its contents')
+
+        if not meets_target(block.hash, self.get_current_target()):
+            raise Exception('Block was not mined properly')
+
+        if not block.has_valid_transactions(self.verify_workers):
+            raise Exception('Block contains invalid transactions')
+
+        self._append_block(block)
+
+        # Drop pending transactions that were included in the block
+        self.pending_transactions.remove_many(block.get_transaction_ids())
 
     def add_transaction(self, transaction) -> None:
 
-        # Validate addresses
-        if not transaction.from_address or not transaction.to_address:
-            raise Exception('Transaction must include from and to address')
+        txid = self._check_new_transaction(transaction)
 
         # Verify transaction
         if not transaction.is_valid():
             raise Exception('Cannot add invalid transaction to chain')
 
+        evicted = self._admit_transaction(transaction, txid)
+        print(f'Transaction added: {transaction}')
+        if evicted:
+            print(f'Evicted from the full mempool: {len(evicted)}')
+
+    def find_invalid_signatures(self, transactions: List) -> Set[int]:
+
+        from .verification import find_invalid_signatures, get_signature_item
+
+        # Signatures don't depend on the chain, so this can run before taking a lock on it;
+        # transactions too malformed to hash are left for add_transactions to reject
+        candidates = []
+        for i, transaction in enumerate(transactions):
+            try:
+                self._check_transaction_fields(transaction)
+                candidates.append((i, get_signature_item(transaction)))
+            except Exception:
+                continue
+
+        failed = find_invalid_signatures([item for _, item in candidates], self.verify_workers)
+        return {candidates[n][0] for n in failed}
+
+    def add_transactions(self, transactions: List,
+                         invalid_signatures: Optional[Set[int]] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+
+        # One error per transaction: None if it was added, otherwise why it was rejected
+        results = [None] * len(transactions)
+        txids = {}
+
+        # Cheap checks first, so only plausible transactions reach signature verification
+        for i, transaction in enumerate(transactions):
+            try:
+                txids[i] = self._check_new_transaction(transaction)
+                if not transaction.signature:
+                    raise Exception('No signature in this transaction')
+            except Exception as e:
+                results[i] = str(e)
+
+        # Verify all remaining signatures as one batch, unless find_invalid_signatures already did
+        candidates = list(txids)
+        if invalid_signatures is None:
+            invalid_signatures = self.find_invalid_signatures([transactions[i] for i in candidates])
+            invalid_signatures = {candidates[n] for n in invalid_signatures}
+        for i in candidates:
+            if i in invalid_signatures:
+                results[i] = 'Cannot add invalid transaction to chain'
+
+        # Balances are checked in submission order, against the pool as it fills up
+        admitted = {}
+        for i in candidates:
+            if results[i] is not None:
+                continue
+
+            try:
+                evicted = self._admit_transaction(transactions[i], txids[i])
+            except Exception as e:
+                results[i] = str(e)
+                continue
+
+            admitted[txids[i]] = i
+
+            # Room made in a full pool may have cost a transaction admitted earlier in this batch
+            for txid in evicted:
+                if txid in admitted:
+                    results[admitted.pop(txid)] = 'Evicted from the full mempool'
+
+        accepted = results.count(None)
+        print(f'Transactions added: {accepted} of {len(transactions)}')
+
+        # (txid, error) pairs; the txid is None when it could not be computed
+        return [(txids.get(i), error) for i, error in enumerate(results)]
+
+    def _check_transaction_fields(self, transaction) -> None:
+
+        # Validate addresses
+        if not transaction.from_address or not transaction.to_address:
+            raise Exception('Transaction must include from and to address')
+        if not isinstance(transaction.from_address, str) or not isinstance(transaction.to_address, str):
+            raise Exception('Transaction addresses must be strings')
+
         # Validate amount
         if transaction.amount <= 0:
             raise Exception('Transaction amount should be higher than 0')
 
+    def _check_new_transaction(self, transaction) -> str:
+
+        self._check_transaction_fields(transaction)
+
+        # Reject resubmissions of a transaction that is already pending, before checking its signature
+        txid = transaction.calculate_txid()
+        if txid in self.pending_transactions:
+            raise Exception('Transaction is already pending')
+
+        # Or of one that was already mined
+        if txid in self.txids:
+            raise Exception('Transaction is already in the chain')
+
+        return txid
+
+    def _admit_transaction(self, transaction, txid: str) -> List[str]:
+
         # Check wallet balance
-        wallet_balance = self.get_balance_of_address(transaction.from_address)
+        wallet_balance = self.balances.get(transaction.from_address, 0)
         if wallet_balance < transaction.amount:
             raise Exception('Not enough balance')
 
         # Check pending transactions for this wallet
-        pending_tx_for_wallet = [
-            tx for tx in self.pending_transactions
-            if tx.from_address == transaction.from_address
-        ]
-
-        # Calculate total pending amount
-        if len(pending_tx_for_wallet) > 0:
-            total_pending_amount = sum(tx.amount for tx in pending_tx_for_wallet)
+        if self.pending_transactions.get_pending_count(transaction.from_address) > 0:
+            total_pending_amount = self.pending_transactions.get_pending_amount(transaction.from_address)
             total_amount = total_pending_amount + transaction.amount
 
             if total_amount > wallet_balance:
                 raise Exception('Pending transactions for this wallet is higher than its balance.')
 
-        # Add to pending transactions
-        self.pending_transactions.append(transaction)
-        print(f'Transaction added: {transaction}')
+        # Add to pending transactions, returning the txids evicted to make room
+        return self.pending_transactions.add(transaction, txid)
 
     def get_balance_of_address(self, address: str) -> float:
 
-        balance = 0
+        balance = self.balances.get(address, 0)
 
-        for block in self.chain:
-            for trans in block.transactions:
-                # Convert dict to Transaction if needed
-                if isinstance(trans, dict):
-                    trans_data = trans
-                else:
-                    trans_data = trans.to_dict()
+        print(f'Balance of {address[:20]}...: {balance}')
+        return balance
 
-                # Subtract sent amount
-                if trans_data.get('from') == address:
-                    balance -= trans_data.get('amount', 0)
+    def get_balances(self, addresses: List[str]) -> dict:
 
-                # Add received amount
-                if trans_data.get('to') == address:
-                    balance += trans_data.get('amount', 0)
+        # Served from the balance ledger, no chain scan per address
+        return {address: self.balances.get(address, 0) for address in addresses}
 
-        print(f'Balance of {address[:20]}...: {balance}')
-        return balance
+    def _get_indexed_transaction(self, height: int, position: int):
 
-    def get_all_transactions_for_wallet(self, address: str) -> List:
+        tx = self.chain[height].transactions[position]
 
-        transactions = []
+        # Convert dict to Transaction if needed
+        if isinstance(tx, dict):
+            from .transaction import Transaction
+            tx = Transaction.from_dict(tx)
 
-        for block in self.chain:
-            for tx in block.transactions:
-                # Convert dict to Transaction if needed
-                if isinstance(tx, dict):
-                    from .transaction import Transaction
-                    tx = Transaction.from_dict(tx)
+        return tx
 
-                if tx.from_address == address or tx.to_address == address:
-                    transactions.append(tx)
+    def get_all_transactions_for_wallet(self, address: str) -> List:
+
+        transactions = [
+            self._get_indexed_transaction(height, position)
+            for height, position in self.address_index.get(address, [])
+        ]
 
         print(f'Transactions for wallet: {len(transactions)}')
         return transactions
 
-    def is_chain_valid(self) -> bool:
+    def get_transaction_count(self, address: str) -> int:
 
-        from .block import Block
+        return len(self.address_index.get(address, []))
 
-        # Check Genesis block
-        real_genesis = Block(
-            timestamp=1483228800,
-            transactions=[],
-            previous_hash='0'
-        )
-        real_genesis.mine_block(self.difficulty)
+    def get_transaction_history(self, address: str, limit: int = 20,
+                                cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+
+        entries = self.address_index.get(address, [])
+
+        # The cursor is the "height:position" of the last entry already returned
+        if cursor:
+            try:
+                height, position = (int(part) for part in cursor.split(':'))
+            except ValueError:
+                raise ValueError(f'Invalid cursor: {cursor}')
+            end = bisect_left(entries, (height, position))
+        else:
+            end = len(entries)
+
+        start = max(0, end - limit)
+
+        # Newest first
+        page = [
+            (height, self._get_indexed_transaction(height, position))
+            for height, position in reversed(entries[start:end])
+        ]
+
+        next_cursor = None
+        if start > 0:
+            next_cursor = '{}:{}'.format(*entries[start])
+
+        return page, next_cursor
+
+    def is_chain_valid(self, incremental: bool = False) -> bool:
+
+        from .mining import meets_target
+        from .verification import collect_signature_items, find_invalid_signature
 
-        # Compare genesis blocks
-        if json.dumps(real_genesis.to_dict(), sort_keys=True) != json.dumps(self.chain[0].to_dict(), sort_keys=True):
-            print('Genesis block has been tampered with')
-            return False
+        self.validation_error = None
+
+        # With incremental=True only blocks above the validated watermark are checked,
+        # as long as the watermarked block is still the one that was validated
+        start = 1
+        if incremental and self.has_valid_watermark():
+            start = self.validated_height + 1
+        else:
+            # Compare genesis blocks
+            genesis_json = _genesis_block_json(self.difficulty, self.initial_target, self.chain[0].version)
+            if genesis_json != json.dumps(self.chain[0].to_dict(), sort_keys=True):
+                return self._invalid('Genesis block has been tampered with')
+
+        # Signatures of all checked blocks are verified together at the end
+        signature_locations = []
+        signature_items = []
 
         # Check remaining blocks
-        for i in range(1, len(self.chain)):
+        target = self.get_target_at(start - 1)
+        for i in range(start, len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i - 1]
+            target = self._next_target(target, i)
 
             # Check if previous hash matches
             if current_block.previous_hash != previous_block.hash:
-                print(f'Invalid previous hash at block {i}')
-                return False
+                return self._invalid(f'Invalid previous hash at block {i}')
 
-            # Check if transactions are valid
-            if not current_block.has_valid_transactions():
-                print(f'Invalid transactions at block {i}')
-                return False
+            # Check if merkle root commits to the block's transactions
+            if current_block.merkle_root != current_block.calculate_merkle_root():
+                return self._invalid(f'Invalid merkle root at block {i}')
 
             # Check if hash is correct
             if current_block.hash != current_block.calculate_hash():
-                print(f'Invalid hash at block {i}')
-                return False
+                return self._invalid(f'Invalid hash at block {i}')
+
+            # Check if block meets the target in force at its height
+            if not meets_target(current_block.hash, target):
+                return self._invalid(f'Block {i} was not mined properly')
+
+            positions, items = collect_signature_items(current_block.transactions)
+            signature_locations += [(i, position) for position in positions]
+            signature_items += items
+
+        # Check if transactions are valid
+        failed = find_invalid_signature(signature_items, self.verify_workers)
+        if failed is not None:
+            block_index, tx_index = signature_locations[failed]
+            return self._invalid(f'Invalid transactions at block {block_index} (transaction {tx_index})')
 
-            # Check if block meets difficulty requirement
-            if current_block.hash[:self.difficulty] != '0' * self.difficulty:
-                print(f'Block {i} was not mined properly')
-                return False
+        # Everything up to the tip is now known to be valid
+        self.validated_height = len(self.chain) - 1
+        self.validated_hash = self.chain.get_hash(-1)
 
         return True
 
+    def _invalid(self, message: str) -> bool:
+
+        print(message)
+        self.validation_error = message
+        return False
+
+    def has_valid_watermark(self) -> bool:
+
+        # The watermark only counts while the block it points at is unchanged
+        return (
+            self.validated_height is not None
+            and self.validated_height < len(self.chain)
+            and self.chain.get_hash(self.validated_height) == self.validated_hash
+        )
+
     def to_dict(self) -> dict:
 
+        data = {'chain': [block.to_dict() for block in self.chain]}
+        data.update(self._state_dict())
+        return data
+
+    def _state_dict(self) -> dict:
+
         return {
-            'chain': [block.to_dict() for block in self.chain],
             'difficulty': self.difficulty,
+            'initial_target': format(self.initial_target, '064x'),
+            'target_block_time': self.target_block_time,
+            'retarget_interval': self.retarget_interval,
             'mining_reward': self.mining_reward,
-            'pending_transactions': [tx.to_dict() for tx in self.pending_transactions]
+            'pending_transactions': [tx.to_dict() for tx in self.pending_transactions],
+            'validated_height': self.validated_height,
+            'validated_hash': self.validated_hash
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Blockchain':
 
-        from .block import Block
+        from .chain import LazyChain
+        from .mempool import Mempool
+        from .mining import difficulty_to_target
         from .transaction import Transaction
 
         # Create blockchain without genesis block
         blockchain = cls.__new__(cls)
         blockchain.difficulty = data['difficulty']
         blockchain.mining_reward = data['mining_reward']
-
-        # Restore chain
-        blockchain.chain = [Block.from_dict(block_data) for block_data in data['chain']]
+        blockchain.mining_workers = 1
+        blockchain.verify_workers = 1
+        blockchain.validation_error = None
+        blockchain.store = None
+
+        # Chains saved before numeric targets only had the leading-zeros difficulty
+        initial_target = data.get('initial_target')
+        blockchain.initial_target = int(initial_target, 16) if initial_target else difficulty_to_target(data['difficulty'])
+        blockchain.target_block_time = data.get('target_block_time', 0)
+        blockchain.retarget_interval = data.get('retarget_interval', 0)
+        blockchain._period_targets = []
+        blockchain.validated_height = data.get('validated_height')
+        blockchain.validated_hash = data.get('validated_hash')
+
+        # Blocks are only decoded when accessed, and the indexes built when first used
+        blockchain.chain = LazyChain.from_records(data['chain'])
+        blockchain._balances = None
+        blockchain._address_index = None
+        blockchain._txids = None
 
         # Restore pending transactions
-        blockchain.pending_transactions = [
-            Transaction.from_dict(tx_data) for tx_data in data['pending_transactions']
-        ]
+        blockchain.pending_transactions = Mempool()
+        for tx_data in data['pending_transactions']:
+            tx = Transaction.from_dict(tx_data)
+            txid = tx.calculate_txid()
+
+            # Sessions saved before the mempool could hold duplicates
+            if txid not in blockchain.pending_transactions:
+                blockchain.pending_transactions.add(tx, txid)
+
+        return blockchain
+
+    @classmethod
+    def from_store(cls, store) -> 'Blockchain':
+
+        from .chain import LazyChain
+
+        blockchain = cls.from_dict(dict(store.read_meta(), chain=[]))
+
+        # Blocks are read from the segment files as they are accessed
+        blockchain.chain = LazyChain.from_store(store)
+        blockchain.store = store
 
         return blockchain
 
@@ -223,4 +658,21 @@ class Blockchain:
 
     def __repr__(self) -> str:
 
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+@lru_cache(maxsize=16)
+def _genesis_block_json(difficulty: int, initial_target: int, version: int) -> str:
+
+    from .block import Block
+
+    # The genesis block is fixed for given mining parameters, so mine it once per process
+    genesis = Block(
+        timestamp=1483228800,  # 2017-01-01 (like in SavjeeCoin)
+        transactions=[],
+        previous_hash='0',
+        version=version
+    )
+    genesis.mine_block(difficulty, target=initial_target)
+
+    return json.dumps(genesis.to_dict(), sort_keys=True)
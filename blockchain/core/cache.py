@@ -0,0 +1,230 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+
+
+    def __init__(self, maxsize: int = 1024, enabled: bool = True):
+
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+
+        if not self.enabled or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            # Evict least recently used entries
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def configure(self, maxsize: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+
+        if maxsize is not None:
+            self.maxsize = maxsize
+        if enabled is not None:
+            self.enabled = enabled
+
+        # Apply a smaller size limit, or drop everything when switched off
+        with self._lock:
+            while len(self._data) > max(self.maxsize, 0) or (self._data and not self.enabled):
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+
+        total = self.hits + self.misses
+
+        return {
+            'enabled': self.enabled,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+
+        return len(self._data)
+
+
+
+class ChainCache:
+
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, enabled: bool = True,
+                 size_of: Optional[Callable[[Any], int]] = None):
+
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        # Cached values that grow while in use are re-measured with this on every get/put
+        self.size_of = size_of
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+        # Key -> (version, value, size), least recently used first
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Any:
+
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # Someone else changed the value since it was cached; never hand out the old copy
+            if entry[0] != version:
+                self._remove(key)
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+
+            # Account for whatever the value grew by since it was last measured
+            if self.size_of is not None:
+                self._resize(key, self.size_of(entry[1]))
+
+            return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, value: Any, size: Optional[int] = None) -> None:
+
+        if size is None:
+            size = self.size_of(value)
+
+        with self._lock:
+            self._remove(key)
+
+            # Values larger than the whole budget are not kept
+            if not self.enabled or size > self.max_bytes:
+                return
+
+            self._data[key] = (version, value, size)
+            self._bytes += size
+            self._evict()
+
+    def discard(self, key: Hashable) -> None:
+
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _resize(self, key: Hashable, size: int) -> None:
+
+        version, value, old_size = self._data[key]
+        self._data[key] = (version, value, size)
+        self._bytes += size - old_size
+
+        # Others go first, as this one was just used; it is dropped too if it outgrew the whole budget
+        self._evict()
+
+    def _evict(self) -> None:
+
+        while self._bytes > max(self.max_bytes, 0):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.stale = 0
+            self.evictions = 0
+
+    def configure(self, max_bytes: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if enabled is not None:
+            self.enabled = enabled
+
+        with self._lock:
+            if not self.enabled:
+                self._data.clear()
+                self._bytes = 0
+            self._evict()
+
+    def stats(self) -> dict:
+
+        total = self.hits + self.misses
+
+        return {
+            'enabled': self.enabled,
+            'size': len(self._data),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+
+        return len(self._data)
+
+
+# (public key, signed transaction hash, signature) -> True for signatures that verified
+signature_cache = LRUCache(maxsize=10000)
+
+# (backend name, public key) -> decoded public key object
+verifying_key_cache = LRUCache(maxsize=1024)
+
+# (backend name, private key) -> decoded private key object
+signing_key_cache = LRUCache(maxsize=256)
+
+# Chain id -> live Blockchain, checked against the block store's version on every lookup
+# and sized by what it has decoded so far
+chain_cache = ChainCache(size_of=lambda blockchain: blockchain.estimate_memory())
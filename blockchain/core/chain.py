@@ -0,0 +1,126 @@
+from typing import Callable, Iterator, Optional
+
+
+class LazyChain:
+
+
+    def __init__(self, length: int = 0, load_block: Optional[Callable] = None,
+                 load_hash: Optional[Callable] = None, load_range: Optional[Callable] = None):
+
+        # Blocks 0..length-1 come from the source through these callbacks
+        self._length = length
+        self._load_block = load_block
+        self._load_hash = load_hash
+        self._load_range = load_range
+
+        # Height -> Block, filled as blocks are decoded or appended
+        self._blocks = {}
+
+    @classmethod
+    def from_records(cls, records) -> 'LazyChain':
+
+        from .block import Block
+
+        # Block dicts, as saved by Blockchain.to_dict
+        records = list(records)
+
+        return cls(
+            len(records),
+            load_block=lambda height: Block.from_dict(records[height]),
+            load_hash=lambda height: records[height]['hash']
+        )
+
+    @classmethod
+    def from_store(cls, store) -> 'LazyChain':
+
+        return cls(
+            store.get_height(),
+            load_block=store.read_block,
+            load_hash=store.get_hash,
+            load_range=store.read_blocks
+        )
+
+    def _height(self, index: int) -> int:
+
+        height = index + self._length if index < 0 else index
+        if height < 0 or height >= self._length:
+            raise IndexError('chain index out of range')
+
+        return height
+
+    def get_hash(self, index: int) -> str:
+
+        height = self._height(index)
+
+        # Decoded blocks win, they may have been changed since they were loaded
+        if height in self._blocks:
+            return self._blocks[height].hash
+
+        return self._load_hash(height)
+
+    def get_decoded_count(self) -> int:
+
+        return len(self._blocks)
+
+    def get_decoded_transaction_count(self) -> int:
+
+        return sum(len(block.transactions) for block in self._blocks.values())
+
+    def append(self, block) -> None:
+
+        self._blocks[self._length] = block
+        self._length += 1
+
+    def _load(self, start: int, stop: int) -> Iterator:
+
+        if self._load_range is not None:
+            return self._load_range(start, stop)
+
+        return (self._load_block(height) for height in range(start, stop))
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self[height] for height in range(*index.indices(self._length))]
+
+        height = self._height(index)
+
+        if height not in self._blocks:
+            self._blocks[height] = self._load_block(height)
+
+        return self._blocks[height]
+
+    def __iter__(self) -> Iterator:
+
+        height = 0
+        while height < self._length:
+            if height in self._blocks:
+                yield self._blocks[height]
+                height += 1
+                continue
+
+            # Decode each run of not yet loaded blocks in one pass over the source
+            stop = height
+            while stop < self._length and stop not in self._blocks:
+                stop += 1
+
+            for block in self._load(height, stop):
+                self._blocks[height] = block
+                yield block
+                height += 1
+
+    def __len__(self) -> int:
+
+        return self._length
+
+    def __bool__(self) -> bool:
+
+        return self._length > 0
+
+    def __str__(self) -> str:
+
+        return f"LazyChain(blocks={self._length}, decoded={len(self._blocks)})"
+
+    def __repr__(self) -> str:
+
+        return self.__str__()
@@ -0,0 +1,220 @@
+import hashlib
+from typing import Dict, List, Type
+
+from ecdsa import SigningKey, VerifyingKey, SECP256k1, BadSignatureError, MalformedPointError
+from ecdsa.ellipticcurve import PointJacobi
+
+from .cache import signing_key_cache, verifying_key_cache
+
+# Verifications from one sender before its key gets precomputed tables
+PRECOMPUTE_THRESHOLD = 4
+
+
+class CryptoBackend:
+
+
+    name = ''
+
+    # False when the library would run on a slow pure Python fallback
+    accelerated = True
+
+    def generate_private_key(self) -> str:
+
+        raise NotImplementedError
+
+    def get_public_key(self, private_key: str) -> str:
+
+        raise NotImplementedError
+
+    def sign(self, private_key: str, data: str) -> str:
+
+        raise NotImplementedError
+
+    def verify(self, public_key: str, data: str, signature: str) -> bool:
+
+        raise NotImplementedError
+
+
+class EcdsaBackend(CryptoBackend):
+
+
+    name = 'ecdsa'
+
+    def get_signing_key(self, private_key: str) -> SigningKey:
+
+        # Decode each private key only once
+        cache_key = (self.name, private_key)
+        signing_key = signing_key_cache.get(cache_key)
+        if signing_key is None:
+            signing_key = SigningKey.from_string(
+                bytes.fromhex(private_key),
+                curve=SECP256k1
+            )
+            signing_key_cache.put(cache_key, signing_key)
+
+        return signing_key
+
+    def get_verifying_key(self, public_key: str) -> VerifyingKey:
+
+        cache_key = (self.name, public_key)
+        entry = verifying_key_cache.get(cache_key)
+        if entry is None:
+            # The curve order is needed for precompute(); from_string() leaves it out
+            point = PointJacobi.from_bytes(
+                SECP256k1.curve,
+                bytes.fromhex(public_key),
+                order=SECP256k1.order
+            )
+            entry = [VerifyingKey.from_public_point(point, curve=SECP256k1), 0]
+            verifying_key_cache.put(cache_key, entry)
+
+        # Precomputing costs a few verifications, so only do it for repeat senders
+        entry[1] += 1
+        if entry[1] == PRECOMPUTE_THRESHOLD:
+            entry[0].precompute()
+
+        return entry[0]
+
+    def generate_private_key(self) -> str:
+
+        return SigningKey.generate(curve=SECP256k1).to_string().hex()
+
+    def get_public_key(self, private_key: str) -> str:
+
+        return self.get_signing_key(private_key).get_verifying_key().to_string().hex()
+
+    def sign(self, private_key: str, data: str) -> str:
+
+        return self.get_signing_key(private_key).sign(data.encode()).hex()
+
+    def verify(self, public_key: str, data: str, signature: str) -> bool:
+
+        try:
+            verifying_key = self.get_verifying_key(public_key)
+            verifying_key.verify(bytes.fromhex(signature), data.encode())
+        except (BadSignatureError, MalformedPointError, TypeError, ValueError):
+            return False
+
+        return True
+
+
+class EthKeysBackend(CryptoBackend):
+
+
+    name = 'eth-keys'
+
+    def __init__(self):
+
+        # eth-keys runs on coincurve (libsecp256k1) when that is installed
+        from eth_keys import KeyAPI
+        from eth_keys.backends import CoinCurveECCBackend
+        from eth_keys.datatypes import NonRecoverableSignature, PrivateKey, PublicKey
+        from eth_keys.exceptions import BadSignature, ValidationError
+
+        self.keys = KeyAPI()
+        self.accelerated = isinstance(self.keys.backend, CoinCurveECCBackend)
+        self.signature_class = NonRecoverableSignature
+        self.private_key_class = PrivateKey
+        self.public_key_class = PublicKey
+        self.errors = (BadSignature, ValidationError, TypeError, ValueError)
+
+    @staticmethod
+    def _message_hash(data: str) -> bytes:
+
+        # ecdsa signs sha1(data); left-padding keeps the same integer for eth-keys
+        return hashlib.sha1(data.encode()).digest().rjust(32, b'\x00')
+
+    def get_signing_key(self, private_key: str):
+
+        cache_key = (self.name, private_key)
+        signing_key = signing_key_cache.get(cache_key)
+        if signing_key is None:
+            signing_key = self.private_key_class(bytes.fromhex(private_key), backend=self.keys.backend)
+            signing_key_cache.put(cache_key, signing_key)
+
+        return signing_key
+
+    def get_verifying_key(self, public_key: str):
+
+        cache_key = (self.name, public_key)
+        verifying_key = verifying_key_cache.get(cache_key)
+        if verifying_key is None:
+            verifying_key = self.public_key_class(bytes.fromhex(public_key), backend=self.keys.backend)
+            verifying_key_cache.put(cache_key, verifying_key)
+
+        return verifying_key
+
+    def generate_private_key(self) -> str:
+
+        # Same key space as ecdsa, so either backend can load the key
+        return EcdsaBackend().generate_private_key()
+
+    def get_public_key(self, private_key: str) -> str:
+
+        return self.get_signing_key(private_key).public_key.to_bytes().hex()
+
+    def sign(self, private_key: str, data: str) -> str:
+
+        signature = self.get_signing_key(private_key).sign_msg_hash_non_recoverable(self._message_hash(data))
+
+        # Raw r || s, as produced by ecdsa
+        return (signature.r.to_bytes(32, 'big') + signature.s.to_bytes(32, 'big')).hex()
+
+    def verify(self, public_key: str, data: str, signature: str) -> bool:
+
+        try:
+            raw = bytes.fromhex(signature)
+            if len(raw) != 64:
+                return False
+
+            signature = self.signature_class(rs=(int.from_bytes(raw[:32], 'big'), int.from_bytes(raw[32:], 'big')))
+            return self.get_verifying_key(public_key).verify_msg_hash(self._message_hash(data), signature)
+        except self.errors:
+            return False
+
+
+BACKENDS: Dict[str, Type[CryptoBackend]] = {
+    EcdsaBackend.name: EcdsaBackend,
+    EthKeysBackend.name: EthKeysBackend,
+}
+
+_backend: CryptoBackend = EcdsaBackend()
+
+
+def create_backend(name: str) -> CryptoBackend:
+
+    if name not in BACKENDS:
+        raise Exception(f'Unknown crypto backend: {name}')
+
+    return BACKENDS[name]()
+
+
+def available_backends() -> List[str]:
+
+    names = []
+    for name in BACKENDS:
+        try:
+            create_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+
+    return names
+
+
+def get_backend() -> CryptoBackend:
+
+    return _backend
+
+
+def set_backend(name: str) -> CryptoBackend:
+
+    global _backend
+    backend = create_backend(name)
+
+    # Without coincurve eth-keys is slower than ecdsa, so it is not worth switching to
+    if not backend.accelerated:
+        raise ImportError(f"Crypto backend '{name}' needs coincurve for its fast path")
+
+    _backend = backend
+    return _backend
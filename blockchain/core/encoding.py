@@ -0,0 +1,342 @@
+import struct
+from typing import Optional, Tuple, Union
+
+# Format versions carried by every block and transaction
+LEGACY_VERSION = 1  # f-string / JSON hashing, as used before the binary format
+BINARY_VERSION = 2  # Fixed-layout binary encoding below
+CURRENT_VERSION = BINARY_VERSION
+
+# Text fields: tag, length, bytes. Hex strings (keys, hashes, signatures) are stored as raw bytes
+_FIELD = struct.Struct('>BH')
+_FIELD_NONE = 0
+_FIELD_HEX = 1
+_FIELD_TEXT = 2
+
+# Numbers keep their Python type so legacy hashes (which format them as text) survive a round trip
+_NUMBER_INT = struct.Struct('>Bq')
+_NUMBER_FLOAT = struct.Struct('>Bd')
+_NUMBER_TAG_INT = 0
+_NUMBER_TAG_FLOAT = 1
+
+_VERSION = struct.Struct('>B')
+_NONCE = struct.Struct('>Q')
+_LENGTH = struct.Struct('>I')
+
+# Encoders raise ValueError (never struct.error or TypeError) for values the layout cannot hold
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 63 - 1
+_FIELD_MAX = 2 ** 16 - 1
+
+# Public keys and signatures are 64 bytes. Transactions made of them are packed with one fixed-width
+# struct per number layout, byte for byte the same as the tagged fields
+_KEY_SIZE = 64
+_KEY_HEX_SIZE = 2 * _KEY_SIZE
+_KEY_FIELD = _FIELD.pack(_FIELD_HEX, _KEY_SIZE)
+
+
+def _key_layouts() -> Tuple[dict, dict]:
+
+    # Payload and signed transaction structs, keyed by the Python types and by the tags of amount and timestamp
+    formats = {int: (_NUMBER_TAG_INT, 'q'), float: (_NUMBER_TAG_FLOAT, 'd')}
+    by_type = {}
+    by_tag = {}
+
+    for amount_type, (amount_tag, amount_format) in formats.items():
+        for timestamp_type, (timestamp_tag, timestamp_format) in formats.items():
+            payload = f'>B3s{_KEY_SIZE}s3s{_KEY_SIZE}sB{amount_format}B{timestamp_format}'
+            layout = (amount_tag, timestamp_tag, struct.Struct(payload), struct.Struct(f'{payload}3s{_KEY_SIZE}s'))
+            by_type[amount_type, timestamp_type] = by_tag[amount_tag, timestamp_tag] = layout
+
+    return by_type, by_tag
+
+
+_KEY_LAYOUTS, _KEY_LAYOUTS_BY_TAG = _key_layouts()
+
+# Offsets of the number tags within a fixed-width transaction, and its size
+_AMOUNT_OFFSET = _VERSION.size + 2 * (_FIELD.size + _KEY_SIZE)
+_TIMESTAMP_OFFSET = _AMOUNT_OFFSET + _NUMBER_INT.size
+_KEY_TRANSACTION_SIZE = _TIMESTAMP_OFFSET + _NUMBER_INT.size + _FIELD.size + _KEY_SIZE
+
+# Hex keys already checked by _key_bytes, cleared when full
+_KEY_BYTES_CACHE_SIZE = 4096
+_key_bytes_cache = {}
+
+# Transaction class, set on first decode
+_transaction = None
+
+
+def _is_int(value) -> bool:
+
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _pack_version(version: int) -> bytes:
+
+    if not _is_int(version) or not 0 <= version <= 255:
+        raise ValueError(f'Invalid format version: {version!r}')
+
+    return _VERSION.pack(version)
+
+
+def _hex_bytes(value: str) -> Optional[bytes]:
+
+    # Only lowercase hex survives bytes.fromhex(...).hex() unchanged
+    try:
+        raw = bytes.fromhex(value)
+    except ValueError:
+        return None
+
+    return raw if raw.hex() == value else None
+
+
+def _pack_field(value: Optional[str]) -> bytes:
+
+    if value is None:
+        return _FIELD.pack(_FIELD_NONE, 0)
+    if not isinstance(value, str):
+        raise ValueError(f'Expected a string field, got {type(value).__name__}')
+
+    # Hex strings (keys, hashes, signatures) are stored as raw bytes
+    raw = _hex_bytes(value)
+    tag = _FIELD_HEX
+    if raw is None:
+        raw = value.encode()
+        tag = _FIELD_TEXT
+
+    if len(raw) > _FIELD_MAX:
+        raise ValueError(f'String field is too long: {len(raw)} bytes')
+
+    return _FIELD.pack(tag, len(raw)) + raw
+
+
+def _unpack_field(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+
+    tag, length = _FIELD.unpack_from(data, offset)
+    offset += _FIELD.size
+    raw = data[offset:offset + length]
+    offset += length
+
+    if tag == _FIELD_NONE:
+        return None, offset
+    if tag == _FIELD_HEX:
+        return raw.hex(), offset
+    if tag == _FIELD_TEXT:
+        return raw.decode(), offset
+
+    raise ValueError(f'Unknown field tag {tag}')
+
+
+def _pack_number(value: Union[int, float]) -> bytes:
+
+    if _is_int(value):
+        if not _INT_MIN <= value <= _INT_MAX:
+            raise ValueError(f'Integer out of the signed 64-bit range: {value}')
+        return _NUMBER_INT.pack(_NUMBER_TAG_INT, value)
+
+    if not isinstance(value, float):
+        raise ValueError(f'Expected a number, got {type(value).__name__}')
+
+    return _NUMBER_FLOAT.pack(_NUMBER_TAG_FLOAT, value)
+
+
+def _unpack_number(data: bytes, offset: int) -> Tuple[Union[int, float], int]:
+
+    tag = data[offset]
+    if tag == _NUMBER_TAG_INT:
+        return _NUMBER_INT.unpack_from(data, offset)[1], offset + _NUMBER_INT.size
+    if tag == _NUMBER_TAG_FLOAT:
+        return _NUMBER_FLOAT.unpack_from(data, offset)[1], offset + _NUMBER_FLOAT.size
+
+    raise ValueError(f'Unknown number tag {tag}')
+
+
+def encode_nonce(nonce: int) -> bytes:
+
+    return _NONCE.pack(nonce)
+
+
+def _key_bytes(value: str) -> Optional[bytes]:
+
+    # Raw bytes of a 64-byte key in hex, remembered: the same addresses come up in transaction after transaction
+    if len(value) != _KEY_HEX_SIZE:
+        return None
+    raw = _hex_bytes(value)
+    if raw is None:
+        return None
+
+    if len(_key_bytes_cache) >= _KEY_BYTES_CACHE_SIZE:
+        _key_bytes_cache.clear()
+    _key_bytes_cache[value] = raw
+
+    return raw
+
+
+def _pack_keys(tx, signature: Optional[bytes] = None) -> Optional[bytes]:
+
+    # Transactions between 64-byte keys in one fixed-width struct, None when they need the tagged fields
+    layout = _KEY_LAYOUTS.get((type(tx.amount), type(tx.timestamp)))
+    from_address = tx.from_address
+    to_address = tx.to_address
+    if layout is None or type(tx.version) is not int or type(from_address) is not str or type(to_address) is not str:
+        return None
+
+    from_raw = _key_bytes_cache.get(from_address) or _key_bytes(from_address)
+    to_raw = _key_bytes_cache.get(to_address) or _key_bytes(to_address)
+    if from_raw is None or to_raw is None:
+        return None
+
+    amount_tag, timestamp_tag, payload, signed_payload = layout
+
+    # Out of range versions and integers are left to the checked path, which names them
+    try:
+        if signature is None:
+            return payload.pack(tx.version, _KEY_FIELD, from_raw, _KEY_FIELD, to_raw,
+                                amount_tag, tx.amount, timestamp_tag, tx.timestamp)
+
+        return signed_payload.pack(tx.version, _KEY_FIELD, from_raw, _KEY_FIELD, to_raw,
+                                   amount_tag, tx.amount, timestamp_tag, tx.timestamp,
+                                   _KEY_FIELD, signature)
+    except struct.error:
+        return None
+
+
+def encode_transaction_payload(tx) -> bytes:
+
+    # Everything the sender signs: version, from, to, amount, timestamp
+    packed = _pack_keys(tx)
+    if packed is not None:
+        return packed
+
+    return b''.join((
+        _pack_version(tx.version),
+        _pack_field(tx.from_address),
+        _pack_field(tx.to_address),
+        _pack_number(tx.amount),
+        _pack_number(tx.timestamp),
+    ))
+
+
+def encode_transaction(tx) -> bytes:
+
+    # Signatures are unique per transaction, so they are checked here rather than remembered like keys
+    signature = tx.signature
+    if type(signature) is str and len(signature) == _KEY_HEX_SIZE:
+        signature_raw = _hex_bytes(signature)
+        packed = _pack_keys(tx, signature_raw) if signature_raw is not None else None
+        if packed is not None:
+            return packed
+
+    return encode_transaction_payload(tx) + _pack_field(signature)
+
+
+def _transaction_class():
+
+    # Looked up once rather than imported per transaction; transaction.py imports this module
+    global _transaction
+    if _transaction is None:
+        from .transaction import Transaction
+        _transaction = Transaction
+
+    return _transaction
+
+
+def decode_transaction(data: bytes, offset: int = 0) -> Tuple['Transaction', int]:
+
+    Transaction = _transaction_class()
+
+    # Transactions between 64-byte keys unpack in one go, when their number tags and field headers match
+    fields = None
+    if len(data) >= offset + _KEY_TRANSACTION_SIZE:
+        layout = _KEY_LAYOUTS_BY_TAG.get((data[offset + _AMOUNT_OFFSET], data[offset + _TIMESTAMP_OFFSET]))
+        if layout is not None:
+            fields = layout[3].unpack_from(data, offset)
+
+    if fields is not None and fields[1] == fields[3] == fields[9] == _KEY_FIELD:
+        version, _, from_raw, _, to_raw, _, amount, _, timestamp, _, signature_raw = fields
+        from_address, to_address, signature = from_raw.hex(), to_raw.hex(), signature_raw.hex()
+        offset += _KEY_TRANSACTION_SIZE
+    else:
+        version = _VERSION.unpack_from(data, offset)[0]
+        offset += _VERSION.size
+        from_address, offset = _unpack_field(data, offset)
+        to_address, offset = _unpack_field(data, offset)
+        amount, offset = _unpack_number(data, offset)
+        timestamp, offset = _unpack_number(data, offset)
+        signature, offset = _unpack_field(data, offset)
+
+    # Stored values are restored as-is, like blocks below
+    tx = Transaction.__new__(Transaction)
+    tx.from_address = from_address
+    tx.to_address = to_address
+    tx.amount = amount
+    tx.timestamp = timestamp
+    tx.signature = signature
+    tx.version = version
+
+    return tx, offset
+
+
+def encode_block_header(block) -> bytes:
+
+    # Mining prefix: the nonce is appended after this
+    return b''.join((
+        _pack_version(block.version),
+        _pack_number(block.timestamp),
+        _pack_field(block.previous_hash),
+        _pack_field(block.merkle_root),
+    ))
+
+
+def encode_block(block) -> bytes:
+
+    from .transaction import Transaction
+
+    parts = [
+        encode_block_header(block),
+        encode_nonce(block.nonce),
+        _pack_field(block.hash),
+        _LENGTH.pack(len(block.transactions)),
+    ]
+
+    # Each transaction is length-prefixed so a reader can skip over it
+    for tx in block.transactions:
+        encoded = (Transaction.from_dict(tx) if isinstance(tx, dict) else tx).to_bytes()
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+
+    return b''.join(parts)
+
+
+def decode_block(data: bytes, offset: int = 0) -> Tuple['Block', int]:
+
+    from .block import Block
+
+    version = _VERSION.unpack_from(data, offset)[0]
+    offset += _VERSION.size
+    timestamp, offset = _unpack_number(data, offset)
+    previous_hash, offset = _unpack_field(data, offset)
+    merkle_root, offset = _unpack_field(data, offset)
+    nonce = _NONCE.unpack_from(data, offset)[0]
+    offset += _NONCE.size
+    block_hash, offset = _unpack_field(data, offset)
+    count = _LENGTH.unpack_from(data, offset)[0]
+    offset += _LENGTH.size
+
+    transactions = []
+    for _ in range(count):
+        # The length prefix is only needed by readers that skip transactions
+        offset += _LENGTH.size
+        tx, offset = decode_transaction(data, offset)
+        transactions.append(tx)
+
+    # Stored values are restored as-is, without recomputing the merkle root or hash
+    block = Block.__new__(Block)
+    block.version = version
+    block.timestamp = timestamp
+    block.transactions = transactions
+    block.previous_hash = previous_hash
+    block.merkle_root = merkle_root
+    block.nonce = nonce
+    block.hash = block_hash
+
+    return block, offset
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Optional
+
+
+class Mempool:
+
+
+    def __init__(self, max_size: int = 5000, max_per_sender: int = 0):
+
+        self.max_size = max_size
+        self.max_per_sender = max_per_sender
+
+        # txid -> transaction, oldest first
+        self.transactions = OrderedDict()
+
+        # Sender -> (pending transaction count, total pending amount)
+        self.sender_totals = {}
+
+    def add(self, transaction, txid: Optional[str] = None) -> List[str]:
+
+        txid = txid or transaction.calculate_txid()
+
+        # The same signed transaction can only be pending once
+        if txid in self.transactions:
+            raise Exception('Transaction is already pending')
+
+        # No single sender can take up the pool
+        sender = transaction.from_address
+        if sender is not None and 0 < self.max_per_sender <= self.get_pending_count(sender):
+            raise Exception('Too many pending transactions from this sender')
+
+        # A full pool makes room at the expense of whoever has the most pending
+        evicted = []
+        if self.is_full():
+            evicted.append(self._evict(sender))
+
+        self.transactions[txid] = transaction
+        self._count(transaction, 1)
+
+        return evicted
+
+    def _evict(self, sender: Optional[str]) -> str:
+
+        # The sender with the most pending transactions loses its oldest one
+        heaviest = max(self.sender_totals, key=lambda address: self.sender_totals[address][0], default=None)
+        if heaviest is None or self.get_pending_count(heaviest) <= self.get_pending_count(sender):
+            raise Exception('Mempool is full')
+
+        txid = next(txid for txid, tx in self.transactions.items() if tx.from_address == heaviest)
+        self.remove(txid)
+
+        return txid
+
+    def remove(self, txid: str):
+
+        transaction = self.transactions.pop(txid, None)
+        if transaction is not None:
+            self._count(transaction, -1)
+
+        return transaction
+
+    def remove_many(self, txids: Iterable[str]) -> None:
+
+        for txid in txids:
+            self.remove(txid)
+
+    def clear(self) -> None:
+
+        self.transactions.clear()
+        self.sender_totals.clear()
+
+    def set_max_size(self, max_size: int) -> None:
+
+        # A pool already over a lower limit keeps its transactions until they are mined
+        self.max_size = max_size
+
+    def set_max_per_sender(self, max_per_sender: int) -> None:
+
+        # Likewise senders already over a lower limit
+        self.max_per_sender = max_per_sender
+
+    def is_full(self) -> bool:
+
+        return self.max_size > 0 and len(self.transactions) >= self.max_size
+
+    def get(self, txid: str):
+
+        return self.transactions.get(txid)
+
+    def get_pending_amount(self, address: str) -> float:
+
+        return self.sender_totals.get(address, (0, 0))[1]
+
+    def get_pending_count(self, address: str) -> int:
+
+        return self.sender_totals.get(address, (0, 0))[0]
+
+    def _count(self, transaction, sign: int) -> None:
+
+        # Mining rewards have no sender
+        sender = transaction.from_address
+        if sender is None:
+            return
+
+        count, amount = self.sender_totals.get(sender, (0, 0))
+        count += sign
+        amount += sign * transaction.amount
+
+        # Drop senders with nothing pending so float leftovers don't accumulate
+        if count:
+            self.sender_totals[sender] = (count, amount)
+        else:
+            self.sender_totals.pop(sender, None)
+
+    def __contains__(self, txid: str) -> bool:
+
+        return txid in self.transactions
+
+    def __iter__(self) -> Iterator:
+
+        return iter(list(self.transactions.values()))
+
+    def __len__(self) -> int:
+
+        return len(self.transactions)
+
+    def __str__(self) -> str:
+
+        return f"Mempool(transactions={len(self)}, max_size={self.max_size}, max_per_sender={self.max_per_sender})"
+
+    def __repr__(self) -> str:
+
+        return self.__str__()
@@ -0,0 +1,72 @@
+import hashlib
+from typing import List
+
+# Root of a block without transactions
+EMPTY_MERKLE_ROOT = '0' * 64
+
+
+def hash_pair(left: str, right: str) -> str:
+
+    return hashlib.sha256(bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _next_level(level: List[str]) -> List[str]:
+
+    # Odd levels pair their last hash with itself
+    if len(level) % 2 == 1:
+        level = level + [level[-1]]
+
+    return [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+
+
+def compute_merkle_root(leaves: List[str]) -> str:
+
+    if not leaves:
+        return EMPTY_MERKLE_ROOT
+
+    level = list(leaves)
+    while len(level) > 1:
+        level = _next_level(level)
+
+    return level[0]
+
+
+def build_merkle_proof(leaves: List[str], index: int) -> List[dict]:
+
+    if index < 0 or index >= len(leaves):
+        raise IndexError('Leaf index out of range')
+
+    proof = []
+    level = list(leaves)
+
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level = level + [level[-1]]
+
+        # Record the sibling and which side it sits on
+        if index % 2 == 0:
+            proof.append({'hash': level[index + 1], 'position': 'right'})
+        else:
+            proof.append({'hash': level[index - 1], 'position': 'left'})
+
+        level = _next_level(level)
+        index //= 2
+
+    return proof
+
+
+def verify_merkle_proof(leaf: str, proof: List[dict], merkle_root: str) -> bool:
+
+    try:
+        current = leaf
+        for step in proof:
+            if step['position'] == 'left':
+                current = hash_pair(step['hash'], current)
+            elif step['position'] == 'right':
+                current = hash_pair(current, step['hash'])
+            else:
+                return False
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    return current == merkle_root
@@ -0,0 +1,106 @@
+import hashlib
+import math
+from typing import Optional, Tuple
+
+from .encoding import CURRENT_VERSION, LEGACY_VERSION, encode_nonce
+
+# Easiest possible target: every hash is accepted
+MAX_TARGET = (1 << 256) - 1
+
+
+def difficulty_to_target(difficulty: int) -> int:
+
+    # A hash with `difficulty` leading hex zeros is exactly a hash <= this target
+    return (1 << (256 - 4 * difficulty)) - 1
+
+
+def target_to_difficulty(target: int) -> float:
+
+    # Equivalent number of leading hex zeros, fractional between whole steps
+    return math.log((MAX_TARGET + 1) / (target + 1), 16)
+
+
+def meets_target(block_hash: str, target: int) -> bool:
+
+    return int(block_hash, 16) <= target
+
+
+def find_nonce(header: bytes, target: int, start: int = 0, stop: Optional[int] = None,
+               version: int = CURRENT_VERSION) -> Optional[Tuple[int, str]]:
+
+    # Equal-length big-endian bytes compare like the integers they encode
+    target_bytes = target.to_bytes(32, 'big')
+
+    # Hash the invariant part of the block once and only append the nonce per attempt
+    midstate = hashlib.sha256(header)
+
+    # Legacy blocks append the nonce as decimal text, binary ones as 8 bytes
+    if version == LEGACY_VERSION:
+        def pack_nonce(value):
+            return str(value).encode()
+    else:
+        pack_nonce = encode_nonce
+
+    nonce = start
+    while stop is None or nonce < stop:
+        attempt = midstate.copy()
+        attempt.update(pack_nonce(nonce))
+
+        if attempt.digest() <= target_bytes:
+            return nonce, attempt.hexdigest()
+
+        nonce += 1
+
+    return None
+
+
+# Set in each pool worker so all workers can see when one of them has found a nonce
+_found_event = None
+
+
+def _init_worker(found_event) -> None:
+
+    global _found_event
+    _found_event = found_event
+
+
+def _search_chunks(header: bytes, target: int, first_chunk: int, stride: int,
+                   chunk_size: int, version: int) -> Optional[Tuple[int, str]]:
+
+    # Worker i scans chunks i, i + stride, i + 2 * stride, ... of the nonce space
+    chunk = first_chunk
+    while not _found_event.is_set():
+        start = chunk * chunk_size
+        result = find_nonce(header, target, start=start, stop=start + chunk_size, version=version)
+
+        if result is not None:
+            _found_event.set()
+            return result
+
+        chunk += stride
+
+    return None
+
+
+def find_nonce_parallel(header: bytes, target: int, workers: int, chunk_size: int = 50000,
+                        version: int = CURRENT_VERSION) -> Tuple[int, str]:
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    found_event = multiprocessing.Event()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(found_event,)) as executor:
+        futures = [
+            executor.submit(_search_chunks, header, target, i, workers, chunk_size, version)
+            for i in range(workers)
+        ]
+
+        # The first worker to succeed stops the others via the shared event
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None:
+                return result
+
+    raise RuntimeError('Parallel mining finished without finding a nonce')
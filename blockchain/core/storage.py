@@ -0,0 +1,340 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from .encoding import decode_block
+
+# Index record per block: segment number, offset, length, raw block hash
+INDEX_RECORD = struct.Struct('>IQI32s')
+
+# A new segment file is started once the current one reaches this size
+SEGMENT_SIZE = 16 * 1024 * 1024
+
+INDEX_FILE = 'index.dat'
+META_FILE = 'meta.json'
+LOCK_FILE = 'lock'
+
+# Lock file path -> how many times the current thread holds it
+_held_locks = threading.local()
+
+
+class BlockStore:
+
+
+    def __init__(self, path: str, segment_size: int = SEGMENT_SIZE):
+
+        self.path = str(path)
+        self.segment_size = segment_size
+
+    @property
+    def chain_id(self) -> str:
+
+        return os.path.basename(os.path.normpath(self.path))
+
+    def exists(self) -> bool:
+
+        return os.path.exists(os.path.join(self.path, META_FILE))
+
+    def delete(self) -> None:
+
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def lock(self) -> 'StoreLock':
+
+        return StoreLock(os.path.join(self.path, LOCK_FILE))
+
+    def _segment_path(self, segment: int) -> str:
+
+        return os.path.join(self.path, f'segment-{segment:05d}.dat')
+
+    def _index_path(self) -> str:
+
+        return os.path.join(self.path, INDEX_FILE)
+
+    def get_height(self) -> int:
+
+        # A torn trailing record (crash mid-write) is ignored and overwritten by the next append
+        try:
+            return os.path.getsize(self._index_path()) // INDEX_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def _read_index_entry(self, height: int) -> Tuple[int, int, int, bytes]:
+
+        if height < 0 or height >= self.get_height():
+            raise IndexError(f'No block at height {height}')
+
+        with open(self._index_path(), 'rb') as f:
+            f.seek(height * INDEX_RECORD.size)
+            return INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))
+
+    def get_hash(self, height: int) -> str:
+
+        return self._read_index_entry(height)[3].hex()
+
+    def get_version(self) -> Optional[Tuple]:
+
+        # Changes with every appended block and every metadata write (write-and-rename gives a new inode)
+        try:
+            meta = os.stat(os.path.join(self.path, META_FILE))
+        except FileNotFoundError:
+            return None
+
+        height = self.get_height()
+        tip_hash = self.get_hash(height - 1) if height else ''
+
+        return (height, tip_hash, meta.st_ino, meta.st_mtime_ns, meta.st_size)
+
+    def read_index(self) -> Iterator[Tuple[int, int, int, bytes]]:
+
+        with open(self._index_path(), 'rb') as f:
+            data = f.read(self.get_height() * INDEX_RECORD.size)
+
+        return INDEX_RECORD.iter_unpack(data)
+
+    def append_block(self, block, height: Optional[int] = None) -> int:
+
+        stored_height = self.get_height()
+
+        # Refuse to fork the stored chain if another writer got there first
+        if height is not None and height != stored_height:
+            raise Exception(f'Block store is at height {stored_height}, cannot append block {height}')
+        if stored_height > 0 and block.previous_hash != self.get_hash(stored_height - 1):
+            raise Exception('Block does not extend the stored chain tip')
+
+        # Data goes right after the last indexed block, dropping anything a crash left behind
+        if stored_height > 0:
+            segment, offset, length, _ = self._read_index_entry(stored_height - 1)
+            offset += length
+            if offset >= self.segment_size:
+                segment, offset = segment + 1, 0
+        else:
+            segment, offset = 0, 0
+
+        data = block.to_bytes()
+
+        os.makedirs(self.path, exist_ok=True)
+        segment_path = self._segment_path(segment)
+        with open(segment_path, 'r+b' if os.path.exists(segment_path) else 'wb') as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The index entry is written last, so a block only counts once its data is on disk
+        with open(self._index_path(), 'r+b' if os.path.exists(self._index_path()) else 'wb') as f:
+            f.seek(stored_height * INDEX_RECORD.size)
+            f.write(INDEX_RECORD.pack(segment, offset, len(data), bytes.fromhex(block.hash)))
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+        return stored_height
+
+    def open_reader(self) -> 'BlockReader':
+
+        return BlockReader(self)
+
+    def read_block(self, height: int):
+
+        with self.open_reader() as reader:
+            return reader.read_block(height)
+
+    def read_blocks(self, start: int = 0, stop: Optional[int] = None) -> Iterator:
+
+        with self.open_reader() as reader:
+            yield from reader.read_blocks(start, stop)
+
+    def read_meta(self) -> dict:
+
+        with open(os.path.join(self.path, META_FILE)) as f:
+            return json.load(f)
+
+    def write_meta(self, meta: dict) -> None:
+
+        os.makedirs(self.path, exist_ok=True)
+
+        # Write-and-rename so readers never see a half-written file
+        meta_path = os.path.join(self.path, META_FILE)
+        temp_path = meta_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, meta_path)
+
+    def __len__(self) -> int:
+
+        return self.get_height()
+
+    def __str__(self) -> str:
+
+        return f"BlockStore(path={self.path}, blocks={self.get_height()})"
+
+    def __repr__(self) -> str:
+
+        return self.__str__()
+
+
+class StoreLock:
+
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.file = None
+
+    def __enter__(self) -> 'StoreLock':
+
+        held = _held_locks.__dict__.setdefault('counts', {})
+        count = held.get(self.path, 0)
+
+        # A thread already holding the lock can take it again
+        if count == 0:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, 'a+b')
+            try:
+                self._acquire()
+            except BaseException:
+                self.file.close()
+                self.file = None
+                raise
+
+        held[self.path] = count + 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        held = _held_locks.counts
+        held[self.path] -= 1
+
+        if held[self.path] == 0:
+            del held[self.path]
+            self._release()
+            self.file.close()
+            self.file = None
+
+    def _acquire(self) -> None:
+
+        # Blocks until other processes and threads have released it
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            return
+
+        # msvcrt gives up after about 10 seconds, so keep trying
+        self.file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def _release(self) -> None:
+
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BlockReader:
+
+
+    def __init__(self, store: BlockStore):
+
+        self.store = store
+
+        # Files are memory-mapped, so only the pages of blocks actually decoded are read
+        self.index = self._map(store._index_path())
+        self.segments = {}
+
+        # Blocks appended after the reader was opened are not seen
+        self.height = len(self.index) // INDEX_RECORD.size if self.index is not None else 0
+
+    @staticmethod
+    def _map(path: str):
+
+        try:
+            with open(path, 'rb') as f:
+                # Empty files cannot be mapped
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def _segment(self, segment: int):
+
+        if segment not in self.segments:
+            self.segments[segment] = self._map(self.store._segment_path(segment))
+
+        return self.segments[segment]
+
+    def get_index_entry(self, height: int) -> Tuple[int, int, int, bytes]:
+
+        if height < 0 or height >= self.height:
+            raise IndexError(f'No block at height {height}')
+
+        return INDEX_RECORD.unpack_from(self.index, height * INDEX_RECORD.size)
+
+    def get_hash(self, height: int) -> str:
+
+        return self.get_index_entry(height)[3].hex()
+
+    def read_block(self, height: int):
+
+        segment, offset, _, _ = self.get_index_entry(height)
+        return decode_block(self._segment(segment), offset)[0]
+
+    def read_blocks(self, start: int = 0, stop: Optional[int] = None) -> Iterator:
+
+        stop = self.height if stop is None else min(stop, self.height)
+
+        for height in range(max(start, 0), stop):
+            yield self.read_block(height)
+
+    def close(self) -> None:
+
+        for data in self.segments.values():
+            if data is not None:
+                data.close()
+        self.segments.clear()
+
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def __enter__(self) -> 'BlockReader':
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.close()
+
+    def __len__(self) -> int:
+
+        return self.height
+
+    def __str__(self) -> str:
+
+        return f"BlockReader(path={self.store.path}, blocks={self.height})"
+
+    def __repr__(self) -> str:
+
+        return self.__str__()
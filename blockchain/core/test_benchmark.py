@@ -0,0 +1,40 @@
+import json
+
+from blockchain.core.benchmark import QUICK_CONFIG, compare_results, main, run_benchmarks
+
+
+def test_quick_benchmarks_report_every_metric():
+    report = run_benchmarks(QUICK_CONFIG)
+    names = {result['name'] for result in report['results']}
+
+    assert names == {
+        'mine_block', 'is_chain_valid', 'get_balance_of_address',
+        'to_dict_from_dict', 'sign', 'verify', 'verify_cached',
+        'backend_sign', 'backend_verify', 'backend_speedup',
+        'encode_block', 'decode_block', 'hash_block', 'hash_transaction',
+        'encoded_size', 'encoding_speedup',
+    }
+    assert all(result['value'] > 0 for result in report['results'])
+    json.dumps(report)
+
+
+def test_compare_flags_slowdowns_only():
+    baseline = {'results': [
+        {'name': 'verify', 'params': {}, 'value': 100.0, 'unit': 'signatures/s', 'higher_is_better': True},
+        {'name': 'is_chain_valid', 'params': {}, 'value': 1.0, 'unit': 's', 'higher_is_better': False},
+    ]}
+    current = {'results': [
+        {'name': 'verify', 'params': {}, 'value': 50.0, 'unit': 'signatures/s', 'higher_is_better': True},
+        {'name': 'is_chain_valid', 'params': {}, 'value': 0.5, 'unit': 's', 'higher_is_better': False},
+    ]}
+
+    regressions = compare_results(current, baseline)
+
+    assert [regression['name'] for regression in regressions] == ['verify']
+
+
+def test_cli_writes_json(tmp_path):
+    output = tmp_path / 'bench.json'
+
+    assert main(['--quick', '--output', str(output)]) == 0
+    assert json.loads(output.read_text())['results']
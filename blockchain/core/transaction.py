@@ -5,6 +5,8 @@ import json
 from time import time
 from typing import Optional
 
+from .encoding import CURRENT_VERSION, LEGACY_VERSION, decode_transaction, encode_transaction, encode_transaction_payload
+
 
 class Transaction:
 
@@ -16,11 +18,24 @@ class Transaction:
         self.amount = amount
         self.timestamp = time()
         self.signature = None
+        self.version = CURRENT_VERSION
 
     def calculate_hash(self) -> str:
 
-        transaction_string = f"{self.from_address}{self.to_address}{self.amount}{self.timestamp}"
-        return hashlib.sha256(transaction_string.encode()).hexdigest()
+        if self.version == LEGACY_VERSION:
+            transaction_string = f"{self.from_address}{self.to_address}{self.amount}{self.timestamp}"
+            return hashlib.sha256(transaction_string.encode()).hexdigest()
+
+        return hashlib.sha256(encode_transaction_payload(self)).hexdigest()
+
+    def calculate_txid(self) -> str:
+
+        # Unlike calculate_hash this also covers the signature
+        if self.version == LEGACY_VERSION:
+            transaction_string = json.dumps(self.to_dict(), sort_keys=True)
+            return hashlib.sha256(transaction_string.encode()).hexdigest()
+
+        return hashlib.sha256(self.to_bytes()).hexdigest()
 
     def sign(self, wallet):
 
@@ -42,7 +57,7 @@ class Transaction:
         if not self.signature or len(self.signature) == 0:
             raise Exception('No signature in this transaction')
 
-        # Verify signature
+        # Verify signature (served from the verified-signature cache when seen before)
         from .wallet import Wallet
         return Wallet.verify_signature(
             self.from_address,
@@ -52,7 +67,7 @@ class Transaction:
 
     def to_dict(self) -> dict:
 
-        return {
+        data = {
             'from': self.from_address,
             'to': self.to_address,
             'amount': self.amount,
@@ -60,6 +75,16 @@ class Transaction:
             'signature': self.signature
         }
 
+        # Legacy transactions keep their original shape, which their txid is computed from
+        if self.version != LEGACY_VERSION:
+            data['version'] = self.version
+
+        return data
+
+    def to_bytes(self) -> bytes:
+
+        return encode_transaction(self)
+
     @classmethod
     def from_dict(cls, data: dict) -> 'Transaction':
 
@@ -70,8 +95,16 @@ class Transaction:
         )
         tx.timestamp = data.get('timestamp', time())
         tx.signature = data.get('signature')
+
+        # Transactions saved before format versions used the legacy hashing
+        tx.version = data.get('version', LEGACY_VERSION)
         return tx
 
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Transaction':
+
+        return decode_transaction(data)[0]
+
     def __str__(self) -> str:
 
         return f"Transaction({self.from_address[:20] if self.from_address else 'MINING'}... → {self.to_address[:20]}... : {self.amount})"
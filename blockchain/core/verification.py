@@ -0,0 +1,138 @@
+from typing import List, Optional, Tuple
+
+# Signatures handed to a pool worker at a time
+CHUNK_SIZE = 64
+
+
+def get_signature_item(tx) -> Tuple[str, str, str]:
+
+    # (public key, signed message, signature) as passed to Wallet.verify_signature
+    return tx.from_address, tx.calculate_hash(), tx.signature or ''
+
+
+def _verify_chunk(items: List[Tuple[str, str, str]]) -> Optional[int]:
+
+    from .wallet import Wallet
+
+    for i, (public_key, data, signature) in enumerate(items):
+        if not signature or not Wallet.verify_signature(public_key, data, signature):
+            return i
+
+    return None
+
+
+def _failed_in_chunk(items: List[Tuple[str, str, str]]) -> List[int]:
+
+    from .wallet import Wallet
+
+    return [
+        i for i, (public_key, data, signature) in enumerate(items)
+        if not signature or not Wallet.verify_signature(public_key, data, signature)
+    ]
+
+
+def _split_unverified(items: List[Tuple[str, str, str]], chunk_size: int) -> Tuple[List[int], List[list]]:
+
+    from .cache import signature_cache
+
+    # Pool workers have their own caches, so only ship what this process hasn't verified yet
+    unverified = [i for i, item in enumerate(items) if not signature_cache.get(item)]
+
+    chunks = [
+        [items[i] for i in unverified[start:start + chunk_size]]
+        for start in range(0, len(unverified), chunk_size)
+    ]
+
+    return unverified, chunks
+
+
+def _remember_verified(items: List[Tuple[str, str, str]], indices: List[int]) -> None:
+
+    from .cache import signature_cache
+
+    for i in indices:
+        signature_cache.put(items[i], True)
+
+
+def find_invalid_signature(items: List[Tuple[str, str, str]], workers: int = 1,
+                           chunk_size: int = CHUNK_SIZE) -> Optional[int]:
+
+    # Not worth starting processes for a handful of signatures
+    if workers <= 1 or len(items) <= chunk_size:
+        return _verify_chunk(items)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    unverified, chunks = _split_unverified(items, chunk_size)
+    if not unverified:
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_verify_chunk, chunk) for chunk in chunks]
+
+        try:
+            # Results are read in order so the earliest failure is reported
+            for n, future in enumerate(futures):
+                failed = future.result()
+                if failed is not None:
+                    return unverified[n * chunk_size + failed]
+        finally:
+            # Stop early: chunks that have not started yet are dropped
+            for future in futures:
+                future.cancel()
+
+    _remember_verified(items, unverified)
+
+    return None
+
+
+def find_invalid_signatures(items: List[Tuple[str, str, str]], workers: int = 1,
+                            chunk_size: int = CHUNK_SIZE) -> List[int]:
+
+    # Like find_invalid_signature, but checks everything and reports every failure
+    if workers <= 1 or len(items) <= chunk_size:
+        return _failed_in_chunk(items)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    unverified, chunks = _split_unverified(items, chunk_size)
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for n, chunk_failed in enumerate(executor.map(_failed_in_chunk, chunks)):
+            failed += [unverified[n * chunk_size + i] for i in chunk_failed]
+
+    failed_set = set(failed)
+    _remember_verified(items, [i for i in unverified if i not in failed_set])
+
+    return failed
+
+
+def collect_signature_items(transactions: List) -> Tuple[List[int], List[Tuple[str, str, str]]]:
+
+    from .transaction import Transaction
+
+    positions = []
+    items = []
+
+    for position, tx in enumerate(transactions):
+        # Convert dict to Transaction if needed
+        if isinstance(tx, dict):
+            tx = Transaction.from_dict(tx)
+
+        # Mining reward transactions don't need signature
+        if tx.from_address is None:
+            continue
+
+        positions.append(position)
+        items.append(get_signature_item(tx))
+
+    return positions, items
+
+
+def find_invalid_transaction(transactions: List, workers: int = 1) -> Optional[int]:
+
+    positions, items = collect_signature_items(transactions)
+    failed = find_invalid_signature(items, workers)
+
+    return positions[failed] if failed is not None else None
@@ -1,53 +1,56 @@
-
-import hashlib
-from ecdsa import SigningKey, VerifyingKey, SECP256k1, BadSignatureError
 from typing import Optional
 
+from .cache import signature_cache
+from .crypto import get_backend
+
 
 class Wallet:
 
 
     def __init__(self, private_key: Optional[str] = None):
 
+        backend = get_backend()
+
         if private_key:
             # Load existing wallet from private key
-            self.signing_key = SigningKey.from_string(
-                bytes.fromhex(private_key),
-                curve=SECP256k1
-            )
+            self.private_key = private_key
         else:
             # Generate new key pair
-            self.signing_key = SigningKey.generate(curve=SECP256k1)
+            self.private_key = backend.generate_private_key()
 
-        # Get verifying key (public key)
-        self.verifying_key = self.signing_key.get_verifying_key()
+        # Derive the public key (address)
+        self.public_key = backend.get_public_key(self.private_key)
 
     def get_private_key(self) -> str:
 
-        return self.signing_key.to_string().hex()
+        return self.private_key
 
     def get_public_key(self) -> str:
 
-        return self.verifying_key.to_string().hex()
+        return self.public_key
 
     def sign_data(self, data: str) -> str:
 
-        signature = self.signing_key.sign(data.encode())
-        return signature.hex()
+        return get_backend().sign(self.private_key, data)
 
     @staticmethod
     def verify_signature(public_key: str, data: str, signature: str) -> bool:
 
-        try:
-            verifying_key = VerifyingKey.from_string(
-                bytes.fromhex(public_key),
-                curve=SECP256k1
-            )
-            verifying_key.verify(bytes.fromhex(signature), data.encode())
+        # Submitted transactions can carry anything, only hex strings can be a valid signature
+        if not all(isinstance(value, str) for value in (public_key, data, signature)):
+            return False
+
+        # Signatures that already verified don't need the curve math again
+        cache_key = (public_key, data, signature)
+        if signature_cache.get(cache_key):
             return True
-        except (BadSignatureError, ValueError):
+
+        if not get_backend().verify(public_key, data, signature):
             return False
 
+        signature_cache.put(cache_key, True)
+        return True
+
     @classmethod
     def from_private_key(cls, private_key: str) -> 'Wallet':
 
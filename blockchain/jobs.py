@@ -0,0 +1,184 @@
+# blockchain/jobs.py
+"""
+Background mining jobs
+
+Proof-of-work runs on a local thread pool so the request that submits a
+job returns immediately. The mined block is stored on the MiningJob row
+and committed to the job's chain by the worker as soon as it is found;
+should that fail, the next request that loads the chain commits it.
+Jobs still queued or running after MINING_JOB_TIMEOUT seconds are taken
+to have lost their worker (a restarted process) and are marked failed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import MiningJob
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Get the process-wide mining thread pool, creating it on first use
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.MINING_JOB_WORKERS,
+                thread_name_prefix='mining-job'
+            )
+
+    return _executor
+
+
+def submit_mining_job(session_key, blockchain, miner_address):
+    """
+    Queue a mining job for the given stored chain and return it without waiting
+    """
+    job = MiningJob.objects.create(
+        session_key=session_key,
+        chain_id=blockchain.store.chain_id,
+        miner_address=miner_address,
+        transaction_count=len(blockchain.pending_transactions),
+    )
+
+    # The worker only needs the tip, target and pending transactions, not the whole chain
+    args = (job.pk, blockchain.get_mining_work(), blockchain.mining_workers)
+
+    if settings.MINING_JOBS_ASYNC:
+        get_executor().submit(run_mining_job, *args)
+    else:
+        run_mining_job(*args)
+
+    return job
+
+
+def run_mining_job(job_id, work, mining_workers):
+    """
+    Mine a block from Blockchain.get_mining_work() output and store it on the job
+    """
+    from .core.blockchain import Blockchain
+
+    try:
+        job = MiningJob.objects.get(pk=job_id)
+
+        # Updates skip jobs abandoned in the meantime (their chain was reset)
+        pending = MiningJob.objects.filter(pk=job_id, committed=False)
+        pending.update(status=MiningJob.STATUS_RUNNING, started_at=timezone.now())
+
+        try:
+            block = Blockchain.mine_work(work, job.miner_address, mining_workers)
+            print('Block successfully mined!')
+            result = {'status': MiningJob.STATUS_DONE, 'block_data': block.to_dict()}
+        except Exception as e:
+            result = {'status': MiningJob.STATUS_FAILED, 'error': str(e)}
+
+        pending.update(finished_at=timezone.now(), **result)
+
+        if result['status'] == MiningJob.STATUS_DONE:
+            commit_chain_jobs(job.chain_id)
+    finally:
+        if settings.MINING_JOBS_ASYNC:
+            close_old_connections()
+
+
+def has_finished_jobs(chain_id):
+    """
+    Whether the chain has mined blocks waiting to be committed
+    """
+    if not chain_id:
+        return False
+
+    return MiningJob.objects.filter(
+        chain_id=chain_id,
+        status=MiningJob.STATUS_DONE,
+        committed=False
+    ).exists()
+
+
+def commit_finished_jobs(blockchain):
+    """
+    Append blocks of the chain's finished jobs, returns True if the chain changed
+    """
+    from .core.block import Block
+
+    jobs = MiningJob.objects.filter(
+        chain_id=blockchain.store.chain_id,
+        status=MiningJob.STATUS_DONE,
+        committed=False
+    ).order_by('created_at')
+
+    changed = False
+
+    for job in jobs:
+        try:
+            blockchain.add_block(Block.from_dict(job.block_data))
+            job.block_index = len(blockchain.chain) - 1
+            changed = True
+        except Exception as e:
+            # The chain moved on (e.g. reset or another block) while this job was mining
+            job.status = MiningJob.STATUS_FAILED
+            job.error = f'Mined block could not be committed: {str(e)}'
+
+        job.committed = True
+        job.save(update_fields=['status', 'error', 'block_index', 'committed'])
+
+    return changed
+
+
+def commit_chain_jobs(chain_id):
+    """
+    Commit the finished jobs of a stored chain under its lock
+    """
+    from .views import get_block_store, load_blockchain, store_blockchain
+
+    store = get_block_store(chain_id)
+
+    try:
+        with store.lock():
+            # The chain may have been reset while the job was mining
+            blockchain = load_blockchain(store)
+            if blockchain is not None and commit_finished_jobs(blockchain):
+                store_blockchain(blockchain)
+    except Exception as e:
+        # The block stays on the job, and the next request for the chain tries again
+        print(f'Mined block could not be committed to chain {chain_id}: {e}')
+
+
+def fail_lost_jobs():
+    """
+    Fail queued or running jobs older than MINING_JOB_TIMEOUT, returns how many
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MINING_JOB_TIMEOUT)
+
+    return MiningJob.objects.filter(
+        status__in=[MiningJob.STATUS_QUEUED, MiningJob.STATUS_RUNNING],
+        created_at__lt=cutoff,
+        committed=False
+    ).update(
+        status=MiningJob.STATUS_FAILED,
+        error='The job did not finish in time, its worker was probably restarted',
+        finished_at=timezone.now(),
+        committed=True
+    )
+
+
+def abandon_jobs(chain_id):
+    """
+    Fail the uncommitted jobs of a chain that is being removed
+    """
+    MiningJob.objects.filter(chain_id=chain_id, committed=False).update(
+        status=MiningJob.STATUS_FAILED,
+        error='The chain was reset before the mined block could be committed',
+        committed=True
+    )
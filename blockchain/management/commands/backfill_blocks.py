@@ -0,0 +1,46 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blockchain import records
+from blockchain.core.storage import BlockStore
+from blockchain.models import BlockchainSnapshot
+
+
+class Command(BaseCommand):
+
+    help = 'Fill the block and transaction tables from saved snapshots and block stores'
+
+    def add_arguments(self, parser):
+
+        parser.add_argument('--skip-stores', action='store_true',
+                            help='Only index snapshots, not the block stores under BLOCK_STORE_DIR')
+
+    def handle(self, *args, **options):
+
+        # Snapshots are indexed one at a time so large ones are not all in memory together
+        snapshot_blocks = 0
+        snapshot_ids = BlockchainSnapshot.objects.values_list('pk', flat=True)
+        for snapshot_id in snapshot_ids:
+            snapshot = BlockchainSnapshot.objects.get(pk=snapshot_id)
+            added = records.index_snapshot(snapshot)
+            snapshot_blocks += added
+            if added:
+                self.stdout.write(f'Snapshot "{snapshot.name}": {added} blocks indexed')
+
+        # Rows of deleted snapshots are not needed anymore
+        pruned = records.prune_snapshot_rows()
+        if pruned:
+            self.stdout.write(f'Removed the rows of {pruned} deleted snapshots')
+
+        store_blocks = 0
+        if not options['skip_stores'] and os.path.isdir(settings.BLOCK_STORE_DIR):
+            for name in sorted(os.listdir(settings.BLOCK_STORE_DIR)):
+                store = BlockStore(os.path.join(settings.BLOCK_STORE_DIR, name))
+                if store.exists():
+                    store_blocks += records.index_store(store)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {snapshot_blocks} snapshot blocks and {store_blocks} stored blocks'
+        ))
@@ -0,0 +1,98 @@
+import os
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blockchain import records
+from blockchain.core.storage import META_FILE, BlockStore
+from blockchain.models import BlockModel, MiningJob
+
+
+class Command(BaseCommand):
+
+    help = 'Delete the block stores and rows of chains no live session uses anymore'
+
+    def add_arguments(self, parser):
+
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Keep stores written to within this many seconds (default 3600); '
+                                 'a request may be about to save them in its session')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only list what would be deleted')
+
+    def _live_chain_ids(self):
+
+        # The chain ids held by sessions that have not expired yet
+        chain_ids = set()
+        sessions = Session.objects.filter(expire_date__gt=timezone.now())
+        for session in sessions.iterator():
+            chain_ref = session.get_decoded().get(settings.BLOCKCHAIN_SESSION_KEY)
+            if isinstance(chain_ref, str) and chain_ref:
+                chain_ids.add(chain_ref)
+
+        return chain_ids
+
+    def _is_kept(self, chain_id, live):
+
+        # The shared chain, the fresh chain of sessions without one and snapshot rows have no session
+        return (
+            chain_id in live
+            or chain_id == settings.SHARED_CHAIN_ID
+            or chain_id.startswith('new-')
+            or chain_id.startswith(records.SNAPSHOT_CHAIN_PREFIX)
+        )
+
+    def _remove(self, chain_id):
+
+        records.delete_chain_rows(chain_id)
+        MiningJob.objects.filter(chain_id=chain_id).delete()
+
+    def handle(self, *args, **options):
+
+        live = self._live_chain_ids()
+        cutoff = time.time() - options['min_age']
+        dry_run = options['dry_run']
+
+        stores = 0
+        recent = set()
+        if os.path.isdir(settings.BLOCK_STORE_DIR):
+            for name in sorted(os.listdir(settings.BLOCK_STORE_DIR)):
+                if self._is_kept(name, live):
+                    continue
+
+                store = BlockStore(os.path.join(settings.BLOCK_STORE_DIR, name))
+                with store.lock():
+                    # Checked under the lock, so a store being written to right now is left alone
+                    meta_path = os.path.join(store.path, META_FILE)
+                    if os.path.exists(meta_path) and os.path.getmtime(meta_path) > cutoff:
+                        recent.add(name)
+                        continue
+
+                    stores += 1
+                    if dry_run:
+                        self.stdout.write(f'Would delete store {name}')
+                        continue
+
+                    store.delete()
+                    self._remove(name)
+
+        # Rows whose store is gone already, deleted by hand or by an earlier run
+        indexed = set(BlockModel.objects.values_list('chain_id', flat=True).distinct())
+        orphans = sorted(
+            chain_id for chain_id in indexed
+            if not self._is_kept(chain_id, live) and chain_id not in recent
+            and not os.path.isdir(os.path.join(settings.BLOCK_STORE_DIR, chain_id))
+        )
+        for chain_id in orphans:
+            if dry_run:
+                self.stdout.write(f'Would delete the rows of {chain_id}')
+            else:
+                self._remove(chain_id)
+
+        action = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {stores} unused block stores and the rows of {len(orphans)} more chains'
+        ))
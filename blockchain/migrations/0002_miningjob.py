@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-17 02:59
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MiningJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(db_index=True, max_length=40, verbose_name='Session Key')),
+                ('miner_address', models.CharField(max_length=500, verbose_name='Miner Address')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10, verbose_name='Status')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='Transaction Count')),
+                ('block_data', models.JSONField(blank=True, null=True, verbose_name='Mined Block')),
+                ('block_index', models.IntegerField(blank=True, null=True, verbose_name='Block Index')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('committed', models.BooleanField(default=False, verbose_name='Committed')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+            ],
+            options={
+                'verbose_name': 'Mining Job',
+                'verbose_name_plural': 'Mining Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
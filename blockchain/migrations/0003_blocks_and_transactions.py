@@ -0,0 +1,88 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0002_miningjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.CharField(max_length=64, verbose_name='Chain ID')),
+                ('height', models.IntegerField(verbose_name='Height')),
+                ('hash', models.CharField(max_length=64, verbose_name='Block Hash')),
+                ('previous_hash', models.CharField(max_length=64, verbose_name='Previous Hash')),
+                ('merkle_root', models.CharField(max_length=64, verbose_name='Merkle Root')),
+                ('timestamp', models.FloatField(verbose_name='Timestamp')),
+                ('nonce', models.BigIntegerField(verbose_name='Nonce')),
+                ('version', models.SmallIntegerField(default=1, verbose_name='Format Version')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='Transaction Count')),
+            ],
+            options={
+                'verbose_name': 'Block',
+                'verbose_name_plural': 'Blocks',
+                'ordering': ['chain_id', 'height'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain_id', models.CharField(max_length=64, verbose_name='Chain ID')),
+                ('height', models.IntegerField(verbose_name='Block Height')),
+                ('position', models.IntegerField(verbose_name='Position in Block')),
+                ('txid', models.CharField(max_length=64, verbose_name='Transaction ID')),
+                ('from_address', models.CharField(blank=True, max_length=500, null=True, verbose_name='From Address')),
+                ('to_address', models.CharField(max_length=500, verbose_name='To Address')),
+                ('amount', models.FloatField(verbose_name='Amount')),
+                ('timestamp', models.FloatField(verbose_name='Timestamp')),
+                ('signature', models.TextField(blank=True, null=True, verbose_name='Digital Signature')),
+                ('version', models.SmallIntegerField(default=1, verbose_name='Format Version')),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_rows', to='blockchain.blockmodel', verbose_name='Block')),
+            ],
+            options={
+                'verbose_name': 'Transaction',
+                'verbose_name_plural': 'Transactions',
+                'ordering': ['chain_id', 'height', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='blockmodel',
+            index=models.Index(fields=['chain_id', 'hash'], name='block_hash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blockmodel',
+            index=models.Index(fields=['chain_id', 'timestamp'], name='block_timestamp_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='blockmodel',
+            constraint=models.UniqueConstraint(fields=('chain_id', 'height'), name='unique_block_height'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['chain_id', 'txid'], name='transaction_txid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['chain_id', 'from_address', 'height', 'position'], name='transaction_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['chain_id', 'to_address', 'height', 'position'], name='transaction_to_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['chain_id', 'timestamp'], name='transaction_timestamp_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transactionmodel',
+            constraint=models.UniqueConstraint(fields=('chain_id', 'height', 'position'), name='unique_transaction_position'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_chain_heights(apps, schema_editor):
+    # Full snapshots saved earlier can then serve as parents of delta snapshots
+    BlockchainSnapshot = apps.get_model('blockchain', 'BlockchainSnapshot')
+
+    for snapshot in BlockchainSnapshot.objects.exclude(blockchain_data=None).iterator():
+        chain = snapshot.blockchain_data.get('chain', [])
+        snapshot.chain_height = len(chain)
+        snapshot.tip_hash = chain[-1]['hash'] if chain else ''
+        snapshot.save(update_fields=['chain_height', 'tip_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0003_blocks_and_transactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='base_height',
+            field=models.IntegerField(default=0, verbose_name='First Stored Block'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='chain_height',
+            field=models.IntegerField(default=0, verbose_name='Chain Height'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='compression',
+            field=models.CharField(choices=[('none', 'None'), ('zlib', 'zlib'), ('lzma', 'LZMA')], default='none', max_length=4, verbose_name='Compression'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='delta_data',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Delta Data'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='depth',
+            field=models.IntegerField(default=0, verbose_name='Parents to Walk'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='children', to='blockchain.blockchainsnapshot', verbose_name='Parent Snapshot'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='tip_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Tip Hash'),
+        ),
+        migrations.AlterField(
+            model_name='blockchainsnapshot',
+            name='blockchain_data',
+            field=models.JSONField(blank=True, null=True, verbose_name='Blockchain Data'),
+        ),
+        migrations.RunPython(fill_chain_heights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:21
+
+import json
+
+from django.db import migrations, models
+
+
+def fill_summaries(apps, schema_editor):
+    BlockchainSnapshot = apps.get_model('blockchain', 'BlockchainSnapshot')
+
+    for snapshot in BlockchainSnapshot.objects.iterator():
+        if snapshot.delta_data is not None:
+            # Pending counts of delta snapshots need the parents replayed; they show as 0
+            snapshot.payload_size = len(snapshot.delta_data)
+        elif snapshot.blockchain_data:
+            snapshot.payload_size = len(json.dumps(snapshot.blockchain_data))
+            snapshot.pending_count = len(snapshot.blockchain_data.get('pending_transactions', []))
+        snapshot.save(update_fields=['payload_size', 'pending_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0004_delta_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='payload_size',
+            field=models.IntegerField(default=0, verbose_name='Payload Size (bytes)'),
+        ),
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='pending_count',
+            field=models.IntegerField(default=0, verbose_name='Pending Transactions'),
+        ),
+        migrations.AddIndex(
+            model_name='blockchainsnapshot',
+            index=models.Index(fields=['-created_at'], name='snapshot_created_idx'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
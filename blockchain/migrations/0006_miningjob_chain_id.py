@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0005_snapshot_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='miningjob',
+            name='chain_id',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Chain ID'),
+        ),
+    ]
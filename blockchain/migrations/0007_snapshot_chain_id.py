@@ -0,0 +1,24 @@
+# Generated by Django 4.2.27 on 2026-10-17 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0006_miningjob_chain_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockchainsnapshot',
+            name='chain_id',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Chain ID'),
+        ),
+        migrations.AlterField(
+            model_name='blockchainsnapshot',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='blockchain.blockchainsnapshot', verbose_name='Parent Snapshot'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import json
+
 
 
 from django.db import models
@@ -22,8 +24,31 @@ class WalletModel(models.Model):
 
 class BlockchainSnapshot(models.Model):
 
+    COMPRESSION_NONE = 'none'
+    COMPRESSION_ZLIB = 'zlib'
+    COMPRESSION_LZMA = 'lzma'
+    COMPRESSION_CHOICES = [
+        (COMPRESSION_NONE, 'None'),
+        (COMPRESSION_ZLIB, 'zlib'),
+        (COMPRESSION_LZMA, 'LZMA'),
+    ]
+
     name = models.CharField(max_length=200, verbose_name="Snapshot Name")
-    blockchain_data = models.JSONField(verbose_name="Blockchain Data")
+    # Full chain of snapshots saved before delta snapshots; new ones use delta_data
+    blockchain_data = models.JSONField(null=True, blank=True, verbose_name="Blockchain Data")
+    # Block store of the chain the snapshot was taken from; parents are only looked for among the same chain's
+    chain_id = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Chain ID")
+    # Children of a deleted parent are first rewritten as full snapshots (see snapshots.rebase_children)
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='children', verbose_name="Parent Snapshot")
+    depth = models.IntegerField(default=0, verbose_name="Parents to Walk")
+    base_height = models.IntegerField(default=0, verbose_name="First Stored Block")
+    chain_height = models.IntegerField(default=0, verbose_name="Chain Height")
+    tip_hash = models.CharField(max_length=64, blank=True, verbose_name="Tip Hash")
+    compression = models.CharField(max_length=4, choices=COMPRESSION_CHOICES, default=COMPRESSION_NONE, verbose_name="Compression")
+    delta_data = models.BinaryField(null=True, blank=True, verbose_name="Delta Data")
+    # Summary columns so listings never have to load the payload
+    pending_count = models.IntegerField(default=0, verbose_name="Pending Transactions")
+    payload_size = models.IntegerField(default=0, verbose_name="Payload Size (bytes)")
     difficulty = models.IntegerField(verbose_name="Difficulty Level")
     mining_reward = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Mining Reward")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
@@ -32,6 +57,23 @@ class BlockchainSnapshot(models.Model):
         verbose_name = "Blockchain Snapshot"
         verbose_name_plural = "Blockchain Snapshots"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='snapshot_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Summary columns are filled from the payload when the snapshot is created
+        if self._state.adding:
+            if self.delta_data is not None:
+                self.payload_size = len(self.delta_data)
+            elif self.blockchain_data:
+                chain = self.blockchain_data.get('chain', [])
+                self.payload_size = len(json.dumps(self.blockchain_data))
+                self.chain_height = len(chain)
+                self.tip_hash = chain[-1]['hash'] if chain else ''
+                self.pending_count = len(self.blockchain_data.get('pending_transactions', []))
+
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -53,4 +95,99 @@ class TransactionLog(models.Model):
         ordering = ['-timestamp']
 
     def __str__(self):
-        return f"{self.from_address[:20]}... → {self.to_address[:20]}... ({self.amount})"
\ No newline at end of file
+        return f"{self.from_address[:20]}... → {self.to_address[:20]}... ({self.amount})"
+
+class MiningJob(models.Model):
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    session_key = models.CharField(max_length=40, db_index=True, verbose_name="Session Key")
+    chain_id = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Chain ID")
+    miner_address = models.CharField(max_length=500, verbose_name="Miner Address")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name="Status")
+    transaction_count = models.IntegerField(default=0, verbose_name="Transaction Count")
+    block_data = models.JSONField(null=True, blank=True, verbose_name="Mined Block")
+    block_index = models.IntegerField(null=True, blank=True, verbose_name="Block Index")
+    error = models.TextField(blank=True, verbose_name="Error")
+    committed = models.BooleanField(default=False, verbose_name="Committed")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Created At")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started At")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished At")
+
+    class Meta:
+        verbose_name = "Mining Job"
+        verbose_name_plural = "Mining Jobs"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Mining job #{self.pk} ({self.status}) - {self.miner_address[:20]}..."
+
+
+class BlockModel(models.Model):
+
+    chain_id = models.CharField(max_length=64, verbose_name="Chain ID")
+    height = models.IntegerField(verbose_name="Height")
+    hash = models.CharField(max_length=64, verbose_name="Block Hash")
+    previous_hash = models.CharField(max_length=64, verbose_name="Previous Hash")
+    merkle_root = models.CharField(max_length=64, verbose_name="Merkle Root")
+    timestamp = models.FloatField(verbose_name="Timestamp")
+    nonce = models.BigIntegerField(verbose_name="Nonce")
+    version = models.SmallIntegerField(default=1, verbose_name="Format Version")
+    transaction_count = models.IntegerField(default=0, verbose_name="Transaction Count")
+
+    class Meta:
+        verbose_name = "Block"
+        verbose_name_plural = "Blocks"
+        ordering = ['chain_id', 'height']
+        constraints = [
+            models.UniqueConstraint(fields=['chain_id', 'height'], name='unique_block_height'),
+        ]
+        indexes = [
+            models.Index(fields=['chain_id', 'hash'], name='block_hash_idx'),
+            models.Index(fields=['chain_id', 'timestamp'], name='block_timestamp_idx'),
+        ]
+
+    def __str__(self):
+        return f"Block #{self.height} of {self.chain_id[:8]} - {self.hash[:20]}..."
+
+
+class TransactionModel(models.Model):
+
+    block = models.ForeignKey(BlockModel, on_delete=models.CASCADE, related_name='transaction_rows', verbose_name="Block")
+    chain_id = models.CharField(max_length=64, verbose_name="Chain ID")
+    height = models.IntegerField(verbose_name="Block Height")
+    position = models.IntegerField(verbose_name="Position in Block")
+    txid = models.CharField(max_length=64, verbose_name="Transaction ID")
+    from_address = models.CharField(max_length=500, null=True, blank=True, verbose_name="From Address")
+    to_address = models.CharField(max_length=500, verbose_name="To Address")
+    amount = models.FloatField(verbose_name="Amount")
+    timestamp = models.FloatField(verbose_name="Timestamp")
+    signature = models.TextField(null=True, blank=True, verbose_name="Digital Signature")
+    version = models.SmallIntegerField(default=1, verbose_name="Format Version")
+
+    class Meta:
+        verbose_name = "Transaction"
+        verbose_name_plural = "Transactions"
+        ordering = ['chain_id', 'height', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['chain_id', 'height', 'position'], name='unique_transaction_position'),
+        ]
+        indexes = [
+            models.Index(fields=['chain_id', 'txid'], name='transaction_txid_idx'),
+            models.Index(fields=['chain_id', 'from_address', 'height', 'position'], name='transaction_from_idx'),
+            models.Index(fields=['chain_id', 'to_address', 'height', 'position'], name='transaction_to_idx'),
+            models.Index(fields=['chain_id', 'timestamp'], name='transaction_timestamp_idx'),
+        ]
+
+    def __str__(self):
+        return f"{(self.from_address or 'MINING')[:20]}... → {self.to_address[:20]}... ({self.amount})"
@@ -0,0 +1,238 @@
+"""
+Indexed database rows for blocks and transactions
+
+The block store (or a snapshot) is the source of truth; BlockModel and
+TransactionModel rows mirror it so pages can look up blocks and address
+history with indexed queries instead of loading the whole chain.
+"""
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+
+from .models import BlockModel, TransactionModel
+
+# Rows of saved snapshots are stored under this prefix and the snapshot's id
+SNAPSHOT_CHAIN_PREFIX = 'snapshot-'
+
+
+def block_to_rows(chain_id, height, block):
+    """
+    Build unsaved rows for one block and its transactions
+    """
+    from .core.transaction import Transaction
+
+    block_row = BlockModel(
+        chain_id=chain_id,
+        height=height,
+        hash=block.hash,
+        previous_hash=block.previous_hash,
+        merkle_root=block.merkle_root,
+        timestamp=block.timestamp,
+        nonce=block.nonce,
+        version=block.version,
+        transaction_count=len(block.transactions),
+    )
+
+    transaction_rows = []
+    for position, tx in enumerate(block.transactions):
+        if isinstance(tx, dict):
+            tx = Transaction.from_dict(tx)
+
+        transaction_rows.append(TransactionModel(
+            chain_id=chain_id,
+            height=height,
+            position=position,
+            txid=tx.calculate_txid(),
+            from_address=tx.from_address,
+            to_address=tx.to_address,
+            amount=tx.amount,
+            timestamp=tx.timestamp,
+            signature=tx.signature,
+            version=tx.version,
+        ))
+
+    return block_row, transaction_rows
+
+
+def index_blocks(chain_id, blocks, start_height=0):
+    """
+    Insert rows for blocks stored at start_height, start_height + 1, ...
+    """
+    rows = [block_to_rows(chain_id, start_height + i, block) for i, block in enumerate(blocks)]
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        BlockModel.objects.bulk_create([block_row for block_row, _ in rows])
+
+        # Fetch the new primary keys, not every database returns them from bulk_create
+        block_ids = dict(
+            BlockModel.objects
+            .filter(chain_id=chain_id, height__gte=start_height)
+            .values_list('height', 'id')
+        )
+
+        transaction_rows = []
+        for block_row, block_transactions in rows:
+            for transaction_row in block_transactions:
+                transaction_row.block_id = block_ids[block_row.height]
+                transaction_rows.append(transaction_row)
+
+        TransactionModel.objects.bulk_create(transaction_rows, batch_size=500)
+
+    return len(rows)
+
+
+def snapshot_chain_id(snapshot):
+    """
+    Chain id the rows of a saved snapshot are stored under
+    """
+    return f'{SNAPSHOT_CHAIN_PREFIX}{snapshot.pk}'
+
+
+def index_snapshot(snapshot, blockchain=None):
+    """
+    Index the blocks of a snapshot that has no rows yet, returns how many were added
+    """
+    chain_id = snapshot_chain_id(snapshot)
+
+    # Snapshots never change once saved, so indexed ones are left alone
+    if get_indexed_height(chain_id) is not None:
+        return 0
+
+    if blockchain is None:
+        from .snapshots import load_snapshot_blockchain
+        blockchain = load_snapshot_blockchain(snapshot)
+
+    return index_blocks(chain_id, blockchain.chain)
+
+
+def prune_snapshot_rows():
+    """
+    Remove the rows of snapshots that no longer exist, returns how many snapshots were pruned
+    """
+    from .models import BlockchainSnapshot
+
+    indexed = set(
+        BlockModel.objects
+        .filter(chain_id__startswith=SNAPSHOT_CHAIN_PREFIX)
+        .values_list('chain_id', flat=True)
+        .distinct()
+    )
+    live = {snapshot_chain_id(snapshot) for snapshot in BlockchainSnapshot.objects.only('pk')}
+
+    for chain_id in indexed - live:
+        delete_chain_rows(chain_id)
+
+    return len(indexed - live)
+
+
+def get_indexed_height(chain_id):
+    """
+    Height of the highest indexed block of a chain, or None
+    """
+    return BlockModel.objects.filter(chain_id=chain_id).aggregate(height=Max('height'))['height']
+
+
+def _unindexed_start(store):
+    indexed_height = get_indexed_height(store.chain_id)
+    start = 0 if indexed_height is None else indexed_height + 1
+
+    # The store is append-only, so only blocks past the last indexed one can be new
+    return start if start < store.get_height() else None
+
+
+def index_store(store):
+    """
+    Index the blocks of a block store that have no rows yet, returns how many were added
+    """
+    # Most calls find nothing new, and those don't need to wait for the chain's lock
+    if _unindexed_start(store) is None:
+        return 0
+
+    # Concurrent callers would insert the same heights, so rows are only added under the lock
+    with store.lock():
+        start = _unindexed_start(store)
+        if start is None:
+            return 0
+
+        return index_blocks(store.chain_id, store.read_blocks(start), start)
+
+
+def delete_chain_rows(chain_id):
+    """
+    Remove the rows of a chain
+    """
+    TransactionModel.objects.filter(chain_id=chain_id).delete()
+    BlockModel.objects.filter(chain_id=chain_id).delete()
+
+
+def transaction_row_to_dict(row):
+    """
+    Transaction row in the Transaction.to_dict shape
+    """
+    data = {
+        'from': row.from_address,
+        'to': row.to_address,
+        'amount': row.amount,
+        'timestamp': row.timestamp,
+        'signature': row.signature,
+    }
+
+    if row.version != 1:
+        data['version'] = row.version
+
+    return data
+
+
+def _address_rows(chain_id, address):
+    return TransactionModel.objects.filter(
+        Q(from_address=address) | Q(to_address=address),
+        chain_id=chain_id,
+    )
+
+
+def get_address_balance(chain_id, address):
+    """
+    Received minus sent amounts of an address
+    """
+    rows = TransactionModel.objects.filter(chain_id=chain_id)
+    received = rows.filter(to_address=address).aggregate(total=Sum('amount'))['total'] or 0
+    sent = rows.filter(from_address=address).aggregate(total=Sum('amount'))['total'] or 0
+
+    return received - sent
+
+
+def get_address_transaction_count(chain_id, address):
+    """
+    Number of transactions that involve an address
+    """
+    return _address_rows(chain_id, address).count()
+
+
+def get_address_history(chain_id, address, limit=20, cursor=None):
+    """
+    Page of an address's transactions, newest first, like Blockchain.get_transaction_history
+
+    Returns (transaction dicts with block_index, next_cursor).
+    """
+    rows = _address_rows(chain_id, address)
+
+    # The cursor is the "height:position" of the last entry already returned
+    if cursor:
+        try:
+            height, position = (int(part) for part in cursor.split(':'))
+        except ValueError:
+            raise ValueError(f'Invalid cursor: {cursor}')
+        rows = rows.filter(Q(height__lt=height) | Q(height=height, position__lt=position))
+
+    # One extra row tells whether an older page exists
+    page = list(rows.order_by('-height', '-position')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    next_cursor = None
+    if has_more and page:
+        next_cursor = f'{page[-1].height}:{page[-1].position}'
+
+    return [dict(transaction_row_to_dict(row), block_index=row.height) for row in page], next_cursor
@@ -0,0 +1,220 @@
+"""
+Incremental, compressed blockchain snapshots
+
+A snapshot stores only the blocks after its parent snapshot plus the changes
+to the pending pool, so saving the same growing chain repeatedly costs
+storage for the new blocks only. Loading walks back to the nearest full
+snapshot and replays the deltas forward.
+"""
+
+import json
+import lzma
+import zlib
+
+from django.conf import settings
+
+from .core.cache import LRUCache
+from .models import BlockchainSnapshot
+
+# Materialized chains of recently loaded snapshots, keyed by snapshot id (snapshots never change)
+snapshot_cache = LRUCache(maxsize=8)
+
+_COMPRESSORS = {
+    BlockchainSnapshot.COMPRESSION_NONE: (lambda data: data, lambda data: data),
+    BlockchainSnapshot.COMPRESSION_ZLIB: (zlib.compress, zlib.decompress),
+    BlockchainSnapshot.COMPRESSION_LZMA: (lzma.compress, lzma.decompress),
+}
+
+
+def _pending_by_txid(pending):
+    from .core.transaction import Transaction
+
+    return {Transaction.from_dict(tx).calculate_txid(): tx for tx in pending}
+
+
+def find_parent(chain, chain_id):
+    """
+    Latest snapshot of the same chain whose blocks are a prefix of the given chain, or None
+
+    Every chain starts with the same genesis block, so snapshots of other
+    chains are never used even when their blocks match.
+    """
+    if not chain_id:
+        return None
+
+    length = len(chain)
+
+    candidates = (
+        BlockchainSnapshot.objects
+        .filter(chain_id=chain_id, chain_height__gt=0, chain_height__lte=length)
+        .order_by('-chain_height', '-created_at', '-pk')
+        .only('pk', 'chain_height', 'tip_hash', 'depth')
+    )
+
+    for candidate in candidates.iterator():
+        if chain[candidate.chain_height - 1].hash == candidate.tip_hash:
+            return candidate
+
+    return None
+
+
+def create_snapshot(name, blockchain):
+    """
+    Save a snapshot of the chain as a delta against the best parent snapshot
+    """
+    chain = blockchain.chain
+    state = blockchain._state_dict()
+    pending = state.pop('pending_transactions')
+
+    # Chains not saved to a block store yet have no id, and get a full snapshot
+    chain_id = blockchain.store.chain_id if blockchain.store is not None else ''
+    parent = find_parent(chain, chain_id)
+
+    # Long parent chains make loading slow, so start over with a full snapshot now and then
+    if parent is not None and parent.depth + 1 > settings.SNAPSHOT_MAX_DEPTH:
+        parent = None
+
+    if parent is None:
+        base_height = 0
+        pending_added = pending
+        pending_removed = []
+    else:
+        base_height = parent.chain_height
+        parent_pending = _pending_by_txid(materialize_snapshot(parent)['pending_transactions'])
+        current_pending = _pending_by_txid(pending)
+
+        pending_added = [tx for txid, tx in current_pending.items() if txid not in parent_pending]
+        pending_removed = [txid for txid in parent_pending if txid not in current_pending]
+
+    delta = {
+        'blocks': [block.to_dict() for block in chain[base_height:]],
+        'pending_added': pending_added,
+        'pending_removed': pending_removed,
+        'state': state,
+    }
+
+    compression = settings.SNAPSHOT_COMPRESSION
+    compress = _COMPRESSORS[compression][0]
+
+    return BlockchainSnapshot.objects.create(
+        name=name,
+        chain_id=chain_id,
+        parent=parent,
+        depth=0 if parent is None else parent.depth + 1,
+        base_height=base_height,
+        chain_height=len(chain),
+        tip_hash=chain[-1].hash,
+        pending_count=len(pending),
+        compression=compression,
+        delta_data=compress(json.dumps(delta).encode()),
+        difficulty=blockchain.difficulty,
+        mining_reward=blockchain.mining_reward,
+    )
+
+
+def _read_delta(snapshot):
+    decompress = _COMPRESSORS[snapshot.compression][1]
+    return json.loads(decompress(bytes(snapshot.delta_data)))
+
+
+def materialize_snapshot(snapshot):
+    """
+    Full chain data (Blockchain.to_dict shape) of a snapshot
+
+    The returned dict is shared with the cache and must not be modified.
+    """
+    cached = snapshot_cache.get(snapshot.pk)
+    if cached is not None:
+        return cached
+
+    # Snapshots saved before deltas hold the whole chain
+    if snapshot.delta_data is None:
+        data = snapshot.blockchain_data
+        snapshot_cache.put(snapshot.pk, data)
+        return data
+
+    # Collect deltas back to a full or already materialized snapshot
+    deltas = []
+    data = None
+    current = snapshot
+    while current is not None:
+        if current.pk != snapshot.pk:
+            data = snapshot_cache.get(current.pk)
+            if data is not None:
+                break
+
+        if current.delta_data is None:
+            data = current.blockchain_data
+            break
+
+        deltas.append(current)
+        current = current.parent
+
+    chain = list(data['chain']) if data else []
+    pending = _pending_by_txid(data['pending_transactions']) if data else {}
+
+    # Replay from the oldest delta forward
+    for current in reversed(deltas):
+        delta = _read_delta(current)
+
+        chain = chain[:current.base_height] + delta['blocks']
+        for txid in delta['pending_removed']:
+            pending.pop(txid, None)
+        pending.update(_pending_by_txid(delta['pending_added']))
+
+        data = dict(delta['state'], chain=chain, pending_transactions=list(pending.values()))
+
+    snapshot_cache.put(snapshot.pk, data)
+    return data
+
+
+def rebase_children(snapshot):
+    """
+    Rewrite the children of a snapshot about to be deleted as full snapshots
+
+    Their deltas are replayed while the parent still exists, and the
+    snapshots further down keep their deltas with fewer parents to walk.
+    """
+    for child in snapshot.children.all():
+        data = dict(materialize_snapshot(child))
+        chain = data.pop('chain')
+        pending = data.pop('pending_transactions')
+
+        delta = {
+            'blocks': chain,
+            'pending_added': pending,
+            'pending_removed': [],
+            'state': data,
+        }
+
+        compress = _COMPRESSORS[child.compression][0]
+        child.delta_data = compress(json.dumps(delta).encode())
+        child.payload_size = len(child.delta_data)
+        _shift_depth(child, child.depth)
+        child.parent = None
+        child.depth = 0
+        child.base_height = 0
+        child.save(update_fields=['delta_data', 'payload_size', 'parent', 'depth', 'base_height'])
+
+
+def _shift_depth(snapshot, shift):
+    for child in snapshot.children.all():
+        child.depth -= shift
+        child.save(update_fields=['depth'])
+        _shift_depth(child, shift)
+
+
+def rebase_children_on_delete(sender, instance, **kwargs):
+    """
+    pre_delete handler keeping the children of deleted snapshots loadable
+    """
+    rebase_children(instance)
+
+
+def load_snapshot_blockchain(snapshot):
+    """
+    Rebuild the Blockchain of a snapshot
+    """
+    from .core.blockchain import Blockchain
+
+    return Blockchain.from_dict(materialize_snapshot(snapshot))
@@ -1,3 +1,1841 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .core.block import Block
+from .core.blockchain import Blockchain
+from .core.cache import ChainCache, LRUCache, chain_cache, signature_cache, signing_key_cache, verifying_key_cache
+from .core.crypto import PRECOMPUTE_THRESHOLD, EcdsaBackend, available_backends, create_backend, get_backend, set_backend
+from .core.encoding import (
+    CURRENT_VERSION, LEGACY_VERSION, _pack_field, _pack_number, _pack_version, encode_transaction_payload,
+)
+from .core.merkle import build_merkle_proof, compute_merkle_root, verify_merkle_proof
+from .core.mining import difficulty_to_target, meets_target
+from .core.verification import find_invalid_signature, find_invalid_signatures
+from .core.transaction import Transaction
+from .core.storage import BlockStore
+from .core.wallet import Wallet
+from . import records
+from .models import BlockchainSnapshot, BlockModel, MiningJob
+from .snapshots import create_snapshot, load_snapshot_blockchain, materialize_snapshot, snapshot_cache
+from .views import get_block_store, new_blockchain
+
+# Keep block stores created through the views out of the project directory
+_block_store_dir = tempfile.mkdtemp(prefix='blockstore-')
+_block_store_settings = override_settings(BLOCK_STORE_DIR=_block_store_dir)
+
+
+def setUpModule():
+    _block_store_settings.enable()
+
+
+def tearDownModule():
+    _block_store_settings.disable()
+    shutil.rmtree(_block_store_dir, ignore_errors=True)
+
+
+def session_blockchain(client):
+    return Blockchain.from_store(get_block_store(client.session['blockchain_data']))
+
+
+def start_session_chain(client):
+    # Sessions only get a block store on their first change, so give this one a stored chain up front
+    blockchain = new_blockchain()
+    blockchain.attach_store(get_block_store(uuid.uuid4().hex))
+
+    session = client.session
+    session['blockchain_data'] = blockchain.store.chain_id
+    session.save()
+
+    return blockchain
+
+
+class MiningTests(TestCase):
+
+    def test_mined_hash_matches_calculate_hash(self):
+        transactions = [Transaction(None, Wallet().get_public_key(), 100) for _ in range(20)]
+        block = Block(timestamp=1700000000, transactions=transactions, previous_hash='0' * 64)
+        block.mine_block(3)
+
+        self.assertTrue(block.hash.startswith('000'))
+        self.assertEqual(block.hash, block.calculate_hash())
+
+    def test_mined_chain_is_valid(self):
+        blockchain = Blockchain(difficulty=2)
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+
+        self.assertTrue(blockchain.is_chain_valid())
+
+    def test_parallel_mining_produces_valid_block(self):
+        block = Block(timestamp=1700000000, transactions=[], previous_hash='0' * 64)
+        block.mine_block(3, workers=2)
+
+        self.assertTrue(block.hash.startswith('000'))
+        self.assertEqual(block.hash, block.calculate_hash())
+
+
+class TargetTests(TestCase):
+
+    def test_difficulty_target_matches_leading_zeros(self):
+        target = difficulty_to_target(2)
+
+        self.assertTrue(meets_target('00' + 'f' * 62, target))
+        self.assertFalse(meets_target('010' + '0' * 61, target))
+
+    def test_fast_blocks_make_target_harder(self):
+        blockchain = Blockchain(difficulty=1, target_block_time=1000, retarget_interval=3)
+        miner = Wallet().get_public_key()
+        for _ in range(3):
+            blockchain.mine_pending_transactions(miner)
+
+        # Blocks came far quicker than 1000s, so the adjustment is clamped at 4x
+        self.assertEqual(blockchain.get_target_at(2), blockchain.initial_target)
+        self.assertEqual(blockchain.get_target_at(3), blockchain.initial_target // 4)
+        self.assertTrue(meets_target(blockchain.chain[3].hash, blockchain.get_target_at(3)))
+        self.assertTrue(blockchain.is_chain_valid())
+
+    def test_retarget_measures_a_full_interval(self):
+        blockchain = Blockchain(difficulty=1, target_block_time=100, retarget_interval=3)
+        for height in range(1, 6):
+            blockchain.chain.append(Block(timestamp=height * 100, transactions=[], previous_hash=''))
+        blockchain.chain[2].timestamp = 0
+
+        # Gaps from block 2 to block 5: 500s where 300s were expected
+        target = blockchain.initial_target
+        self.assertEqual(blockchain._next_target(target, 6), target * 5 // 3)
+
+    def test_period_targets_are_computed_once(self):
+        blockchain = Blockchain(difficulty=1, target_block_time=1000, retarget_interval=2)
+        for _ in range(4):
+            blockchain.mine_pending_transactions(Wallet().get_public_key())
+        target = blockchain.get_current_target()
+
+        with mock.patch.object(Blockchain, '_next_target') as next_target:
+            self.assertEqual(blockchain.get_current_target(), target)
+            next_target.assert_not_called()
+
+    def test_targets_survive_serialization(self):
+        blockchain = Blockchain(difficulty=1, target_block_time=1000, retarget_interval=2)
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+        restored = Blockchain.from_dict(blockchain.to_dict())
+
+        self.assertEqual(restored.get_current_target(), blockchain.get_current_target())
+        self.assertTrue(restored.is_chain_valid())
+
+
+class MerkleTests(TestCase):
+
+    def test_proofs_verify_for_every_leaf(self):
+        for size in range(1, 10):
+            leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(size)]
+            root = compute_merkle_root(leaves)
+
+            for index, leaf in enumerate(leaves):
+                proof = build_merkle_proof(leaves, index)
+                self.assertTrue(verify_merkle_proof(leaf, proof, root))
+                self.assertFalse(verify_merkle_proof('0' * 64, proof, root))
+
+    def test_tampered_transaction_invalidates_chain(self):
+        wallet = Wallet()
+        blockchain = Blockchain(difficulty=1)
+        blockchain.mine_pending_transactions(wallet.get_public_key())
+        blockchain.chain[1].transactions[0].amount = 1000
+
+        self.assertFalse(blockchain.is_chain_valid())
+
+    def test_proof_endpoint(self):
+        start_session_chain(self.client)
+        blockchain = session_blockchain(self.client)
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+
+        block = blockchain.chain[1]
+        txid = block.get_transaction_ids()[0]
+        response = self.client.get(reverse('blockchain:api_get_transaction_proof', args=[1, txid]))
+        data = response.json()
+
+        self.assertEqual(data['header']['merkle_root'], block.merkle_root)
+        self.assertTrue(verify_merkle_proof(txid, data['proof'], data['header']['merkle_root']))
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class MiningJobTests(TestCase):
+
+    def test_mining_job_commits_block(self):
+        miner = Wallet().get_public_key()
+        response = self.client.post(
+            reverse('blockchain:mine_block'),
+            {'miner_address': miner},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 202)
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertTrue(status['committed'])
+        self.assertEqual(status['block_index'], 1)
+
+        blockchain = session_blockchain(self.client)
+        self.assertEqual(len(blockchain.chain), 2)
+        self.assertEqual(blockchain.get_balance_of_address(miner), 100)
+
+    def test_jobs_do_not_copy_the_chain(self):
+        miner = Wallet().get_public_key()
+        start_session_chain(self.client)
+        self.client.get(reverse('blockchain:home'))
+
+        with mock.patch.object(Blockchain, 'to_dict') as to_dict, \
+                mock.patch.object(Blockchain, 'from_dict') as from_dict:
+            self.client.post(reverse('blockchain:mine_block'), {'miner_address': miner})
+            to_dict.assert_not_called()
+            from_dict.assert_not_called()
+
+        self.client.get(reverse('blockchain:home'))
+        blockchain = session_blockchain(self.client)
+        self.assertEqual(len(blockchain.chain), 2)
+        self.assertTrue(blockchain.is_chain_valid())
+
+    def _mine_while(self, during_mining):
+        # Runs during_mining(chain_id) between the job's proof-of-work and its commit
+        mine_work = Blockchain.mine_work
+
+        def mine_and_interfere(work, *args, **kwargs):
+            block = mine_work(work, *args, **kwargs)
+            during_mining(MiningJob.objects.latest('created_at').chain_id)
+            return block
+
+        with mock.patch.object(Blockchain, 'mine_work', side_effect=mine_and_interfere):
+            return self.client.post(
+                reverse('blockchain:mine_block'),
+                {'miner_address': Wallet().get_public_key()},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+
+    def test_worker_commits_the_block(self):
+        start_session_chain(self.client)
+        response = self.client.post(
+            reverse('blockchain:mine_block'),
+            {'miner_address': Wallet().get_public_key()},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        # Committed by the job itself, before the session makes another request
+        job = MiningJob.objects.get(pk=response.json()['job_id'])
+        self.assertTrue(job.committed)
+        self.assertEqual(len(session_blockchain(self.client).chain), 2)
+
+    def test_reset_abandons_uncommitted_jobs(self):
+        start_session_chain(self.client)
+
+        def reset(chain_id):
+            self.client.post(reverse('blockchain:reset_blockchain'))
+
+        response = self._mine_while(reset)
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('reset', status['error'])
+
+    def test_stale_job_is_not_committed(self):
+        start_session_chain(self.client)
+
+        # Another block lands on the session's chain while the job was mining
+        def mine_elsewhere(chain_id):
+            Blockchain.from_store(get_block_store(chain_id)).mine_pending_transactions(Wallet().get_public_key())
+
+        response = self._mine_while(mine_elsewhere)
+
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('could not be committed', status['error'])
+
+    def test_lost_jobs_are_failed(self):
+        start_session_chain(self.client)
+        self.client.get(reverse('blockchain:home'))
+        job = MiningJob.objects.create(
+            session_key=self.client.session.session_key,
+            chain_id=self.client.session['blockchain_data'],
+            miner_address=Wallet().get_public_key(),
+            status=MiningJob.STATUS_RUNNING,
+        )
+        url = reverse('blockchain:api_mining_job_status', args=[job.pk])
+
+        self.assertEqual(self.client.get(url).json()['status'], 'running')
+
+        MiningJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        status = self.client.get(url).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertTrue(status['committed'])
+
+
+class BalanceIndexTests(TestCase):
+
+    def setUp(self):
+        self.sender = Wallet()
+        self.receiver = Wallet().get_public_key()
+        self.blockchain = Blockchain(difficulty=1)
+        self.blockchain.mine_pending_transactions(self.sender.get_public_key())
+
+        tx = Transaction(self.sender.get_public_key(), self.receiver, 30)
+        tx.sign(self.sender)
+        self.blockchain.add_transaction(tx)
+        self.blockchain.mine_pending_transactions(self.receiver)
+
+    def test_balances_follow_appended_blocks(self):
+        self.assertEqual(self.blockchain.get_balance_of_address(self.sender.get_public_key()), 70)
+        self.assertEqual(self.blockchain.get_balance_of_address(self.receiver), 130)
+        self.assertEqual(self.blockchain.get_balance_of_address('unknown'), 0)
+
+    def test_balances_rebuilt_from_dict(self):
+        restored = Blockchain.from_dict(self.blockchain.to_dict())
+
+        self.assertEqual(restored.balances, self.blockchain.balances)
+
+
+class AddressQueryTests(TestCase):
+
+    def setUp(self):
+        self.miner = Wallet().get_public_key()
+        self.blockchain = Blockchain(difficulty=1)
+        for _ in range(5):
+            self.blockchain.mine_pending_transactions(self.miner)
+
+    def test_pages_are_newest_first_and_complete(self):
+        heights = []
+        cursor = None
+        while True:
+            page, cursor = self.blockchain.get_transaction_history(self.miner, limit=2, cursor=cursor)
+            heights += [height for height, tx in page]
+            if cursor is None:
+                break
+
+        self.assertEqual(heights, [5, 4, 3, 2, 1])
+        self.assertEqual(self.blockchain.get_transaction_count(self.miner), 5)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.blockchain.get_transaction_history(self.miner, cursor='nope')
+
+    def test_history_endpoint(self):
+        session = self.client.session
+        session['blockchain_data'] = self.blockchain.to_dict()
+        session.save()
+
+        url = reverse('blockchain:api_get_address_transactions', args=[self.miner])
+        data = self.client.get(url, {'limit': 3}).json()
+
+        self.assertEqual([tx['block_index'] for tx in data['transactions']], [5, 4, 3])
+        self.assertEqual(data['next_cursor'], '3:0')
+
+        data = self.client.get(url, {'limit': 3, 'cursor': data['next_cursor']}).json()
+        self.assertEqual([tx['block_index'] for tx in data['transactions']], [2, 1])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_bulk_balances(self):
+        self.assertEqual(
+            self.blockchain.get_balances([self.miner, 'unknown']),
+            {self.miner: 500, 'unknown': 0}
+        )
+
+    def test_bulk_balances_endpoint(self):
+        session = self.client.session
+        session['blockchain_data'] = self.blockchain.to_dict()
+        session.save()
+
+        url = reverse('blockchain:api_get_balances')
+        response = self.client.post(url, {'addresses': [self.miner, 'unknown']}, content_type='application/json')
+        self.assertEqual(response.json()['balances'], {self.miner: 500, 'unknown': 0})
+
+        response = self.client.get(url, {'address': [self.miner]})
+        self.assertEqual(response.json()['balances'], {self.miner: 500})
+
+        response = self.client.post(url, {'addresses': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ValidationWatermarkTests(TestCase):
+
+    def setUp(self):
+        self.miner = Wallet().get_public_key()
+        self.blockchain = Blockchain(difficulty=1)
+        self.blockchain.mine_pending_transactions(self.miner)
+
+    def test_incremental_validation_checks_only_new_blocks(self):
+        self.assertTrue(self.blockchain.is_chain_valid())
+        self.assertEqual(self.blockchain.validated_height, 1)
+
+        self.blockchain.mine_pending_transactions(self.miner)
+        checked = []
+        original = Block.calculate_hash
+
+        def record(block):
+            checked.append(block.hash)
+            return original(block)
+
+        with mock.patch.object(Block, 'calculate_hash', record):
+            self.assertTrue(self.blockchain.is_chain_valid(incremental=True))
+
+        self.assertEqual(checked, [self.blockchain.chain[2].hash])
+        self.assertEqual(self.blockchain.validated_height, 2)
+
+    def test_changed_history_falls_back_to_full_check(self):
+        self.assertTrue(self.blockchain.is_chain_valid())
+        restored = Blockchain.from_dict(self.blockchain.to_dict())
+        restored.chain[1].hash = '0' * 64
+
+        self.assertFalse(restored.has_valid_watermark())
+        self.assertFalse(restored.is_chain_valid(incremental=True))
+
+    def test_full_check_still_detects_tampering(self):
+        self.assertTrue(self.blockchain.is_chain_valid())
+        self.blockchain.chain[1].transactions[0].amount = 1000
+
+        self.assertFalse(self.blockchain.is_chain_valid())
+
+
+class SignatureVerificationTests(TestCase):
+
+    def setUp(self):
+        self.wallet = Wallet()
+        self.items = [
+            (self.wallet.get_public_key(), f'message {i}', self.wallet.sign_data(f'message {i}'))
+            for i in range(12)
+        ]
+
+    def test_parallel_batch_finds_first_failure(self):
+        self.assertIsNone(find_invalid_signature(self.items, workers=2, chunk_size=3))
+
+        items = list(self.items)
+        items[7] = (items[7][0], 'forged', items[7][2])
+        items[10] = (items[10][0], 'forged', items[10][2])
+
+        self.assertEqual(find_invalid_signature(items, workers=2, chunk_size=3), 7)
+        self.assertEqual(find_invalid_signature(items), 7)
+
+    def test_chain_validation_reports_block_and_transaction(self):
+        blockchain = Blockchain(difficulty=1)
+        blockchain.mine_pending_transactions(self.wallet.get_public_key())
+
+        tx = Transaction(self.wallet.get_public_key(), Wallet().get_public_key(), 10)
+        tx.sign(self.wallet)
+        blockchain.add_transaction(tx)
+        blockchain.mine_pending_transactions(self.wallet.get_public_key())
+
+        # Re-sign a different message and re-mine so only the signature check can fail
+        block = blockchain.chain[2]
+        block.transactions[0].signature = self.wallet.sign_data('something else')
+        block.mine_block(1)
+
+        self.assertFalse(blockchain.is_chain_valid())
+        self.assertEqual(blockchain.validation_error, 'Invalid transactions at block 2 (transaction 0)')
+
+
+class SignatureCacheTests(TestCase):
+
+    def setUp(self):
+        signature_cache.clear()
+        self.wallet = Wallet()
+        self.signature = self.wallet.sign_data('payload')
+
+    def tearDown(self):
+        signature_cache.configure(enabled=True)
+        signature_cache.clear()
+
+    def test_repeat_verification_hits_cache(self):
+        public_key = self.wallet.get_public_key()
+        self.assertTrue(Wallet.verify_signature(public_key, 'payload', self.signature))
+
+        with mock.patch('blockchain.core.crypto.VerifyingKey.verify') as verify:
+            self.assertTrue(Wallet.verify_signature(public_key, 'payload', self.signature))
+            verify.assert_not_called()
+
+        self.assertEqual(signature_cache.stats()['hits'], 1)
+
+    def test_failures_are_not_cached(self):
+        public_key = self.wallet.get_public_key()
+        self.assertFalse(Wallet.verify_signature(public_key, 'other', self.signature))
+        self.assertEqual(len(signature_cache), 0)
+
+    def test_disabled_cache_always_verifies(self):
+        signature_cache.configure(enabled=False)
+        public_key = self.wallet.get_public_key()
+        Wallet.verify_signature(public_key, 'payload', self.signature)
+
+        with mock.patch('blockchain.core.crypto.VerifyingKey.verify') as verify:
+            Wallet.verify_signature(public_key, 'payload', self.signature)
+            verify.assert_called_once()
+
+    def test_size_limit_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+
+class KeyCacheTests(TestCase):
+
+    def setUp(self):
+        signature_cache.configure(enabled=False)
+        verifying_key_cache.clear()
+        signing_key_cache.clear()
+        self.wallet = Wallet()
+
+    def tearDown(self):
+        signature_cache.configure(enabled=True)
+
+    def test_verifying_key_is_decoded_once_per_sender(self):
+        public_key = self.wallet.get_public_key()
+        first = get_backend().get_verifying_key(public_key)
+
+        self.assertIs(get_backend().get_verifying_key(public_key), first)
+        self.assertEqual(verifying_key_cache.stats()['hits'], 1)
+
+    def test_repeat_sender_key_is_precomputed(self):
+        public_key = self.wallet.get_public_key()
+
+        with mock.patch('blockchain.core.crypto.VerifyingKey.precompute') as precompute:
+            for i in range(PRECOMPUTE_THRESHOLD + 2):
+                message = f'message {i}'
+                self.assertTrue(Wallet.verify_signature(public_key, message, self.wallet.sign_data(message)))
+
+            precompute.assert_called_once()
+
+    def test_precomputed_key_still_rejects_bad_signatures(self):
+        public_key = self.wallet.get_public_key()
+        for i in range(PRECOMPUTE_THRESHOLD):
+            Wallet.verify_signature(public_key, 'payload', self.wallet.sign_data('payload'))
+
+        signature = Wallet().sign_data('payload')
+        self.assertFalse(Wallet.verify_signature(public_key, 'payload', signature))
+
+    def test_malformed_public_key_is_rejected(self):
+        self.assertFalse(Wallet.verify_signature('00' * 64, 'payload', self.wallet.sign_data('payload')))
+
+    def test_from_private_key_reuses_decoded_keys(self):
+        private_key = self.wallet.get_private_key()
+        Wallet.from_private_key(private_key)
+        hits = signing_key_cache.stats()['hits']
+        second = Wallet.from_private_key(private_key)
+
+        self.assertGreater(signing_key_cache.stats()['hits'], hits)
+        self.assertEqual(second.get_public_key(), self.wallet.get_public_key())
+
+
+class CryptoBackendTests(TestCase):
+
+    def setUp(self):
+        signature_cache.configure(enabled=False)
+
+    def tearDown(self):
+        signature_cache.configure(enabled=True)
+        set_backend(EcdsaBackend.name)
+
+    def test_ecdsa_is_the_default_backend(self):
+        self.assertEqual(get_backend().name, 'ecdsa')
+        self.assertIn('ecdsa', available_backends())
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(Exception):
+            set_backend('no-such-backend')
+
+    def test_eth_keys_without_coincurve_is_refused(self):
+        if 'eth-keys' not in available_backends():
+            self.skipTest('eth-keys is not installed')
+        if create_backend('eth-keys').accelerated:
+            self.skipTest('coincurve is installed')
+
+        with self.assertRaises(ImportError):
+            set_backend('eth-keys')
+        self.assertEqual(get_backend().name, 'ecdsa')
+
+    def test_signatures_verify_across_backends(self):
+        names = available_backends()
+        if len(names) < 2:
+            self.skipTest('only one crypto backend is installed')
+
+        private_key = EcdsaBackend().generate_private_key()
+        for signer in names:
+            for verifier in names:
+                signing = create_backend(signer)
+                verifying = create_backend(verifier)
+                public_key = signing.get_public_key(private_key)
+                signature = signing.sign(private_key, 'payload')
+
+                self.assertEqual(verifying.get_public_key(private_key), public_key)
+                self.assertEqual(len(bytes.fromhex(signature)), 64)
+                self.assertTrue(verifying.verify(public_key, 'payload', signature))
+                self.assertFalse(verifying.verify(public_key, 'other', signature))
+
+    def test_wallet_uses_selected_backend(self):
+        if 'eth-keys' not in available_backends():
+            self.skipTest('eth-keys is not installed')
+        if not create_backend('eth-keys').accelerated:
+            self.skipTest('coincurve is not installed')
+
+        set_backend('eth-keys')
+        sender = Wallet()
+        tx = Transaction(sender.get_public_key(), Wallet().get_public_key(), 5)
+        tx.sign(sender)
+        self.assertTrue(tx.is_valid())
+
+        # A transaction signed on one backend stays valid on the other
+        set_backend(EcdsaBackend.name)
+        self.assertTrue(tx.is_valid())
+
+
+class EncodingTests(TestCase):
+
+    def setUp(self):
+        self.sender = Wallet()
+        self.receiver = Wallet().get_public_key()
+
+    def _signed_transaction(self, amount=12.5):
+        tx = Transaction(self.sender.get_public_key(), self.receiver, amount)
+        tx.sign(self.sender)
+        return tx
+
+    def test_transaction_round_trips_through_bytes(self):
+        tx = self._signed_transaction()
+        decoded = Transaction.from_bytes(tx.to_bytes())
+
+        self.assertEqual(decoded.to_dict(), tx.to_dict())
+        self.assertEqual(decoded.calculate_txid(), tx.calculate_txid())
+        self.assertTrue(decoded.is_valid())
+
+    def test_binary_encoding_stores_keys_as_raw_bytes(self):
+        tx = self._signed_transaction()
+        encoded = tx.to_bytes()
+
+        self.assertIn(bytes.fromhex(tx.from_address), encoded)
+        self.assertIn(bytes.fromhex(tx.signature), encoded)
+        self.assertLess(len(encoded), len(json.dumps(tx.to_dict())) / 2)
+
+    def test_fixed_width_transactions_match_the_tagged_fields(self):
+        for amount, to_address in ((12, self.receiver), (12.5, self.receiver), (12.5, self.receiver.upper())):
+            tx = self._signed_transaction(amount)
+            tx.to_address = to_address
+            tagged = b''.join((
+                _pack_version(tx.version), _pack_field(tx.from_address), _pack_field(tx.to_address),
+                _pack_number(tx.amount), _pack_number(tx.timestamp),
+            ))
+
+            with self.subTest(amount=amount, to_address=to_address):
+                self.assertEqual(encode_transaction_payload(tx), tagged)
+                self.assertEqual(tx.to_bytes(), tagged + _pack_field(tx.signature))
+
+                decoded = Transaction.from_bytes(tx.to_bytes())
+                self.assertEqual(decoded.to_dict(), tx.to_dict())
+                self.assertIs(type(decoded.amount), type(amount))
+
+    def test_block_round_trips_through_bytes(self):
+        reward = Transaction(None, self.receiver, 100)
+        block = Block(1700000000, [reward, self._signed_transaction()], '0' * 64)
+        block.mine_block(1)
+        decoded = Block.from_bytes(block.to_bytes())
+
+        self.assertEqual(decoded.to_dict(), block.to_dict())
+        self.assertEqual(decoded.calculate_hash(), block.hash)
+        self.assertEqual(decoded.calculate_merkle_root(), block.merkle_root)
+
+    def test_binary_hash_ignores_number_formatting(self):
+        tx = self._signed_transaction(amount=0.1 + 0.2)
+        legacy_text = f"{tx.from_address}{tx.to_address}{tx.amount}{tx.timestamp}"
+
+        self.assertEqual(tx.version, CURRENT_VERSION)
+        self.assertNotEqual(tx.calculate_hash(), hashlib.sha256(legacy_text.encode()).hexdigest())
+        self.assertEqual(
+            tx.calculate_hash(),
+            hashlib.sha256(encode_transaction_payload(tx)).hexdigest()
+        )
+
+    def test_from_dict_restores_without_rehashing(self):
+        block = Block(1700000000, [self._signed_transaction()], '0' * 64)
+        block.mine_block(1)
+        data = json.loads(json.dumps(block.to_dict()))
+
+        with mock.patch.object(Block, 'calculate_merkle_root') as merkle_root, \
+                mock.patch.object(Block, 'calculate_hash') as calculate_hash:
+            loaded = Block.from_dict(data)
+            merkle_root.assert_not_called()
+            calculate_hash.assert_not_called()
+
+        self.assertEqual(loaded.to_dict(), block.to_dict())
+
+    def test_unencodable_values_raise_value_error(self):
+        cases = [
+            ('amount', 2 ** 70),
+            ('amount', '10'),
+            ('amount', True),
+            ('from_address', 123),
+            ('from_address', 'ab' * 70000),
+            ('signature', b'\x00'),
+            ('timestamp', 'x'),
+            ('version', 'x'),
+            ('version', 256),
+        ]
+        for attribute, value in cases:
+            tx = self._signed_transaction()
+            setattr(tx, attribute, value)
+            with self.subTest(attribute=attribute, value=value):
+                with self.assertRaises(ValueError):
+                    tx.to_bytes()
+
+    def test_legacy_json_chain_still_loads_and_validates(self):
+        blockchain = Blockchain(difficulty=1)
+
+        # Build the chain the way it was hashed before format versions
+        genesis = Block(1483228800, [], '0', version=LEGACY_VERSION)
+        genesis.mine_block(1, target=blockchain.initial_target)
+        reward = Transaction(None, self.sender.get_public_key(), 100)
+        reward.version = LEGACY_VERSION
+        block = Block(1700000000, [reward], genesis.hash, version=LEGACY_VERSION)
+        block.mine_block(1, target=blockchain.initial_target)
+
+        data = blockchain.to_dict()
+        data['chain'] = [genesis.to_dict(), block.to_dict()]
+        self.assertNotIn('version', data['chain'][1])
+        self.assertNotIn('version', data['chain'][1]['transactions'][0])
+
+        loaded = Blockchain.from_dict(json.loads(json.dumps(data)))
+        self.assertEqual([b.version for b in loaded.chain], [LEGACY_VERSION, LEGACY_VERSION])
+        self.assertTrue(loaded.is_chain_valid())
+
+        # New blocks on top of a legacy chain use the binary format
+        loaded.mine_pending_transactions(self.receiver)
+        self.assertEqual(loaded.get_latest_block().version, CURRENT_VERSION)
+        self.assertTrue(Blockchain.from_dict(loaded.to_dict()).is_chain_valid())
+
+
+class MempoolTests(TestCase):
+
+    def setUp(self):
+        self.sender = Wallet()
+        self.receiver = Wallet().get_public_key()
+        self.blockchain = Blockchain(difficulty=1, max_pending_transactions=3)
+        self.blockchain.mine_pending_transactions(self.sender.get_public_key())
+
+    def _transaction(self, amount=10):
+        tx = Transaction(self.sender.get_public_key(), self.receiver, amount)
+        tx.sign(self.sender)
+        return tx
+
+    def test_same_transaction_cannot_be_added_twice(self):
+        tx = self._transaction()
+        self.blockchain.add_transaction(tx)
+
+        with self.assertRaisesMessage(Exception, 'already pending'):
+            self.blockchain.add_transaction(Transaction.from_dict(tx.to_dict()))
+
+        self.assertEqual(len(self.blockchain.pending_transactions), 1)
+
+    def test_sender_totals_follow_the_pool(self):
+        pool = self.blockchain.pending_transactions
+        first = self._transaction(30)
+        self.blockchain.add_transaction(first)
+        self.blockchain.add_transaction(self._transaction(20))
+
+        self.assertEqual(pool.get_pending_amount(self.sender.get_public_key()), 50)
+        self.assertEqual(pool.get_pending_count(self.sender.get_public_key()), 2)
+
+        pool.remove(first.calculate_txid())
+        self.assertEqual(pool.get_pending_amount(self.sender.get_public_key()), 20)
+
+    def test_pending_total_cannot_exceed_balance(self):
+        self.blockchain.add_transaction(self._transaction(60))
+
+        with self.assertRaisesMessage(Exception, 'higher than its balance'):
+            self.blockchain.add_transaction(self._transaction(60))
+
+    def _funded_wallet(self):
+        wallet = Wallet()
+        self.blockchain.mine_pending_transactions(wallet.get_public_key())
+        return wallet
+
+    def _transaction_from(self, wallet, amount=5):
+        tx = Transaction(wallet.get_public_key(), self.receiver, amount)
+        tx.sign(wallet)
+        return tx
+
+    def test_full_pool_evicts_the_oldest_of_the_busiest_sender(self):
+        other = self._funded_wallet()
+        newcomer = self._funded_wallet()
+        first, second = self._transaction(5), self._transaction(5)
+        for tx in (first, second, self._transaction_from(other)):
+            self.blockchain.add_transaction(tx)
+
+        self.blockchain.add_transaction(self._transaction_from(newcomer))
+
+        pool = self.blockchain.pending_transactions
+        self.assertEqual(len(pool), 3)
+        self.assertNotIn(first.calculate_txid(), pool)
+        self.assertIn(second.calculate_txid(), pool)
+        self.assertEqual(pool.get_pending_amount(self.sender.get_public_key()), 5)
+
+    def test_full_pool_rejects_the_busiest_sender(self):
+        transactions = [self._transaction(5) for _ in range(3)]
+        for tx in transactions:
+            self.blockchain.add_transaction(tx)
+
+        with self.assertRaisesMessage(Exception, 'Mempool is full'):
+            self.blockchain.add_transaction(self._transaction(5))
+
+        pool = self.blockchain.pending_transactions
+        self.assertEqual(list(pool), transactions)
+        self.assertEqual(pool.get_pending_amount(self.sender.get_public_key()), 15)
+
+    def test_senders_are_capped(self):
+        self.blockchain.pending_transactions.set_max_per_sender(2)
+        other = self._funded_wallet()
+        self.blockchain.add_transaction(self._transaction(5))
+        self.blockchain.add_transaction(self._transaction(5))
+
+        with self.assertRaisesMessage(Exception, 'Too many pending transactions from this sender'):
+            self.blockchain.add_transaction(self._transaction(5))
+
+        self.blockchain.add_transaction(self._transaction_from(other))
+        self.assertEqual(len(self.blockchain.pending_transactions), 3)
+
+    def test_batch_reports_transactions_evicted_by_later_ones(self):
+        other = self._funded_wallet()
+        first = self._transaction(5)
+        batch = [first, self._transaction(5), self._transaction_from(other), self._transaction_from(other)]
+
+        results = self.blockchain.add_transactions(batch)
+
+        self.assertEqual([error for _, error in results], ['Evicted from the full mempool', None, None, None])
+        self.assertNotIn(first.calculate_txid(), self.blockchain.pending_transactions)
+
+    def test_mined_transaction_cannot_be_resubmitted(self):
+        tx = self._transaction()
+        self.blockchain.add_transaction(tx)
+        self.blockchain.mine_pending_transactions(self.receiver)
+
+        with self.assertRaisesMessage(Exception, 'already in the chain'):
+            self.blockchain.add_transaction(Transaction.from_dict(tx.to_dict()))
+
+        # Also when the chain was loaded and its indexes not built yet
+        loaded = Blockchain.from_dict(self.blockchain.to_dict())
+        with self.assertRaisesMessage(Exception, 'already in the chain'):
+            loaded.add_transaction(Transaction.from_dict(tx.to_dict()))
+
+    def test_mined_and_accepted_blocks_empty_the_pool(self):
+        tx = self._transaction()
+        self.blockchain.add_transaction(tx)
+
+        block = Blockchain.from_dict(self.blockchain.to_dict()).mine_pending_transactions(self.receiver)
+        self.blockchain.add_block(block)
+
+        self.assertEqual(len(self.blockchain.pending_transactions), 0)
+        self.assertEqual(self.blockchain.pending_transactions.get_pending_amount(self.sender.get_public_key()), 0)
+
+    def test_from_dict_restores_pool_without_duplicates(self):
+        tx = self._transaction()
+        self.blockchain.add_transaction(tx)
+        data = self.blockchain.to_dict()
+        data['pending_transactions'].append(tx.to_dict())
+
+        loaded = Blockchain.from_dict(data)
+
+        self.assertEqual(len(loaded.pending_transactions), 1)
+        self.assertIn(tx.calculate_txid(), loaded.pending_transactions)
+
+
+class BulkSubmissionTests(TestCase):
+
+    def setUp(self):
+        self.sender = Wallet()
+        self.receiver = Wallet().get_public_key()
+        self.blockchain = Blockchain(difficulty=1)
+        self.blockchain.mine_pending_transactions(self.sender.get_public_key())
+
+    def _transaction(self, amount=10, wallet=None):
+        wallet = wallet or self.sender
+        tx = Transaction(wallet.get_public_key(), self.receiver, amount)
+        tx.sign(wallet)
+        return tx
+
+    def test_batch_reports_each_transaction(self):
+        good = self._transaction(40)
+        forged = self._transaction(10)
+        forged.amount = 5
+        overdraft = self._transaction(70)
+        results = self.blockchain.add_transactions([good, forged, overdraft, good])
+        txids = [txid for txid, _ in results]
+        errors = [error for _, error in results]
+
+        self.assertEqual(txids, [tx.calculate_txid() for tx in (good, forged, overdraft, good)])
+        self.assertIsNone(errors[0])
+        self.assertIn('invalid', errors[1])
+        self.assertIn('higher than its balance', errors[2])
+        self.assertIn('already pending', errors[3])
+        self.assertEqual(list(self.blockchain.pending_transactions), [good])
+
+    def test_balances_are_accounted_across_the_batch(self):
+        batch = [self._transaction(30) for _ in range(4)]
+        errors = [error for _, error in self.blockchain.add_transactions(batch)]
+
+        self.assertEqual(errors, [None, None, None, 'Pending transactions for this wallet is higher than its balance.'])
+
+    def test_signatures_are_verified_in_one_batch(self):
+        batch = [self._transaction(1) for _ in range(3)]
+
+        with mock.patch('blockchain.core.verification.find_invalid_signatures', return_value=[]) as verify:
+            self.blockchain.add_transactions(batch)
+
+        verify.assert_called_once()
+        self.assertEqual(len(verify.call_args[0][0]), 3)
+
+    def test_parallel_batch_reports_every_failure(self):
+        wallet = Wallet()
+        items = []
+        for i in range(6):
+            tx = Transaction(wallet.get_public_key(), self.receiver, i + 1)
+            tx.sign(wallet)
+            if i in (1, 4):
+                tx.amount += 100
+            items.append((tx.from_address, tx.calculate_hash(), tx.signature))
+
+        self.assertEqual(find_invalid_signatures(items, workers=2, chunk_size=2), [1, 4])
+
+    def test_bulk_endpoint(self):
+        session = self.client.session
+        session['blockchain_data'] = self.blockchain.to_dict()
+        session.save()
+
+        good = self._transaction(25)
+        payload = [good.to_dict(), {'to': self.receiver}, self._transaction(500).to_dict()]
+        response = self.client.post(
+            reverse('blockchain:api_submit_transactions'), payload, content_type='application/json'
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['accepted'], data['rejected']), (1, 2))
+        self.assertEqual(data['results'][0], {'accepted': True, 'txid': good.calculate_txid(), 'error': None})
+        self.assertIn('Malformed', data['results'][1]['error'])
+        self.assertEqual(data['results'][2]['error'], 'Not enough balance')
+
+        pending = self.client.get(reverse('blockchain:api_get_pending_transactions')).json()
+        self.assertEqual(len(pending['pending_transactions']), 1)
+
+    def test_bulk_endpoint_rejects_unencodable_entries(self):
+        session = self.client.session
+        session['blockchain_data'] = self.blockchain.to_dict()
+        session.save()
+
+        legacy = dict(self._transaction(5).to_dict(), signature=123)
+        legacy.pop('version')
+        overrides = [
+            {'signature': 123},
+            {'signature': [1]},
+            {'from': 123},
+            {'to': ['x']},
+            {'timestamp': 'x'},
+            {'version': 'x'},
+            {'amount': 2 ** 70},
+        ]
+        payload = [legacy] + [dict(self._transaction(5).to_dict(), **override) for override in overrides]
+        response = self.client.post(
+            reverse('blockchain:api_submit_transactions'), payload, content_type='application/json'
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['accepted'], data['rejected']), (0, len(payload)))
+        self.assertTrue(all(result['error'] for result in data['results']))
+
+        # The pool is unchanged, and a good transaction still goes through afterwards
+        good = self._transaction(5)
+        response = self.client.post(
+            reverse('blockchain:api_submit_transactions'), [good.to_dict()], content_type='application/json'
+        )
+        self.assertEqual(response.json()['results'], [{'accepted': True, 'txid': good.calculate_txid(), 'error': None}])
+
+    def test_bulk_endpoint_rejects_bad_bodies(self):
+        url = reverse('blockchain:api_submit_transactions')
+
+        self.assertEqual(self.client.post(url, 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'transactions': 'x'}, content_type='application/json').status_code, 400)
+
+        with override_settings(MAX_BULK_TRANSACTIONS=1):
+            response = self.client.post(url, [{}, {}], content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+
+class BlockStoreTests(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix='store-test-')
+        self.addCleanup(shutil.rmtree, self.path, True)
+        self.miner = Wallet().get_public_key()
+
+    def _stored_chain(self, blocks=3, **kwargs):
+        blockchain = Blockchain(difficulty=1)
+        store = BlockStore(self.path, **kwargs)
+        blockchain.attach_store(store)
+        for _ in range(blocks):
+            blockchain.mine_pending_transactions(self.miner)
+        return blockchain, store
+
+    def test_blocks_are_appended_and_read_back(self):
+        blockchain, store = self._stored_chain()
+
+        self.assertEqual(store.get_height(), 4)
+        self.assertEqual(store.get_hash(2), blockchain.chain[2].hash)
+        self.assertEqual(store.read_block(3).to_dict(), blockchain.chain[3].to_dict())
+        self.assertEqual([b.hash for b in store.read_blocks(start=1)], [b.hash for b in blockchain.chain[1:]])
+
+    def test_chain_loads_from_store(self):
+        blockchain, store = self._stored_chain()
+        tx = Transaction(None, self.miner, 1)
+        blockchain.pending_transactions.add(tx)
+        blockchain.save_state()
+
+        loaded = Blockchain.from_store(store)
+
+        self.assertEqual(loaded.to_dict(), blockchain.to_dict())
+        self.assertTrue(loaded.is_chain_valid())
+        self.assertEqual(loaded.get_balance_of_address(self.miner), 300)
+
+        # Appends to the loaded chain go to the same store
+        loaded.mine_pending_transactions(self.miner)
+        self.assertEqual(store.get_height(), 5)
+
+    def test_store_refuses_to_fork(self):
+        blockchain, store = self._stored_chain(blocks=1)
+        other = Blockchain.from_store(store)
+        other.store = None
+        blockchain.mine_pending_transactions(self.miner)
+        block = other.mine_pending_transactions(self.miner)
+
+        with self.assertRaises(Exception):
+            store.append_block(block, 2)
+        with self.assertRaisesMessage(Exception, 'stored chain tip'):
+            store.append_block(block)
+
+        self.assertEqual(store.get_height(), 3)
+
+    def test_torn_writes_are_ignored_and_overwritten(self):
+        blockchain, store = self._stored_chain(blocks=1)
+
+        # Simulate a crash part-way through the next append
+        with open(store._segment_path(0), 'ab') as f:
+            f.write(b'garbage')
+        with open(store._index_path(), 'ab') as f:
+            f.write(b'\x00' * 10)
+
+        self.assertEqual(store.get_height(), 2)
+        blockchain.mine_pending_transactions(self.miner)
+
+        self.assertEqual([b.hash for b in store.read_blocks()], [b.hash for b in blockchain.chain])
+
+    def test_segments_roll_over(self):
+        blockchain, store = self._stored_chain(blocks=3, segment_size=200)
+
+        segments = {entry[0] for entry in store.read_index()}
+        self.assertGreater(len(segments), 1)
+        self.assertEqual(Blockchain.from_store(store).to_dict(), blockchain.to_dict())
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class BlockStoreViewTests(TestCase):
+
+    def test_session_holds_only_the_chain_id(self):
+        start_session_chain(self.client)
+        chain_id = self.client.session['blockchain_data']
+
+        self.assertIsInstance(chain_id, str)
+        self.assertEqual(get_block_store(chain_id).get_height(), 1)
+
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': Wallet().get_public_key()})
+        self.client.get(reverse('blockchain:home'))
+
+        self.assertEqual(self.client.session['blockchain_data'], chain_id)
+        self.assertEqual(get_block_store(chain_id).get_height(), 2)
+
+    def test_page_views_do_not_rewrite_blocks(self):
+        start_session_chain(self.client)
+
+        with mock.patch.object(BlockStore, 'append_block') as append_block:
+            self.client.get(reverse('blockchain:home'))
+            self.client.get(reverse('blockchain:transaction_pending'))
+            append_block.assert_not_called()
+
+    @override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1, HOME_RECENT_BLOCKS=2)
+    def test_home_shows_only_the_latest_blocks(self):
+        start_session_chain(self.client)
+        for _ in range(3):
+            self.client.post(reverse('blockchain:mine_block'), {'miner_address': Wallet().get_public_key()})
+
+        response = self.client.get(reverse('blockchain:home'))
+
+        self.assertEqual([block['height'] for block in response.context['chain']], [2, 3])
+        self.assertEqual(response.context['total_blocks'], 4)
+        self.assertContains(response, reverse('blockchain:api_get_chain') + '?start=0')
+
+    def test_session_chains_are_moved_to_the_store(self):
+        blockchain = Blockchain(difficulty=1)
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+        session = self.client.session
+        session['blockchain_data'] = blockchain.to_dict()
+        session.save()
+
+        self.client.get(reverse('blockchain:home'))
+
+        self.assertEqual(session_blockchain(self.client).to_dict()['chain'], blockchain.to_dict()['chain'])
+
+    def test_read_only_visits_create_no_chain(self):
+        store_dir = tempfile.mkdtemp(prefix='blockstore-')
+        self.addCleanup(shutil.rmtree, store_dir, True)
+        store_settings = override_settings(BLOCK_STORE_DIR=store_dir)
+        store_settings.enable()
+        self.addCleanup(store_settings.disable)
+
+        pages = [
+            reverse('blockchain:home'),
+            reverse('blockchain:transaction_pending'),
+            reverse('blockchain:block_detail', args=[0]),
+            reverse('blockchain:api_get_chain') + '?start=0',
+        ]
+        for page in pages:
+            self.assertEqual(Client().get(page).status_code, 200)
+        self.client.get(reverse('blockchain:block_detail', args=[0]))
+
+        self.assertNotIn('blockchain_data', self.client.session)
+
+        # All of them read one store holding the fresh chain
+        stores = os.listdir(store_dir)
+        self.assertEqual(len(stores), 1)
+        self.assertTrue(stores[0].startswith('new-'))
+
+        # The first change gives the session a chain of its own
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': Wallet().get_public_key()})
+        self.client.get(reverse('blockchain:home'))
+        self.assertEqual(session_blockchain(self.client).chain.get_hash(0), get_block_store(stores[0]).get_hash(0))
+        self.assertEqual(len(session_blockchain(self.client).chain), 2)
+
+    def test_reset_deletes_the_store(self):
+        start_session_chain(self.client)
+        store = get_block_store(self.client.session['blockchain_data'])
+
+        self.client.post(reverse('blockchain:reset_blockchain'))
+
+        self.assertFalse(store.exists())
+        self.assertNotIn('blockchain_data', self.client.session)
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class IndexedRecordsTests(TestCase):
+
+    def setUp(self):
+        self.miner = Wallet().get_public_key()
+        self.client.get(reverse('blockchain:home'))
+        for _ in range(3):
+            self.client.post(reverse('blockchain:mine_block'), {'miner_address': self.miner})
+            self.client.get(reverse('blockchain:home'))
+        self.chain_id = self.client.session['blockchain_data']
+
+    def test_mined_blocks_are_indexed(self):
+        blockchain = session_blockchain(self.client)
+
+        self.assertEqual(records.get_indexed_height(self.chain_id), len(blockchain.chain) - 1)
+        for height, block in enumerate(blockchain.chain):
+            row = BlockModel.objects.get(chain_id=self.chain_id, height=height)
+            self.assertEqual((row.hash, row.previous_hash, row.merkle_root, row.nonce),
+                             (block.hash, block.previous_hash, block.merkle_root, block.nonce))
+            self.assertEqual(row.transaction_rows.count(), len(block.transactions))
+
+    def test_address_queries_match_the_chain(self):
+        blockchain = session_blockchain(self.client)
+
+        self.assertEqual(records.get_address_balance(self.chain_id, self.miner), blockchain.get_balance_of_address(self.miner))
+        self.assertEqual(records.get_address_transaction_count(self.chain_id, self.miner), 3)
+
+        page, cursor = records.get_address_history(self.chain_id, self.miner, limit=2)
+        self.assertEqual([tx['block_index'] for tx in page], [3, 2])
+        self.assertEqual(cursor, '2:0')
+
+        page, cursor = records.get_address_history(self.chain_id, self.miner, limit=2, cursor=cursor)
+        self.assertEqual([tx['block_index'] for tx in page], [1])
+        self.assertIsNone(cursor)
+
+        with self.assertRaises(ValueError):
+            records.get_address_history(self.chain_id, self.miner, cursor='nope')
+
+    def test_views_do_not_load_the_chain(self):
+        with mock.patch.object(BlockStore, 'read_blocks') as read_blocks:
+            response = self.client.get(reverse('blockchain:block_detail', args=[2]))
+            self.assertEqual(response.context['block']['hash'], get_block_store(self.chain_id).get_hash(2))
+            self.assertEqual(response.context['next_block'], 3)
+
+            response = self.client.get(reverse('blockchain:address_detail', args=[self.miner]))
+            self.assertEqual(response.context['balance'], 300)
+            self.assertEqual(response.context['transaction_count'], 3)
+
+            response = self.client.post(reverse('blockchain:check_balance'), {'address': self.miner})
+            self.assertEqual(response.context['balance'], 300)
+
+            read_blocks.assert_not_called()
+
+    def test_missing_block_redirects(self):
+        response = self.client.get(reverse('blockchain:block_detail', args=[10]))
+        self.assertRedirects(response, reverse('blockchain:home'))
+
+    def test_racing_indexers_add_rows_once(self):
+        store = get_block_store(self.chain_id)
+        records.delete_chain_rows(self.chain_id)
+        records.index_store(store)
+        indexed_height = records.get_indexed_height(self.chain_id)
+
+        # A second caller checked before the first one's rows existed, and waited for the lock
+        with mock.patch('blockchain.records.get_indexed_height', side_effect=[None, indexed_height]):
+            self.assertEqual(records.index_store(store), 0)
+
+        self.assertEqual(BlockModel.objects.filter(chain_id=self.chain_id).count(), store.get_height())
+
+    def test_indexed_reads_skip_the_lock(self):
+        with mock.patch('blockchain.core.storage.StoreLock._acquire') as acquire:
+            self.client.get(reverse('blockchain:block_detail', args=[1]))
+            acquire.assert_not_called()
+
+    def test_reset_deletes_rows(self):
+        self.client.post(reverse('blockchain:reset_blockchain'))
+
+        self.assertIsNone(records.get_indexed_height(self.chain_id))
+
+    def test_backfill_indexes_snapshots_once(self):
+        blockchain = session_blockchain(self.client)
+        snapshot = BlockchainSnapshot.objects.create(
+            name='old', blockchain_data=blockchain.to_dict(),
+            difficulty=blockchain.difficulty, mining_reward=blockchain.mining_reward,
+        )
+
+        call_command('backfill_blocks', stdout=io.StringIO())
+        call_command('backfill_blocks', stdout=io.StringIO())
+
+        chain_id = records.snapshot_chain_id(snapshot)
+        self.assertEqual(BlockModel.objects.filter(chain_id=chain_id).count(), len(blockchain.chain))
+        self.assertEqual(BlockModel.objects.get(chain_id=chain_id, height=3).hash, blockchain.chain[3].hash)
+
+        snapshot.delete()
+        call_command('backfill_blocks', stdout=io.StringIO())
+        self.assertIsNone(records.get_indexed_height(chain_id))
+
+    def test_saving_a_snapshot_adds_no_rows(self):
+        rows = BlockModel.objects.count()
+        self.client.post(reverse('blockchain:save_snapshot'), {'name': 'plain'})
+
+        self.assertEqual(BlockchainSnapshot.objects.count(), 1)
+        self.assertEqual(BlockModel.objects.count(), rows)
+
+
+class CleanupChainsTests(TestCase):
+
+    def _stored_chain(self, age=0):
+        blockchain = new_blockchain()
+        blockchain.attach_store(get_block_store(uuid.uuid4().hex))
+        records.index_store(blockchain.store)
+
+        # Stores are judged by when their metadata was last written
+        if age:
+            written = time.time() - age
+            os.utime(os.path.join(blockchain.store.path, 'meta.json'), (written, written))
+
+        return blockchain.store
+
+    def test_chains_without_a_live_session_are_removed(self):
+        live = start_session_chain(self.client).store
+        records.index_store(live)
+
+        expired_client = Client()
+        expired = start_session_chain(expired_client).store
+        os.utime(os.path.join(expired.path, 'meta.json'), (time.time() - 7200,) * 2)
+        Session.objects.filter(session_key=expired_client.session.session_key).update(
+            expire_date=timezone.now() - timedelta(days=1)
+        )
+
+        abandoned = self._stored_chain(age=7200)
+        MiningJob.objects.create(session_key='gone', chain_id=abandoned.chain_id, miner_address='x')
+        recent = self._stored_chain()
+        removed_by_hand = self._stored_chain(age=7200)
+        shutil.rmtree(removed_by_hand.path)
+
+        call_command('cleanup_chains', '--dry-run', stdout=io.StringIO())
+        self.assertTrue(abandoned.exists())
+
+        call_command('cleanup_chains', stdout=io.StringIO())
+
+        self.assertTrue(live.exists())
+        self.assertTrue(recent.exists())
+        self.assertIsNotNone(records.get_indexed_height(live.chain_id))
+        self.assertIsNotNone(records.get_indexed_height(recent.chain_id))
+
+        for store in (expired, abandoned, removed_by_hand):
+            self.assertFalse(store.exists())
+            self.assertIsNone(records.get_indexed_height(store.chain_id))
+        self.assertFalse(MiningJob.objects.filter(chain_id=abandoned.chain_id).exists())
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class BlockReaderTests(TestCase):
+
+    def setUp(self):
+        self.store = BlockStore(tempfile.mkdtemp(prefix='blockreader-'), segment_size=2048)
+        self.blockchain = Blockchain(difficulty=1)
+        self.blockchain.attach_store(self.store)
+        for _ in range(6):
+            self.blockchain.mine_pending_transactions(Wallet().get_public_key())
+
+    def tearDown(self):
+        self.store.delete()
+
+    def test_reads_single_blocks_and_ranges(self):
+        with self.store.open_reader() as reader:
+            self.assertEqual(len(reader), 7)
+            self.assertEqual(reader.read_block(4).to_dict(), self.blockchain.chain[4].to_dict())
+            self.assertEqual(
+                [block.hash for block in reader.read_blocks(2, 5)],
+                [block.hash for block in self.blockchain.chain[2:5]]
+            )
+            self.assertEqual(len(list(reader.read_blocks(5, 100))), 2)
+
+            with self.assertRaises(IndexError):
+                reader.read_block(7)
+
+    def test_empty_store(self):
+        with BlockStore(tempfile.mkdtemp(prefix='blockreader-')).open_reader() as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader.read_blocks()), [])
+
+    def test_chain_api_range(self):
+        self.client.get(reverse('blockchain:home'))
+        for _ in range(3):
+            self.client.post(reverse('blockchain:mine_block'), {'miner_address': Wallet().get_public_key()})
+            self.client.get(reverse('blockchain:home'))
+        blockchain = session_blockchain(self.client)
+
+        with mock.patch.object(Blockchain, 'from_store') as from_store:
+            data = self.client.get(reverse('blockchain:api_get_chain'), {'start': 1, 'limit': 2}).json()
+            self.client.get(reverse('blockchain:block_detail', args=[2]))
+            from_store.assert_not_called()
+
+        self.assertEqual(data['height'], 4)
+        self.assertEqual(data['chain'], [block.to_dict() for block in blockchain.chain[1:3]])
+
+        response = self.client.get(reverse('blockchain:api_get_chain'), {'start': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(SNAPSHOT_COMPRESSION='zlib', SNAPSHOT_MAX_DEPTH=50)
+class DeltaSnapshotTests(TestCase):
+
+    def setUp(self):
+        snapshot_cache.clear()
+        self.miner = Wallet().get_public_key()
+        self.blockchain = self.stored_chain()
+
+    def stored_chain(self):
+        # Snapshots only use parents taken from the same block store
+        blockchain = Blockchain(difficulty=1)
+        blockchain.attach_store(BlockStore(tempfile.mkdtemp(prefix='snapshots-')))
+        self.addCleanup(blockchain.store.delete)
+        return blockchain
+
+    def mine(self, count):
+        for _ in range(count):
+            self.blockchain.mine_pending_transactions(self.miner)
+
+    def add_pending(self):
+        sender = Wallet()
+        tx = Transaction(sender.get_public_key(), self.miner, 1)
+        tx.sign(sender)
+        self.blockchain.pending_transactions.add(tx)
+        return tx
+
+    def test_snapshots_store_only_new_blocks(self):
+        self.mine(3)
+        first = create_snapshot('first', self.blockchain)
+        self.mine(2)
+        second = create_snapshot('second', self.blockchain)
+
+        self.assertIsNone(first.parent)
+        self.assertEqual(second.parent, first)
+        self.assertEqual((second.base_height, second.chain_height, second.depth), (4, 6, 1))
+        self.assertLess(len(second.delta_data), len(first.delta_data))
+
+        snapshot_cache.clear()
+        second = BlockchainSnapshot.objects.get(pk=second.pk)
+        self.assertEqual(materialize_snapshot(second), self.blockchain.to_dict())
+
+    def test_pending_pool_changes_are_replayed(self):
+        kept = self.add_pending()
+        mined = self.add_pending()
+        first = create_snapshot('first', self.blockchain)
+
+        self.blockchain.pending_transactions.remove(mined.calculate_txid())
+        added = self.add_pending()
+        second = create_snapshot('second', self.blockchain)
+
+        snapshot_cache.clear()
+        pending = load_snapshot_blockchain(BlockchainSnapshot.objects.get(pk=second.pk)).pending_transactions
+        self.assertEqual([tx.calculate_txid() for tx in pending], [kept.calculate_txid(), added.calculate_txid()])
+
+        first_pending = load_snapshot_blockchain(first).pending_transactions
+        self.assertEqual(len(first_pending), 2)
+
+    def test_other_chains_are_never_parents(self):
+        # Every chain starts with the same genesis block, so this one is a prefix of the next chain
+        first = create_snapshot('first', self.blockchain)
+
+        self.blockchain = self.stored_chain()
+        self.mine(3)
+        other = create_snapshot('other', self.blockchain)
+
+        self.assertEqual(self.blockchain.chain[0].hash, first.tip_hash)
+        self.assertIsNone(other.parent)
+        self.assertEqual(other.chain_id, self.blockchain.store.chain_id)
+        self.assertEqual(materialize_snapshot(other)['chain'], self.blockchain.to_dict()['chain'])
+
+    def test_chains_without_a_store_get_full_snapshots(self):
+        create_snapshot('first', self.blockchain)
+        snapshot = create_snapshot('unsaved', Blockchain(difficulty=1))
+
+        self.assertIsNone(snapshot.parent)
+        self.assertEqual(snapshot.chain_id, '')
+
+    def test_deleting_a_parent_rebases_its_children(self):
+        self.mine(1)
+        first = create_snapshot('first', self.blockchain)
+        self.mine(1)
+        self.add_pending()
+        second = create_snapshot('second', self.blockchain)
+        second_data = self.blockchain.to_dict()
+        self.mine(1)
+        third = create_snapshot('third', self.blockchain)
+
+        first.delete()
+        snapshot_cache.clear()
+
+        second = BlockchainSnapshot.objects.get(pk=second.pk)
+        third = BlockchainSnapshot.objects.get(pk=third.pk)
+        self.assertEqual((second.parent, second.depth, second.base_height), (None, 0, 0))
+        self.assertEqual((third.parent, third.depth), (second, 1))
+        self.assertEqual(materialize_snapshot(second), second_data)
+        self.assertEqual(materialize_snapshot(third), self.blockchain.to_dict())
+
+    @override_settings(SNAPSHOT_MAX_DEPTH=1, SNAPSHOT_COMPRESSION='lzma')
+    def test_depth_limit_starts_a_new_full_snapshot(self):
+        first = create_snapshot('first', self.blockchain)
+        self.mine(1)
+        second = create_snapshot('second', self.blockchain)
+        self.mine(1)
+        third = create_snapshot('third', self.blockchain)
+
+        self.assertEqual(second.parent, first)
+        self.assertIsNone(third.parent)
+        self.assertEqual(materialize_snapshot(third), self.blockchain.to_dict())
+
+    def test_full_snapshots_can_be_parents(self):
+        self.mine(2)
+        legacy = BlockchainSnapshot.objects.create(
+            name='legacy', blockchain_data=self.blockchain.to_dict(), chain_id=self.blockchain.store.chain_id,
+            chain_height=3, tip_hash=self.blockchain.chain[-1].hash,
+            difficulty=1, mining_reward=100,
+        )
+        self.mine(1)
+        delta = create_snapshot('delta', self.blockchain)
+
+        self.assertEqual(delta.parent, legacy)
+        snapshot_cache.clear()
+        self.assertEqual(materialize_snapshot(delta), self.blockchain.to_dict())
+
+    def test_materialized_chains_are_cached(self):
+        self.mine(1)
+        snapshot = create_snapshot('first', self.blockchain)
+
+        materialize_snapshot(snapshot)
+        with mock.patch('blockchain.snapshots._read_delta') as read_delta:
+            materialize_snapshot(snapshot)
+            read_delta.assert_not_called()
+
+    def test_save_and_load_views(self):
+        start_session_chain(self.client)
+        self.client.post(reverse('blockchain:save_snapshot'), {'name': 'first'})
+        self.client.post(reverse('blockchain:save_snapshot'), {'name': 'second'})
+        first, second = BlockchainSnapshot.objects.order_by('pk')
+        saved = session_blockchain(self.client).to_dict()['chain']
+
+        self.assertEqual(second.parent, first)
+
+        self.client.post(reverse('blockchain:reset_blockchain'))
+        self.client.post(reverse('blockchain:load_snapshot'), {'snapshot_id': second.pk})
+
+        self.assertEqual(session_blockchain(self.client).to_dict()['chain'], saved)
+
+
+class SnapshotListTests(TestCase):
+
+    def setUp(self):
+        blockchain = Blockchain(difficulty=1)
+        blockchain.mine_pending_transactions(Wallet().get_public_key())
+        self.delta = create_snapshot('delta', blockchain)
+        self.full = BlockchainSnapshot.objects.create(
+            name='full', blockchain_data=blockchain.to_dict(), difficulty=1, mining_reward=100,
+        )
+
+    def test_summary_columns_are_filled_on_save(self):
+        self.assertEqual((self.delta.chain_height, self.delta.pending_count), (2, 0))
+        self.assertEqual(self.delta.payload_size, len(self.delta.delta_data))
+
+        self.assertEqual(self.full.chain_height, 2)
+        self.assertEqual(self.full.tip_hash, self.delta.tip_hash)
+        self.assertEqual(self.full.payload_size, len(json.dumps(self.full.blockchain_data)))
+
+    @override_settings(SNAPSHOT_PAGE_SIZE=1)
+    def test_list_is_paginated_without_payloads(self):
+        with mock.patch('blockchain.views.render') as render:
+            render.return_value = HttpResponse()
+            self.client.get(reverse('blockchain:snapshot_list'), {'page': 2})
+
+        context = render.call_args[0][2]
+        self.assertEqual(context['page_obj'].paginator.num_pages, 2)
+
+        snapshot, = context['snapshots']
+        self.assertEqual(snapshot.name, 'delta')
+        self.assertEqual(snapshot.get_deferred_fields(), {'blockchain_data', 'delta_data'})
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class LazyChainTests(TestCase):
+
+    def setUp(self):
+        self.blockchain = Blockchain(difficulty=1)
+        self.miner = Wallet().get_public_key()
+        for _ in range(4):
+            self.blockchain.mine_pending_transactions(self.miner)
+
+    def test_length_and_tip_hash_decode_nothing(self):
+        restored = Blockchain.from_dict(self.blockchain.to_dict())
+
+        self.assertEqual(len(restored.chain), 5)
+        self.assertEqual(restored.chain.get_hash(-1), self.blockchain.chain[-1].hash)
+        self.assertEqual(restored.chain.get_decoded_count(), 0)
+
+        self.assertEqual(restored.get_latest_block().hash, self.blockchain.chain[-1].hash)
+        self.assertEqual(restored.chain.get_decoded_count(), 1)
+
+    def test_blocks_decode_on_access_and_iteration(self):
+        restored = Blockchain.from_dict(self.blockchain.to_dict())
+
+        self.assertEqual(restored.chain[2].to_dict(), self.blockchain.chain[2].to_dict())
+        self.assertIs(restored.chain[2], restored.chain[2])
+        self.assertEqual([b.hash for b in restored.chain[1:3]], [b.hash for b in self.blockchain.chain[1:3]])
+        self.assertEqual([b.hash for b in restored.chain], [b.hash for b in self.blockchain.chain])
+        self.assertEqual(restored.chain.get_decoded_count(), 5)
+
+        with self.assertRaises(IndexError):
+            restored.chain[5]
+
+    def test_indexes_are_built_on_first_use(self):
+        restored = Blockchain.from_dict(self.blockchain.to_dict())
+        restored.mine_pending_transactions(self.miner)
+
+        self.assertEqual(restored.get_balance_of_address(self.miner), 500)
+        self.assertEqual(restored.get_transaction_count(self.miner), 5)
+        self.assertTrue(restored.is_chain_valid())
+
+    def test_tip_only_views_decode_no_blocks(self):
+        self.client.get(reverse('blockchain:home'))
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': self.miner})
+        self.client.get(reverse('blockchain:home'))
+
+        with mock.patch.object(BlockStore, 'read_block') as read_block, \
+                mock.patch.object(BlockStore, 'read_blocks') as read_blocks:
+            self.client.get(reverse('blockchain:transaction_create'))
+            self.client.get(reverse('blockchain:mine_block'))
+            self.client.get(reverse('blockchain:api_get_pending_transactions'))
+
+            read_block.assert_not_called()
+            read_blocks.assert_not_called()
+
+
+class ChainCacheTests(TestCase):
+
+    def test_versions_and_byte_budget(self):
+        cache = ChainCache(max_bytes=100)
+
+        cache.put('a', 1, 'chain a', 60)
+        self.assertEqual(cache.get('a', 1), 'chain a')
+        self.assertIsNone(cache.get('a', 2))
+        self.assertEqual(len(cache), 0)
+
+        cache.put('a', 1, 'chain a', 60)
+        cache.put('b', 1, 'chain b', 30)
+        cache.get('a', 1)
+        cache.put('c', 1, 'chain c', 30)
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual(cache.get('c', 1), 'chain c')
+
+        cache.put('big', 1, 'too big', 101)
+        self.assertIsNone(cache.get('big', 1))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['stale'], stats['evictions'], stats['bytes']), (3, 1, 1, 90))
+
+    def test_values_are_remeasured_as_they_grow(self):
+        cache = ChainCache(max_bytes=100, size_of=len)
+        a, b = ['x'] * 40, ['y'] * 40
+        cache.put('a', 1, a)
+        cache.put('b', 1, b)
+        self.assertEqual(cache.stats()['bytes'], 80)
+
+        # 'a' grew while in use: the next lookup counts it and drops the older 'b'
+        a.extend(['x'] * 30)
+        self.assertIs(cache.get('a', 1), a)
+        self.assertEqual((cache.stats()['bytes'], len(cache)), (70, 1))
+
+        # A value that outgrows the whole budget is handed out once more, then dropped
+        a.extend(['x'] * 40)
+        self.assertIs(cache.get('a', 1), a)
+        self.assertIsNone(cache.get('a', 1))
+
+    def test_chain_estimate_follows_decoded_blocks(self):
+        miner = Wallet().get_public_key()
+        blockchain = Blockchain(difficulty=1)
+        for _ in range(4):
+            blockchain.mine_pending_transactions(miner)
+        loaded = Blockchain.from_dict(blockchain.to_dict())
+
+        self.assertEqual(loaded.estimate_memory(), 0)
+        loaded.get_latest_block()
+        one_block = loaded.estimate_memory()
+        self.assertGreater(one_block, 0)
+
+        loaded.get_balance_of_address(miner)
+        self.assertGreater(loaded.estimate_memory(), one_block * len(loaded.chain))
+
+
+@override_settings(MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class ChainCacheViewTests(TestCase):
+
+    def setUp(self):
+        chain_cache.clear()
+        start_session_chain(self.client)
+        self.client.get(reverse('blockchain:home'))
+        self.store = get_block_store(self.client.session['blockchain_data'])
+
+    def test_read_pages_reuse_the_cached_chain(self):
+        with mock.patch.object(Blockchain, 'from_store') as from_store:
+            self.client.get(reverse('blockchain:home'))
+            self.client.get(reverse('blockchain:transaction_pending'))
+            from_store.assert_not_called()
+
+        stats = self.client.get(reverse('blockchain:api_cache_stats')).json()['chains']
+        self.assertEqual(stats['size'], 1)
+        self.assertGreaterEqual(stats['hits'], 2)
+
+    def test_changes_by_other_workers_are_picked_up(self):
+        other = Blockchain.from_store(self.store)
+        other.mine_pending_transactions(Wallet().get_public_key())
+        other.save_state()
+
+        response = self.client.get(reverse('blockchain:home'))
+
+        self.assertEqual(response.context['total_blocks'], 2)
+        self.assertEqual(chain_cache.stats()['stale'], 1)
+
+    def test_reset_drops_the_cached_chain(self):
+        self.client.post(reverse('blockchain:reset_blockchain'))
+
+        self.assertIsNone(chain_cache.get(self.store.chain_id, self.store.get_version()))
+
+
+class StoreLockTests(TestCase):
+
+    def setUp(self):
+        self.store = BlockStore(tempfile.mkdtemp(prefix='blocklock-'))
+
+    def tearDown(self):
+        self.store.delete()
+
+    def test_lock_is_reentrant_within_a_thread(self):
+        with self.store.lock():
+            with self.store.lock():
+                pass
+            self.assertTrue(os.path.exists(self.store.lock().path))
+
+    def test_other_threads_wait_for_the_lock(self):
+        events = []
+        pause = threading.Event()
+
+        def contender():
+            with self.store.lock():
+                events.append('contender')
+
+        with self.store.lock():
+            thread = threading.Thread(target=contender)
+            thread.start()
+            pause.wait(0.2)
+            events.append('holder')
+
+        thread.join(5)
+        self.assertEqual(events, ['holder', 'contender'])
+
+
+@override_settings(BLOCKCHAIN_SHARED=True, SHARED_CHAIN_ID='shared-test', MINING_JOBS_ASYNC=False, BLOCKCHAIN_DIFFICULTY=1)
+class SharedChainTests(TestCase):
+
+    def setUp(self):
+        chain_cache.clear()
+        self.store = get_block_store('shared-test')
+        self.miner = Wallet()
+
+    def tearDown(self):
+        self.store.delete()
+
+    def _transaction(self, amount=10):
+        tx = Transaction(self.miner.get_public_key(), Wallet().get_public_key(), amount)
+        tx.sign(self.miner)
+        return tx.to_dict()
+
+    def test_sessions_share_one_chain(self):
+        alice, bob = Client(), Client()
+
+        # Bob's request commits the block Alice's job mined, without Alice coming back
+        alice.post(reverse('blockchain:mine_block'), {'miner_address': self.miner.get_public_key()})
+        response = bob.get(reverse('blockchain:home'))
+
+        self.assertEqual(response.context['total_blocks'], 2)
+        self.assertNotIn('blockchain_data', alice.session)
+        self.assertNotIn('blockchain_data', bob.session)
+
+    def test_front_page_reads_skip_the_lock(self):
+        self.client.get(reverse('blockchain:home'))
+
+        with mock.patch('blockchain.core.storage.StoreLock._acquire') as acquire:
+            response = self.client.get(reverse('blockchain:home'))
+            acquire.assert_not_called()
+
+        self.assertTrue(response.context['is_valid'])
+
+    def test_watermark_save_keeps_changes_made_meanwhile(self):
+        self.client.get(reverse('blockchain:home'))
+        other = Blockchain.from_store(self.store)
+        other.mine_pending_transactions(self.miner.get_public_key())
+        other.save_state()
+
+        is_chain_valid = Blockchain.is_chain_valid
+
+        def validate_while_another_worker_writes(blockchain, *args, **kwargs):
+            writer = Blockchain.from_store(self.store)
+            writer.add_transaction(Transaction.from_dict(self._transaction()))
+            writer.save_state()
+            return is_chain_valid(blockchain, *args, **kwargs)
+
+        with mock.patch.object(Blockchain, 'is_chain_valid', autospec=True,
+                               side_effect=validate_while_another_worker_writes):
+            response = self.client.get(reverse('blockchain:home'))
+
+        self.assertTrue(response.context['is_valid'])
+        self.assertEqual(len(Blockchain.from_store(self.store).pending_transactions), 1)
+
+    def test_submissions_see_changes_from_other_workers(self):
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': self.miner.get_public_key()})
+        self.client.get(reverse('blockchain:home'))
+        url = reverse('blockchain:api_submit_transactions')
+        self.client.post(url, [self._transaction()], content_type='application/json')
+
+        # Another process adds a transaction behind this process's cached copy
+        other = Blockchain.from_store(self.store)
+        other.add_transaction(Transaction.from_dict(self._transaction()))
+        other.save_state()
+
+        self.client.post(url, [self._transaction()], content_type='application/json')
+
+        self.assertEqual(len(Blockchain.from_store(self.store).pending_transactions), 3)
+
+    def test_writes_hold_the_chain_lock(self):
+        self.client.get(reverse('blockchain:home'))
+
+        with mock.patch('blockchain.core.storage.StoreLock._acquire') as acquire:
+            self.client.post(reverse('blockchain:api_submit_transactions'), [], content_type='application/json')
+            acquire.assert_called_once()
+
+    def _record_locking(self, events):
+        return mock.patch('blockchain.core.storage.StoreLock._acquire', side_effect=lambda *args: events.append('lock'))
+
+    def test_submissions_verify_signatures_before_the_lock(self):
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': self.miner.get_public_key()})
+        signature_cache.clear()
+        events = []
+        verify_signature = Wallet.verify_signature
+
+        def record_verification(*args):
+            events.append('verify')
+            return verify_signature(*args)
+
+        with self._record_locking(events), \
+                mock.patch.object(Wallet, 'verify_signature', side_effect=record_verification):
+            response = self.client.post(reverse('blockchain:api_submit_transactions'), [self._transaction()],
+                                        content_type='application/json')
+
+        self.assertEqual(response.json()['accepted'], 1)
+        self.assertEqual(events, ['verify', 'lock'])
+
+    def test_submissions_keep_changes_made_meanwhile(self):
+        self.client.post(reverse('blockchain:mine_block'), {'miner_address': self.miner.get_public_key()})
+        find_invalid_signatures = Blockchain.find_invalid_signatures
+
+        def verify_while_another_worker_writes(blockchain, transactions):
+            writer = Blockchain.from_store(self.store)
+            writer.add_transaction(Transaction.from_dict(self._transaction()))
+            writer.save_state()
+            return find_invalid_signatures(blockchain, transactions)
+
+        with mock.patch.object(Blockchain, 'find_invalid_signatures', autospec=True,
+                               side_effect=verify_while_another_worker_writes):
+            response = self.client.post(reverse('blockchain:api_submit_transactions'), [self._transaction()],
+                                        content_type='application/json')
+
+        self.assertEqual(response.json()['accepted'], 1)
+        self.assertEqual(len(Blockchain.from_store(self.store).pending_transactions), 2)
+
+    def test_validation_takes_the_lock_only_to_save(self):
+        self.client.get(reverse('blockchain:home'))
+        events = []
+        is_chain_valid = Blockchain.is_chain_valid
+
+        def record_validation(blockchain, *args, **kwargs):
+            events.append('validate')
+            return is_chain_valid(blockchain, *args, **kwargs)
+
+        with self._record_locking(events), \
+                mock.patch.object(Blockchain, 'is_chain_valid', autospec=True, side_effect=record_validation):
+            self.client.get(reverse('blockchain:validate_chain'))
+
+        self.assertEqual(events, ['validate', 'lock'])
+
+    def test_shared_chain_cannot_be_reset(self):
+        self.client.get(reverse('blockchain:home'))
+        self.client.post(reverse('blockchain:reset_blockchain'))
+
+        self.assertTrue(self.store.exists())
@@ -29,6 +29,7 @@ urlpatterns = [
 
     # Block details
     path('block/<int:index>/', views.block_detail, name='block_detail'),
+    path('block/<int:index>/proof/<str:txid>/', views.api_get_transaction_proof, name='api_get_transaction_proof'),
 
     # Blockchain operations
     path('validate/', views.validate_chain, name='validate_chain'),
@@ -42,4 +43,9 @@ urlpatterns = [
     # API endpoints (for AJAX)
     path('api/chain/', views.api_get_chain, name='api_get_chain'),
     path('api/pending-transactions/', views.api_get_pending_transactions, name='api_get_pending_transactions'),
+    path('api/transactions/bulk/', views.api_submit_transactions, name='api_submit_transactions'),
+    path('api/mining-jobs/<int:job_id>/', views.api_mining_job_status, name='api_mining_job_status'),
+    path('api/balances/', views.api_get_balances, name='api_get_balances'),
+    path('api/address/<str:address>/transactions/', views.api_get_address_transactions, name='api_get_address_transactions'),
+    path('api/cache-stats/', views.api_cache_stats, name='api_cache_stats'),
 ]
\ No newline at end of file
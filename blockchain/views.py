@@ -5,9 +5,13 @@ Views for blockchain app
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
 
 from .forms import (
     CreateWalletForm,
@@ -18,45 +22,281 @@ from .forms import (
     SaveSnapshotForm,
     LoadSnapshotForm
 )
-from .models import WalletModel, BlockchainSnapshot, TransactionLog
+from .models import WalletModel, BlockchainSnapshot, TransactionLog, MiningJob
+from .jobs import submit_mining_job, commit_finished_jobs, has_finished_jobs, abandon_jobs, fail_lost_jobs
+from . import records
+from .snapshots import create_snapshot, load_snapshot_blockchain, snapshot_cache
+from .core.cache import chain_cache, signature_cache, signing_key_cache, verifying_key_cache
 
 import json
+import os
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
 
 
 # ============================================================================
 # Helper Functions for Session Management
 # ============================================================================
 
+def get_block_store(chain_id):
+    """
+    Get the on-disk block store of a chain
+    """
+    from .core.storage import BlockStore
+
+    return BlockStore(os.path.join(settings.BLOCK_STORE_DIR, chain_id))
+
+
+def get_chain_id(request):
+    """
+    Id of the chain a request works on: the shared chain, or the session's own
+    """
+    if settings.BLOCKCHAIN_SHARED:
+        return settings.SHARED_CHAIN_ID
+
+    return request.session.get(settings.BLOCKCHAIN_SESSION_KEY)
+
+
+def load_blockchain(store):
+    """
+    Load a chain from its block store, or None if the store is empty
+
+    The process-wide cache is reused as long as the store hasn't changed.
+    """
+    from .core.blockchain import Blockchain
+
+    version = store.get_version()
+    if version is None:
+        return None
+
+    blockchain = chain_cache.get(store.chain_id, version)
+    if blockchain is None:
+        blockchain = Blockchain.from_store(store)
+        chain_cache.put(store.chain_id, version, blockchain)
+
+    blockchain.mining_workers = settings.MINING_WORKERS
+    blockchain.verify_workers = settings.SIGNATURE_VERIFY_WORKERS
+    blockchain.pending_transactions.set_max_size(settings.MEMPOOL_MAX_SIZE)
+    blockchain.pending_transactions.set_max_per_sender(settings.MEMPOOL_MAX_PER_SENDER)
+
+    return blockchain
+
+
+def new_blockchain():
+    """
+    Create a chain with only the genesis block, using the configured parameters
+    """
+    from .core.blockchain import Blockchain
+
+    return Blockchain(
+        difficulty=settings.BLOCKCHAIN_DIFFICULTY,
+        mining_reward=settings.MINING_REWARD,
+        mining_workers=settings.MINING_WORKERS,
+        verify_workers=settings.SIGNATURE_VERIFY_WORKERS,
+        target_block_time=settings.BLOCKCHAIN_TARGET_BLOCK_TIME,
+        retarget_interval=settings.BLOCKCHAIN_RETARGET_INTERVAL,
+        max_pending_transactions=settings.MEMPOOL_MAX_SIZE,
+        max_pending_per_sender=settings.MEMPOOL_MAX_PER_SENDER
+    )
+
+
 def get_blockchain(request):
     """
-    Get or create blockchain instance from session
+    Get or create the request's blockchain, loaded from its block store
+
+    A session without a chain gets a fresh one that is only written to a
+    block store by save_blockchain, so visits that never change the chain
+    (bots, one-off page views) leave nothing on disk.
     """
     from .core.blockchain import Blockchain
 
-    blockchain_data = request.session.get(settings.BLOCKCHAIN_SESSION_KEY)
+    # The session holds at most the id of its chain's block store
+    chain_ref = get_chain_id(request)
 
-    if blockchain_data:
-        # Load existing blockchain from session
-        blockchain = Blockchain.from_dict(blockchain_data)
-    else:
-        # Create new blockchain
-        blockchain = Blockchain(
-            difficulty=settings.BLOCKCHAIN_DIFFICULTY,
-            mining_reward=settings.MINING_REWARD
-        )
-        # Save to session
+    if isinstance(chain_ref, dict):
+        # Sessions from before the block store carry the whole chain; move it to disk
+        blockchain = Blockchain.from_dict(chain_ref)
         save_blockchain(request, blockchain)
+        chain_ref = blockchain.store.chain_id
+    elif not chain_ref:
+        return new_blockchain()
+
+    store = get_block_store(chain_ref)
+    blockchain = load_blockchain(store)
+
+    if blockchain is not None and not has_finished_jobs(chain_ref):
+        return blockchain
+
+    # Creating the chain and committing mined blocks change it, so both happen under its lock
+    with store.lock():
+        # Another request may have created or extended the chain in the meantime
+        blockchain = load_blockchain(store)
+
+        if blockchain is None:
+            blockchain = new_blockchain()
+            save_blockchain(request, blockchain, store)
+
+        # Pick up blocks mined by background jobs on this chain, whichever session started them
+        elif commit_finished_jobs(blockchain):
+            save_blockchain(request, blockchain)
 
     return blockchain
 
 
-def save_blockchain(request, blockchain):
+def store_blockchain(blockchain, store=None):
     """
-    Save blockchain instance to session
+    Save blockchain state to its block store
+
+    Blocks are written to the store as they are appended, so this only
+    rewrites the chain's small metadata file (pending transactions etc.).
+    A chain without a store is written to `store`, or to a new one.
     """
-    request.session[settings.BLOCKCHAIN_SESSION_KEY] = blockchain.to_dict()
-    request.session.modified = True
+    if blockchain.store is None:
+        blockchain.attach_store(store if store is not None else get_block_store(uuid.uuid4().hex))
+    else:
+        blockchain.save_state()
+
+    # Keep the block/transaction rows in step with the store
+    records.index_store(blockchain.store)
+
+    # Later requests of this process can use the object as it is now
+    store = blockchain.store
+    chain_cache.put(store.chain_id, store.get_version(), blockchain)
+
+
+def save_blockchain(request, blockchain, store=None):
+    """
+    Save blockchain state to its block store and remember the store in the session
+    """
+    store_blockchain(blockchain, store)
+
+    # With a shared chain sessions only keep their wallets
+    if not settings.BLOCKCHAIN_SHARED:
+        request.session[settings.BLOCKCHAIN_SESSION_KEY] = blockchain.store.chain_id
+
+
+def discard_blockchain(request):
+    """
+    Remove the session's blockchain and its block store
+    """
+    chain_ref = request.session.pop(settings.BLOCKCHAIN_SESSION_KEY, None)
+    if isinstance(chain_ref, str) and chain_ref:
+        chain_cache.discard(chain_ref)
+        get_block_store(chain_ref).delete()
+        records.delete_chain_rows(chain_ref)
+        abandon_jobs(chain_ref)
+
+
+@contextmanager
+def chain_lock(store):
+    """
+    Hold a chain's lock while changing it
+
+    Concurrent mines and submissions to the same chain (the shared chain in
+    particular) then load, change and save it one after another.
+    """
+    with store.lock():
+        try:
+            yield
+        except Exception:
+            # The cached copy may have been changed without being saved
+            chain_cache.discard(store.chain_id)
+            raise
+
+
+def chain_write(view):
+    """
+    Run a view that changes the chain while holding the chain's lock
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        chain_ref = get_chain_id(request)
+
+        # A session without a chain yet gets a new one of its own, nothing to wait for
+        if not isinstance(chain_ref, str) or not chain_ref:
+            return view(request, *args, **kwargs)
+
+        with chain_lock(get_block_store(chain_ref)):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def get_chain_version(request):
+    """
+    Version of the request's block store, or None if it has none yet
+
+    Taken before loading a chain that is then checked without the lock, so
+    save_if_unchanged can tell whether anyone wrote to the store since.
+    """
+    chain_ref = get_chain_id(request)
+    if not isinstance(chain_ref, str) or not chain_ref:
+        return None
+
+    return get_block_store(chain_ref).get_version()
+
+
+def save_if_unchanged(request, blockchain, version):
+    """
+    Save a chain changed without its lock, unless its store was written to since `version`
+
+    A chain changed in the meantime is not overwritten; what was worked out
+    without the lock (a validation watermark) is just worked out again later.
+    """
+    if version is None or blockchain.store is None:
+        return False
+
+    with blockchain.store.lock():
+        if blockchain.store.get_version() != version:
+            return False
+
+        save_blockchain(request, blockchain)
+
+    return True
+
+
+def get_indexed_chain_id(request):
+    """
+    Get the id of the request's chain with its block/transaction rows up to date
+
+    Pages that only read blocks or address history query the rows by this id
+    instead of loading the whole chain.
+    """
+    chain_ref = get_chain_id(request)
+
+    if not isinstance(chain_ref, dict) and not has_finished_jobs(chain_ref):
+        # Sessions that never changed their chain all read the same fresh one
+        if not chain_ref:
+            return get_new_chain_id()
+
+        store = get_block_store(chain_ref)
+        if store.exists():
+            records.index_store(store)
+            return chain_ref
+
+    # Old-style sessions and freshly mined blocks go through the full load, which also indexes
+    return get_blockchain(request).store.chain_id
+
+
+def get_new_chain_id():
+    """
+    Get the id of a read-only store holding the fresh chain of sessions without one
+    """
+    blockchain = new_blockchain()
+
+    # Named after the genesis hash, so a change of mining settings gets its own store
+    chain_id = f'new-{blockchain.chain.get_hash(0)[:16]}'
+    store = get_block_store(chain_id)
+
+    if not store.exists():
+        with store.lock():
+            if not store.exists():
+                blockchain.attach_store(store)
+
+    records.index_store(store)
+    return chain_id
 
 
 def get_wallets(request):
@@ -99,16 +339,35 @@ def remove_wallet(request, address):
 def home(request):
     """
     Home page - Display blockchain overview
+
+    Rendered without the chain's lock, so front page views don't queue behind
+    each other or behind writers; only saving a new watermark takes it.
     """
+    # The store's version before loading tells whether anyone wrote to it since
+    version = get_chain_version(request)
     blockchain = get_blockchain(request)
 
+    # Only blocks added since the last validation are checked
+    validated_height = blockchain.validated_height
+    is_valid = blockchain.is_chain_valid(incremental=True)
+    if blockchain.validated_height != validated_height:
+        save_if_unchanged(request, blockchain, version)
+
+    # Only the newest blocks are decoded and shown, the rest is paged through api/chain/
+    start = max(len(blockchain.chain) - settings.HOME_RECENT_BLOCKS, 0)
+    chain = [dict(block.to_dict(), height=height)
+             for height, block in enumerate(blockchain.chain[start:], start)]
+
     context = {
         'blockchain': blockchain,
-        'chain': blockchain.to_dict()['chain'],
-        'difficulty': blockchain.difficulty,
+        'chain': chain,
+        'chain_start': start,
+        'chain_page_size': settings.CHAIN_API_PAGE_SIZE,
+        'difficulty': blockchain.get_current_difficulty(),
+        'target': format(blockchain.get_current_target(), '064x'),
         'mining_reward': blockchain.mining_reward,
         'pending_count': len(blockchain.pending_transactions),
-        'is_valid': blockchain.is_chain_valid(),
+        'is_valid': is_valid,
         'total_blocks': len(blockchain.chain),
     }
 
@@ -133,9 +392,10 @@ def wallet_list(request):
     wallets = get_wallets(request)
     blockchain = get_blockchain(request)
 
-    # Calculate balance for each wallet
+    # Look up every wallet's balance at once
+    balances = blockchain.get_balances([wallet['public_key'] for wallet in wallets])
     for wallet in wallets:
-        wallet['balance'] = blockchain.get_balance_of_address(wallet['public_key'])
+        wallet['balance'] = balances[wallet['public_key']]
 
     context = {
         'wallets': wallets,
@@ -221,6 +481,7 @@ def wallet_delete(request, address):
 # Transaction Views
 # ============================================================================
 
+@chain_write
 def transaction_create(request):
     """
     Create a new transaction
@@ -299,63 +560,107 @@ def transaction_pending(request):
 # Mining Views
 # ============================================================================
 
+@chain_write
 def mine_block(request):
-
+    """
+    Submit a background mining job for the pending transactions
+    """
     blockchain = get_blockchain(request)
 
     if request.method == 'POST':
         form = MineBlockForm(request.POST)
 
         if form.is_valid():
-            try:
-                miner_address = form.cleaned_data['miner_address']
+            miner_address = form.cleaned_data['miner_address']
+
+            # Jobs are tied to the session, so make sure it has a key
+            if not request.session.session_key:
+                request.session.save()
 
-                # Mine the block
-                print(f"Mining for: {miner_address}")  # للتشخيص
-                blockchain.mine_pending_transactions(miner_address)
+            # ...and to a stored chain, which a session's first mine creates
+            if blockchain.store is None:
                 save_blockchain(request, blockchain)
 
-                messages.success(request, f'Block mined successfully! Reward sent to {miner_address[:20]}...')
-                return redirect('blockchain:home')
+            job = submit_mining_job(request.session.session_key, blockchain, miner_address)
 
-            except Exception as e:
-                print(f"Mining error: {str(e)}")  # للتشخيص
-                messages.error(request, f'Error mining block: {str(e)}')
-        else:
-            print(f"Form errors: {form.errors}")  # للتشخيص
+            if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                return JsonResponse(mining_job_to_dict(job), status=202)
+
+            messages.info(request, f'Mining job #{job.pk} submitted. Reward will be sent to {miner_address[:20]}...')
+            return redirect(f"{reverse('blockchain:mine_block')}?job={job.pk}")
     else:
         form = MineBlockForm()
 
     context = {
         'form': form,
         'pending_count': len(blockchain.pending_transactions),
+        'job_id': request.GET.get('job'),
     }
 
     return render(request, 'blockchain/mine_block.html', context)
 
 
+def mining_job_to_dict(job):
+    """
+    Convert a mining job to its JSON status representation
+    """
+    end = job.finished_at or timezone.now()
+    start = job.started_at
+
+    return {
+        'job_id': job.pk,
+        'status': job.status,
+        'miner_address': job.miner_address,
+        'transaction_count': job.transaction_count,
+        'created_at': job.created_at.isoformat(),
+        'started_at': start.isoformat() if start else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'elapsed_seconds': (end - start).total_seconds() if start else 0,
+        'block_hash': job.block_data['hash'] if job.block_data else None,
+        'block_index': job.block_index,
+        'committed': job.committed,
+        'error': job.error,
+        'status_url': reverse('blockchain:api_mining_job_status', args=[job.pk]),
+    }
+
 
 # ============================================================================
 # Balance and Details Views
 # ============================================================================
 
+def history_to_dicts(history):
+    """
+    Convert (block height, transaction) pairs to dicts for templates and JSON
+    """
+    return [
+        dict(tx.to_dict(), block_index=height)
+        for height, tx in history
+    ]
+
+
 def check_balance(request):
     """
     Check balance of an address
     """
-    blockchain = get_blockchain(request)
+    chain_id = get_indexed_chain_id(request)
     balance = None
     address = None
     transactions = []
+    transaction_count = 0
+    next_cursor = None
 
     if request.method == 'POST':
         form = CheckBalanceForm(request.POST)
 
         if form.is_valid():
             address = form.cleaned_data['address']
-            balance = blockchain.get_balance_of_address(address)
-            transactions = blockchain.get_all_transactions_for_wallet(address)
-            transactions = [tx.to_dict() for tx in transactions]
+            balance = records.get_address_balance(chain_id, address)
+
+            # First page only; the address page has the rest
+            transactions, next_cursor = records.get_address_history(
+                chain_id, address, limit=settings.TRANSACTION_HISTORY_PAGE_SIZE
+            )
+            transaction_count = records.get_address_transaction_count(chain_id, address)
     else:
         form = CheckBalanceForm()
 
@@ -364,6 +669,8 @@ def check_balance(request):
         'balance': balance,
         'address': address,
         'transactions': transactions,
+        'transaction_count': transaction_count,
+        'next_cursor': next_cursor,
     }
 
     return render(request, 'blockchain/check_balance.html', context)
@@ -373,17 +680,26 @@ def address_detail(request, address):
     """
     Display details for a specific address
     """
-    blockchain = get_blockchain(request)
-
-    balance = blockchain.get_balance_of_address(address)
-    transactions = blockchain.get_all_transactions_for_wallet(address)
-    transactions = [tx.to_dict() for tx in transactions]
+    chain_id = get_indexed_chain_id(request)
+
+    try:
+        transactions, next_cursor = records.get_address_history(
+            chain_id,
+            address,
+            limit=settings.TRANSACTION_HISTORY_PAGE_SIZE,
+            cursor=request.GET.get('cursor')
+        )
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('blockchain:address_detail', address=address)
 
     context = {
         'address': address,
-        'balance': balance,
+        'balance': records.get_address_balance(chain_id, address),
         'transactions': transactions,
-        'transaction_count': len(transactions),
+        'transaction_count': records.get_address_transaction_count(chain_id, address),
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
     }
 
     return render(request, 'blockchain/address_detail.html', context)
@@ -393,62 +709,60 @@ def block_detail(request, index):
     """
     Display details of a specific block
     """
-    blockchain = get_blockchain(request)
-
-    # Validate index
-    if index >= len(blockchain.chain) or index < 0:
-        messages.error(request, f'Block {index} does not exist!')
-        return redirect('blockchain:home')
+    store = get_block_store(get_indexed_chain_id(request))
 
-    # Get block
-    block = blockchain.chain[index]
-
-    # Convert block to dict using to_dict() method
-    if hasattr(block, 'to_dict'):
-        block_dict = block.to_dict()
-    else:
-        # Manual conversion
-        block_dict = {
-            'timestamp': block.timestamp,
-            'previous_hash': block.previous_hash,
-            'nonce': block.nonce,
-            'hash': block.hash,
-            'transactions': []
-        }
+    # Only the requested block is decoded, straight from the memory-mapped store
+    with store.open_reader() as reader:
+        if index >= len(reader) or index < 0:
+            messages.error(request, f'Block {index} does not exist!')
+            return redirect('blockchain:home')
 
-        # Convert transactions
-        for tx in block.transactions:
-            if hasattr(tx, 'to_dict'):
-                block_dict['transactions'].append(tx.to_dict())
-            else:
-                block_dict['transactions'].append({
-                    'from': getattr(tx, 'from_address', None),
-                    'to': getattr(tx, 'to_address', ''),
-                    'amount': getattr(tx, 'amount', 0),
-                    'timestamp': getattr(tx, 'timestamp', 0),
-                    'signature': getattr(tx, 'signature', None)
-                })
-
-    # Debug - طباعة للتأكد
-    print(f"\n=== SENDING TO TEMPLATE ===")
-    print(f"index: {index}")
-    print(f"block_dict keys: {block_dict.keys()}")
-    print(f"timestamp: {block_dict.get('timestamp')}")
-    print(f"nonce: {block_dict.get('nonce')}")
-    print(f"hash: {block_dict.get('hash', '')[:20]}")
-    print(f"transactions count: {len(block_dict.get('transactions', []))}")
-    print(f"===========================\n")
+        block_dict = reader.read_block(index).to_dict()
+        height = len(reader)
 
     context = {
         'index': index,
         'is_genesis': index == 0,
         'prev_block': index - 1 if index > 0 else None,
-        'next_block': index + 1 if index + 1 < len(blockchain.chain) else None,
+        'next_block': index + 1 if index + 1 < height else None,
         'block': block_dict,
     }
 
     return render(request, 'blockchain/block_detail.html', context)
 
+def api_get_transaction_proof(request, index, txid):
+    """
+    API endpoint to get a merkle inclusion proof for a transaction in a block
+    """
+    store = get_block_store(get_indexed_chain_id(request))
+
+    with store.open_reader() as reader:
+        if index >= len(reader) or index < 0:
+            return JsonResponse({'error': f'Block {index} does not exist'}, status=404)
+
+        block = reader.read_block(index)
+
+    txids = block.get_transaction_ids()
+
+    if txid not in txids:
+        return JsonResponse({'error': f'Transaction {txid} is not in block {index}'}, status=404)
+
+    tx_index = txids.index(txid)
+
+    return JsonResponse({
+        'block_index': index,
+        'block_hash': block.hash,
+        'header': {
+            'timestamp': block.timestamp,
+            'previous_hash': block.previous_hash,
+            'merkle_root': block.merkle_root,
+            'nonce': block.nonce,
+        },
+        'txid': txid,
+        'tx_index': tx_index,
+        'proof': block.get_merkle_proof(tx_index),
+    })
+
 # ============================================================================
 # Blockchain Operations
 # ============================================================================
@@ -456,26 +770,38 @@ def block_detail(request, index):
 def validate_chain(request):
     """
     Validate the blockchain
+
+    Like the home page, the whole chain is checked without its lock; only
+    saving the new watermark takes it.
     """
+    version = get_chain_version(request)
     blockchain = get_blockchain(request)
+
+    # Explicit validation always re-checks the whole chain
     is_valid = blockchain.is_chain_valid()
+    if is_valid:
+        save_if_unchanged(request, blockchain, version)
 
     if is_valid:
         messages.success(request, 'Blockchain is valid! ✓')
     else:
-        messages.error(request, 'Blockchain is invalid! Chain has been tampered with.')
+        messages.error(request, f'Blockchain is invalid! {blockchain.validation_error}.')
 
     return redirect('blockchain:home')
 
 
 @require_http_methods(["POST"])
+@chain_write
 def reset_blockchain(request):
     """
     Reset the blockchain to genesis block
     """
-    # Clear blockchain from session
-    if settings.BLOCKCHAIN_SESSION_KEY in request.session:
-        del request.session[settings.BLOCKCHAIN_SESSION_KEY]
+    if settings.BLOCKCHAIN_SHARED:
+        messages.error(request, 'The shared blockchain cannot be reset.')
+        return redirect('blockchain:home')
+
+    # Clear blockchain from session and disk
+    discard_blockchain(request)
 
     messages.success(request, 'Blockchain has been reset!')
     return redirect('blockchain:home')
@@ -495,12 +821,8 @@ def save_snapshot(request):
         if form.is_valid():
             blockchain = get_blockchain(request)
 
-            snapshot = BlockchainSnapshot.objects.create(
-                name=form.cleaned_data['name'],
-                blockchain_data=blockchain.to_dict(),
-                difficulty=blockchain.difficulty,
-                mining_reward=blockchain.mining_reward,
-            )
+            # Only blocks added since the closest earlier snapshot are stored
+            snapshot = create_snapshot(form.cleaned_data['name'], blockchain)
 
             messages.success(request, f'Snapshot "{snapshot.name}" saved successfully!')
             return redirect('blockchain:snapshot_list')
@@ -514,21 +836,28 @@ def save_snapshot(request):
     return render(request, 'blockchain/save_snapshot.html', context)
 
 
+@chain_write
 def load_snapshot(request):
     """
     Load a blockchain snapshot
     """
-    snapshots = BlockchainSnapshot.objects.all()
+    # The select only needs names and dates, not the payloads
+    snapshots = BlockchainSnapshot.objects.only('id', 'name', 'created_at')
 
     if request.method == 'POST':
+        if settings.BLOCKCHAIN_SHARED:
+            messages.error(request, 'Snapshots cannot replace the shared blockchain.')
+            return redirect('blockchain:snapshot_list')
+
         form = LoadSnapshotForm(request.POST, snapshots=snapshots)
 
         if form.is_valid():
             snapshot_id = form.cleaned_data['snapshot_id']
             snapshot = get_object_or_404(BlockchainSnapshot, id=snapshot_id)
 
-            # Load blockchain from snapshot
-            request.session[settings.BLOCKCHAIN_SESSION_KEY] = snapshot.blockchain_data
+            # Load blockchain from snapshot into a fresh block store
+            discard_blockchain(request)
+            save_blockchain(request, load_snapshot_blockchain(snapshot))
 
             messages.success(request, f'Snapshot "{snapshot.name}" loaded successfully!')
             return redirect('blockchain:home')
@@ -547,10 +876,13 @@ def snapshot_list(request):
     """
     List all blockchain snapshots
     """
-    snapshots = BlockchainSnapshot.objects.all()
+    # Rendered from the summary columns; payloads are only read when a snapshot is loaded
+    snapshots = BlockchainSnapshot.objects.defer('blockchain_data', 'delta_data')
+    page = Paginator(snapshots, settings.SNAPSHOT_PAGE_SIZE).get_page(request.GET.get('page'))
 
     context = {
-        'snapshots': snapshots,
+        'snapshots': page.object_list,
+        'page_obj': page,
     }
 
     return render(request, 'blockchain/snapshot_list.html', context)
@@ -563,9 +895,43 @@ def snapshot_list(request):
 def api_get_chain(request):
     """
     API endpoint to get blockchain data as JSON
+
+    With ?start= and/or ?limit= only that range of blocks is read and returned.
     """
-    blockchain = get_blockchain(request)
-    return JsonResponse(blockchain.to_dict(), safe=False)
+    if 'start' not in request.GET and 'limit' not in request.GET:
+        blockchain = get_blockchain(request)
+        return JsonResponse(blockchain.to_dict(), safe=False)
+
+    try:
+        start = max(int(request.GET.get('start', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', settings.CHAIN_API_PAGE_SIZE)), 1), settings.CHAIN_API_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'start and limit must be integers'}, status=400)
+
+    store = get_block_store(get_indexed_chain_id(request))
+
+    with store.open_reader() as reader:
+        chain = [block.to_dict() for block in reader.read_blocks(start, start + limit)]
+        height = len(reader)
+
+    return JsonResponse({
+        'height': height,
+        'start': start,
+        'chain': chain,
+    })
+
+
+def api_cache_stats(request):
+    """
+    API endpoint reporting hit rates and sizes of the per-process caches
+    """
+    return JsonResponse({
+        'chains': chain_cache.stats(),
+        'snapshots': snapshot_cache.stats(),
+        'signatures': signature_cache.stats(),
+        'verifying_keys': verifying_key_cache.stats(),
+        'signing_keys': signing_key_cache.stats(),
+    })
 
 
 def api_get_pending_transactions(request):
@@ -576,3 +942,161 @@ def api_get_pending_transactions(request):
     pending = [tx.to_dict() for tx in blockchain.pending_transactions]
     return JsonResponse({'pending_transactions': pending}, safe=False)
 
+
+
+def api_mining_job_status(request, job_id):
+    """
+    API endpoint to poll the status of a background mining job
+    """
+    # Jobs whose worker went away (e.g. with a restarted process) would otherwise never finish
+    fail_lost_jobs()
+
+    job = get_object_or_404(MiningJob, pk=job_id, session_key=request.session.session_key)
+
+    # Commits the mined block if the worker couldn't
+    if job.status == MiningJob.STATUS_DONE and not job.committed:
+        get_blockchain(request)
+        job.refresh_from_db()
+
+    return JsonResponse(mining_job_to_dict(job))
+
+
+def api_get_address_transactions(request, address):
+    """
+    API endpoint to page through an address's transactions, newest first
+    """
+    blockchain = get_blockchain(request)
+
+    try:
+        limit = min(int(request.GET.get('limit', settings.TRANSACTION_HISTORY_PAGE_SIZE)), 100)
+        history, next_cursor = blockchain.get_transaction_history(
+            address, limit=max(limit, 1), cursor=request.GET.get('cursor')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'address': address,
+        'balance': blockchain.get_balance_of_address(address),
+        'transaction_count': blockchain.get_transaction_count(address),
+        'transactions': history_to_dicts(history),
+        'next_cursor': next_cursor,
+    })
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def api_get_balances(request):
+    """
+    API endpoint to get the balances of many addresses in one request
+
+    GET takes repeated ?address= parameters, POST a JSON body {"addresses": [...]}.
+    """
+    if request.method == 'POST':
+        try:
+            addresses = json.loads(request.body or b'{}').get('addresses')
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    else:
+        addresses = request.GET.getlist('address')
+
+    if not isinstance(addresses, list) or not all(isinstance(address, str) for address in addresses):
+        return JsonResponse({'error': 'addresses must be a list of strings'}, status=400)
+
+    if len(addresses) > settings.MAX_BALANCE_QUERY_ADDRESSES:
+        return JsonResponse(
+            {'error': f'At most {settings.MAX_BALANCE_QUERY_ADDRESSES} addresses per request'},
+            status=400
+        )
+
+    blockchain = get_blockchain(request)
+    return JsonResponse({'balances': blockchain.get_balances(addresses)})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_submit_transactions(request):
+    """
+    API endpoint to submit many pre-signed transactions in one request
+
+    The body is a JSON array of transactions in the Transaction.to_dict shape,
+    or an object {"transactions": [...]}. Each transaction is accepted or
+    rejected on its own; the chain is saved once for the whole batch.
+
+    Signatures are verified before taking the chain's lock, which is only
+    held to add the transactions to the chain as it is then and save it.
+    """
+    from .core.transaction import Transaction
+
+    try:
+        payload = json.loads(request.body or b'[]')
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON'}, status=400)
+
+    if isinstance(payload, dict):
+        payload = payload.get('transactions')
+
+    if not isinstance(payload, list):
+        return JsonResponse({'error': 'transactions must be a list'}, status=400)
+
+    if len(payload) > settings.MAX_BULK_TRANSACTIONS:
+        return JsonResponse(
+            {'error': f'At most {settings.MAX_BULK_TRANSACTIONS} transactions per request'},
+            status=400
+        )
+
+    # Parse each entry on its own so one malformed transaction doesn't reject the batch
+    results = [None] * len(payload)
+    transactions = []
+    positions = []
+
+    for i, tx_data in enumerate(payload):
+        try:
+            if not isinstance(tx_data, dict):
+                raise ValueError('Transaction must be an object')
+
+            amount = tx_data.get('amount')
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                raise ValueError('amount must be a number')
+
+            transactions.append(Transaction.from_dict(tx_data))
+            positions.append(i)
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = {'accepted': False, 'error': f'Malformed transaction: {e}'}
+
+    # Signatures don't depend on the chain's state, so the slow part runs without the lock
+    blockchain = get_blockchain(request)
+    invalid_signatures = blockchain.find_invalid_signatures(transactions)
+
+    if blockchain.store is None:
+        # A session's first chain, nobody else can be writing to it
+        added = blockchain.add_transactions(transactions, invalid_signatures)
+        if any(error is None for _, error in added):
+            save_blockchain(request, blockchain)
+    else:
+        store = blockchain.store
+        with chain_lock(store):
+            # The cached copy is reused if the store wasn't written to meanwhile, else its new state is loaded
+            blockchain = load_blockchain(store)
+            if blockchain is None:
+                blockchain = new_blockchain()
+
+            added = blockchain.add_transactions(transactions, invalid_signatures)
+            if any(error is None for _, error in added):
+                save_blockchain(request, blockchain, store)
+
+    for i, (txid, error) in zip(positions, added):
+        results[i] = {
+            'accepted': error is None,
+            'txid': txid,
+            'error': error,
+        }
+
+    accepted = sum(1 for result in results if result['accepted'])
+
+    return JsonResponse({
+        'accepted': accepted,
+        'rejected': len(results) - accepted,
+        'results': results,
+    })
+
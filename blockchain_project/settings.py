@@ -139,6 +139,34 @@ MESSAGE_TAGS = {
 
 # Blockchain specific settings
 BLOCKCHAIN_DIFFICULTY = 4  # Number of leading zeros required in block hash
+BLOCKCHAIN_TARGET_BLOCK_TIME = 30  # Seconds between blocks that retargeting aims for
+BLOCKCHAIN_RETARGET_INTERVAL = 10  # Blocks between target adjustments (0 keeps the target fixed)
+MINING_WORKERS = 1  # Processes used for proof-of-work (os.cpu_count() to use every core)
+SIGNATURE_VERIFY_WORKERS = 1  # Processes used to verify signatures during chain validation
+CRYPTO_BACKEND = 'ecdsa'  # Signing/verification library: 'ecdsa' or 'eth-keys' (needs coincurve)
+SIGNATURE_CACHE_SIZE = 10000  # Verified signatures remembered per process
+SIGNATURE_CACHE_ENABLED = True  # Set to False to re-verify every signature (audits)
+VERIFYING_KEY_CACHE_SIZE = 1024  # Decoded sender public keys kept per process
+SIGNING_KEY_CACHE_SIZE = 256  # Decoded wallet private keys kept per process
+MEMPOOL_MAX_SIZE = 5000  # Pending transactions kept per chain; when full, the sender with the most pending loses its oldest (0 = unlimited)
+MEMPOOL_MAX_PER_SENDER = 500  # Pending transactions one sender can have at once (0 = unlimited)
+MINING_JOB_WORKERS = 1  # Background threads running mining jobs
+MINING_JOBS_ASYNC = True  # Run mining jobs in the background (False mines inside the request)
+MINING_JOB_TIMEOUT = 600  # Seconds after which a queued or running job counts as lost and is failed
 MINING_REWARD = 100  # Reward for mining a block
-BLOCKCHAIN_SESSION_KEY = 'blockchain_data'  # Key for storing blockchain in session
-WALLETS_SESSION_KEY = 'user_wallets'  # Key for storing wallets in session
\ No newline at end of file
+BLOCKCHAIN_SESSION_KEY = 'blockchain_data'  # Session key holding the id of the session's chain
+BLOCK_STORE_DIR = BASE_DIR / 'chaindata'  # Append-only block store, one directory per chain
+WALLETS_SESSION_KEY = 'user_wallets'  # Key for storing wallets in session
+TRANSACTION_HISTORY_PAGE_SIZE = 20  # Transactions per page of address history
+MAX_BALANCE_QUERY_ADDRESSES = 1000  # Addresses accepted by one bulk balance request
+MAX_BULK_TRANSACTIONS = 1000  # Transactions accepted by one bulk submission request
+CHAIN_API_PAGE_SIZE = 100  # Most blocks returned by one ranged chain API request
+HOME_RECENT_BLOCKS = 10  # Newest blocks shown on the home page
+SNAPSHOT_COMPRESSION = 'zlib'  # Compression of snapshot data: 'zlib', 'lzma' or 'none'
+SNAPSHOT_MAX_DEPTH = 50  # Delta snapshots in a row before a full snapshot is stored again
+SNAPSHOT_CACHE_SIZE = 8  # Materialized snapshot chains kept per process
+SNAPSHOT_PAGE_SIZE = 50  # Snapshots per page of the snapshot list
+CHAIN_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Estimated memory of the decoded blocks and indexes of cached chains per process
+CHAIN_CACHE_ENABLED = True  # Set to False to load the chain from its block store on every request
+BLOCKCHAIN_SHARED = False  # True: every session uses one shared chain and keeps only its wallets
+SHARED_CHAIN_ID = 'shared'  # Block store directory of the shared chain